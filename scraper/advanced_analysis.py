@@ -4,41 +4,109 @@ Sistema de Análisis Avanzado para Datos de Profesores
 Implementa 10 técnicas de análisis estadístico para evaluar profesores
 """
 
+import gzip
 import json
 import os
 import re
+import argparse
+import cProfile
+import pstats
 import unicodedata
 import pathlib
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional, Any
 from collections import defaultdict, Counter
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 from scipy import stats
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.decomposition import NMF
-from sklearn.metrics.pairwise import cosine_similarity
 import warnings
 warnings.filterwarnings('ignore')
 
+from comment_corpus import CommentCorpus
+from json_output import dumps_compact, dumps_indented
+from stage_timer import StageTimer
+from professor_loader import iter_professors
+from near_duplicates import NearDuplicateIndex
+from review_dates import parse_review_date
+from review_table import ReviewTable
+
 # Spanish stopwords (functional only, not occupational)
 STOP_ES = {
     'de', 'la', 'que', 'el', 'en', 'y', 'a', 'los', 'del', 'se', 'las', 'por', 'un', 'para', 'con', 'no', 'una', 'su', 'al', 'lo', 'como', 'más', 'pero', 'sus', 'le', 'ya', 'o', 'fue', 'este', 'ha', 'sí', 'esta', 'son', 'entre', 'cuando', 'muy', 'sin', 'sobre', 'también', 'me', 'hasta', 'hay', 'donde', 'quien', 'desde', 'todo', 'nos', 'durante', 'todos', 'uno', 'les', 'ni', 'contra', 'otros', 'ese', 'eso', 'ante', 'ellos', 'e', 'esto', 'antes', 'algunos', 'qué', 'unos', 'yo', 'otro', 'otras', 'otra', 'él', 'tanto', 'esa', 'estos', 'mucho', 'quienes', 'nada', 'muchos', 'cual', 'poco', 'ella', 'estar', 'estas', 'algunas', 'algo', 'nosotros'
 }
 
-# Spanish months mapping
-MONTHS = {
-    "Ene": 1, "Feb": 2, "Mar": 3, "Abr": 4, "May": 5, "Jun": 6,
-    "Jul": 7, "Ago": 8, "Sep": 9, "Oct": 10, "Nov": 11, "Dic": 12
-}
+# Salida compacta: todos los profesores en JSON Lines, cada línea comprimida como un
+# miembro gzip independiente, y un índice id -> [offset, bytes]
+OUTPUT_FORMATS = ("json", "compact")
+PACK_FILE = "profesores_enriquecido.jsonl.gz"
+PACK_INDEX = "indices/profesores_offsets.json"
+
+# Analizador de cada proceso del pool (se crea una vez por proceso en _init_worker)
+_WORKER_ANALYZER = None
+
+
+def _init_worker(data_dir, out_dir, output_format, global_stats, subject_stats, review_table, corpus,
+                 duplicates, reference_time):
+    """Recibe las estadísticas globales una sola vez por proceso"""
+    global _WORKER_ANALYZER
+    try:
+        # Un hilo BLAS por proceso para no sobresuscribir los núcleos
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(1)
+    except ImportError:
+        pass
+    analyzer = ProfessorAnalyzer(data_dir=data_dir, out_dir=out_dir, output_format=output_format)
+    analyzer.global_stats = global_stats
+    analyzer.subject_stats = subject_stats
+    analyzer.review_table = review_table
+    analyzer.corpus = corpus
+    analyzer.duplicates = duplicates
+    analyzer.reference_time = reference_time
+    _WORKER_ANALYZER = analyzer
+
+
+def _analyze_chunk(items):
+    """Analiza y guarda un bloque de profesores dentro de un proceso del pool
+    
+    Devuelve también los tiempos medidos en el bloque para sumarlos en el proceso principal.
+    """
+    results = [(prof_id, _WORKER_ANALYZER._analyze_and_save(prof_id, data)) for prof_id, data in items]
+    return results, _WORKER_ANALYZER.timer.drain()
+
+
+def load_packed_professor(out_dir: str, prof_id: str) -> Optional[Dict[str, Any]]:
+    """Lee un profesor del archivo empaquetado (--format compact) usando su offset"""
+    out = pathlib.Path(out_dir)
+    with open(out / PACK_INDEX, 'r', encoding='utf-8') as f:
+        entry = json.load(f)["professors"].get(prof_id)
+    if entry is None:
+        return None
+    offset, length = entry
+    with open(out / PACK_FILE, 'rb') as f:
+        f.seek(offset)
+        return json.loads(gzip.decompress(f.read(length)).decode('utf-8'))
+
 
 class ProfessorAnalyzer:
-    def __init__(self, data_dir="profesores_json", out_dir="out"):
+    def __init__(self, data_dir="profesores_json", out_dir="out", output_format="json"):
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Formato de salida desconocido: {output_format}")
         self.data_dir = data_dir
+        self.output_format = output_format
         self.out_dir = pathlib.Path(out_dir)
         (self.out_dir / "profesores_enriquecido").mkdir(parents=True, exist_ok=True)
         (self.out_dir / "indices" / "subjects").mkdir(parents=True, exist_ok=True)
         self.global_stats = {}
         self.subject_stats = {}
+        self.review_table = None
+        self.corpus = None
+        self.duplicates = None
+        self.input_hashes = {}
+        self.reference_time = datetime.now()  # Única referencia para todos los pesos de decaimiento
+        self._fecha_cache: Dict[Optional[str], Optional[datetime]] = {}
+        self.timer = StageTimer()  # Tiempos por etapa y profesor (reporte con --timings)
+        self.manifest_path = self.out_dir / "analysis_manifest.json"
         
     def _normalize(self, s: str) -> str:
         """Normalize text: lowercase, remove accents, clean punctuation"""
@@ -47,23 +115,12 @@ class ProfessorAnalyzer:
         return re.sub(r'[^a-z0-9\s]', ' ', s)
         
     def parse_fecha(self, fecha_str: Optional[str]) -> Optional[datetime]:
-        """Parse date string with Spanish month support"""
-        if not fecha_str:
-            return None
-        # Format like 28/Dic/2016
-        m = re.match(r'^(\d{1,2})/([A-Za-z]{3})/(\d{4})$', fecha_str.strip())
-        if m:
-            d, mon, y = m.groups()
-            mon = mon[:3].title()
-            if mon in MONTHS:
-                return datetime(int(y), MONTHS[mon], int(d))
-        # Fallback to numeric formats
-        for fmt in ('%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y', '%Y/%m/%d'):
-            try:
-                return datetime.strptime(fecha_str, fmt)
-            except ValueError:
-                continue
-        return None
+        """Parse date string with Spanish month support (memoizado por texto crudo)"""
+        try:
+            return self._fecha_cache[fecha_str]
+        except KeyError:
+            parsed = self._fecha_cache[fecha_str] = parse_review_date(fecha_str)
+            return parsed
 
     def months_diff(self, a: datetime, b: datetime) -> float:
         """Calculate months difference with day fraction"""
@@ -71,44 +128,49 @@ class ProfessorAnalyzer:
 
     def _extract_rows(self, calificaciones):
         """Extract atomic review rows with proper recommendation mapping"""
-        rows = []
-        for cal in calificaciones:
-            tipo = (cal.get('tipo_calificacion') or '').strip().upper()
-            recomienda = 1 if tipo == 'BUENO' else 0 if tipo else None
-            
-            # Handle facilidad to difficulty conversion
-            facilidad = cal.get('puntaje_facilidad')
-            if facilidad is not None and facilidad not in (None, 0, '0', '0.0'):
-                dificultad = min(5.0, float(facilidad))
-            else:
-                dificultad = None
-                
-            row = {
-                'fecha': self.parse_fecha(cal.get('fecha')),
-                'calidad': (float(cal['puntaje_calidad_general']) 
-                           if cal.get('puntaje_calidad_general') is not None else None),
-                'dificultad': dificultad,
-                'materia': (cal.get('materia') or '').upper().strip(),
-                'nota': (float(cal['calificacion_recibida']) 
-                         if (cal.get('calificacion_recibida') not in (None, 'N/A', 'NA', '')) else None),
-                'comentario': (cal.get('comentario') or '').strip(),
-                'recomienda': recomienda
-            }
-            rows.append(row)
+        table = ReviewTable({'': {'calificaciones': calificaciones}}, self.parse_fecha)
+        table.compute_z(self.subject_stats)
+        table.set_reference(self.reference_time)
+        rows = table.rows_for('')
+        for row in rows:
+            row['idx'] = None  # No corresponde a filas del corpus compartido
         return rows
+    
+    def _professor_rows(self, prof_id: str, data: Dict) -> List[Dict[str, Any]]:
+        """Filas del profesor desde la tabla columnar (ya parseadas); si no está, se parsean aparte"""
+        if self.review_table is not None and prof_id in self.review_table:
+            return self.review_table.rows_for(prof_id)
+        return self._extract_rows(data.get('calificaciones', []))
+
+    def _encode_json(self, obj: Any) -> bytes:
+        """JSON con indent=2 (formato json) o minificado (formato compact), en UTF-8"""
+        if self.output_format == "compact":
+            return dumps_compact(obj)
+        return dumps_indented(obj).encode("utf-8")
 
     def _save_json(self, relpath: str, obj: Any) -> None:
-        def make_serializable(o):
-            if isinstance(o, dict):  return {k: make_serializable(v) for k,v in o.items()}
-            if isinstance(o, list):  return [make_serializable(x) for x in o]
-            if isinstance(o, (np.integer, np.floating)): return float(o)
-            if isinstance(o, np.ndarray): return o.tolist()
-            if isinstance(o, bool): return int(o)  # opcional
-            return o
         p = self.out_dir / relpath
         p.parent.mkdir(parents=True, exist_ok=True)
-        with open(p, "w", encoding="utf-8") as f:
-            json.dump(make_serializable(obj), f, ensure_ascii=False, indent=2)
+        with open(p, "wb") as f:
+            f.write(self._encode_json(obj))
+
+    def _save_pack(self) -> None:
+        """Empaqueta todos los profesores en un solo archivo con índice de offsets
+        
+        Cada profesor es una línea minificada comprimida como miembro gzip propio: el
+        archivo completo se descomprime como un JSON Lines normal y, con el índice, se
+        puede leer uno solo con seek (o una petición HTTP Range) sin tocar el resto.
+        """
+        offsets = {}
+        position = 0
+        with open(self.out_dir / PACK_FILE, "wb") as f:
+            for prof_id, analysis in self.analyzed_data.items():
+                line = self._encode_json(analysis) + b"\n"
+                member = gzip.compress(line, mtime=0)  # mtime fijo: salida reproducible
+                f.write(member)
+                offsets[prof_id] = [position, len(member)]
+                position += len(member)
+        self._save_json(PACK_INDEX, {"file": PACK_FILE, "professors": offsets})
 
     def _save_professor_file(self, prof_id: str, analysis: Dict[str, Any]) -> None:
         self._save_json(f"profesores_enriquecido/{prof_id}.json", analysis)
@@ -130,42 +192,34 @@ class ProfessorAnalyzer:
         return out
 
     def decayed_mean_from_rows(self, rows, field, half_life=24):
-        """Calculate decayed mean from atomic rows, handling missing dates properly"""
-        now = datetime.now()
-        valid_rows = []
-        naive_values = []
-        
-        for row in rows:
-            value = row.get(field)
-            if value is not None:
-                naive_values.append(value)
-                if row['fecha']:
-                    valid_rows.append((row['fecha'], value))
+        """Calculate decayed mean from atomic rows, handling missing dates properly
         
-        if not naive_values:
+        Usa el peso precalculado de cada fila ('w', respecto a reference_time);
+        half_life distinto de 24 recalcula los pesos.
+        """
+        values = [row[field] for row in rows if row.get(field) is not None]
+        if not values:
             return None
             
         # Calculate naive mean (all reviews)
-        naive_mean = np.mean(naive_values)
+        naive_mean = np.mean(values)
         
         # Calculate decayed mean (only reviews with dates)
-        if not valid_rows:
+        dated = [row for row in rows if row.get(field) is not None and row['fecha']]
+        if not dated:
             return naive_mean
-            
-        weights = []
-        values = []
-        
-        for fecha, value in valid_rows:
-            months = self.months_diff(fecha, now)
-            weight = np.exp(-np.log(2) * months / half_life)
-            weights.append(weight)
-            values.append(value)
         
-        if not weights:
-            return naive_mean
-            
-        decayed_mean = np.average(values, weights=weights)
-        return decayed_mean
+        if half_life == 24:
+            weights = [row['w'] for row in dated]
+        else:
+            weights = self._decay_weights([row['fecha'] for row in dated], half_life)
+        return np.average([row[field] for row in dated], weights=weights)
+
+    def _decay_weights(self, dates, half_life=24) -> np.ndarray:
+        """Pesos 0.5^(meses/half_life) de fechas sueltas respecto a reference_time"""
+        now = self.reference_time
+        months = np.array([self.months_diff(d, now) for d in dates], dtype=np.float64)
+        return np.power(0.5, months / half_life)
 
     def bayesian_score(self, values: List[float], mu_global: float, k: int = 10) -> float:
         """Calcula score bayesiano para pocas reseñas"""
@@ -194,141 +248,125 @@ class ProfessorAnalyzer:
         return (max(0, lower), min(1, upper))
 
     def load_all_data(self):
-        """Carga todos los archivos JSON de profesores"""
-        print("Cargando datos de profesores...")
-        professors_data = {}
+        """Carga todos los archivos JSON de profesores
         
-        for filename in os.listdir(self.data_dir):
-            if filename.endswith('.json'):
-                filepath = os.path.join(self.data_dir, filename)
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        professor_id = filename.replace('.json', '')
-                        professors_data[professor_id] = data
-                except Exception as e:
-                    print(f"Error cargando {filename}: {e}")
-        
-        print(f"Cargados {len(professors_data)} profesores")
-        self.professors_data = professors_data
-        self._calculate_global_stats(professors_data)
-        return professors_data
+        Los archivos se leen en streaming (professor_loader) y sus reseñas pasan directo
+        a la tabla columnar; de cada profesor solo se guardan los campos de perfil.
+        La tabla, el corpus TF-IDF y el índice de duplicados sí quedan completos en
+        memoria, así que el consumo crece con el número de reseñas.
+        """
+        print("Cargando datos de profesores...")
+        self.professors_data = {}
+        self.input_hashes = {}
+        with self.timer.stage('load'):
+            self._calculate_global_stats(self._stream_professors())
+        self.timer.count('professors_loaded', len(self.professors_data))
+        self.timer.count('reviews_loaded', len(self.review_table))
+        print(f"Cargados {len(self.professors_data)} profesores")
+        return self.professors_data
+
+    def _stream_professors(self):
+        """(id, datos) de cada JSON válido; registra el hash y el perfil sin reseñas"""
+        for record in iter_professors(self.data_dir, with_hash=True):
+            if record.error is not None:
+                print(f"Error cargando {record.filename}: {record.error}")
+                continue
+            self.input_hashes[record.prof_id] = record.sha256
+            self.professors_data[record.prof_id] = {k: v for k, v in record.data.items() if k != 'calificaciones'}
+            yield record.prof_id, record.data
 
     def _calculate_global_stats(self, professors_data):
-        """Calcula estadísticas globales necesarias para los análisis"""
-        all_quality = []
-        all_difficulty = []
-        all_recommendations = []
-        subject_data = defaultdict(lambda: {'quality': [], 'difficulty': []})
-        
-        for prof_id, data in professors_data.items():
-            for review in data.get('calificaciones', []):
-                # Calidad
-                if review.get('puntaje_calidad_general') is not None:
-                    quality = float(review['puntaje_calidad_general'])
-                    all_quality.append(quality)
-                    
-                    # Estadísticas por materia
-                    subject = review.get('materia', '').upper()
-                    if subject:
-                        subject_data[subject]['quality'].append(quality)
-                
-                # Dificultad (misma escala que en _extract_rows): 0 => missing, clamp a 5.0
-                fac = review.get('puntaje_facilidad')
-                if fac is not None:
-                    fac = float(fac)
-                    if fac > 0:
-                        diff = min(5.0, fac)
-                        all_difficulty.append(diff)
-                        subject = (review.get('materia') or '').upper()
-                        if subject:
-                            subject_data[subject]['difficulty'].append(diff)
-                
-                # Recomendaciones
-                if review.get('tipo_calificacion'):
-                    recommends = 1 if review['tipo_calificacion'] == 'BUENO' else 0
-                    all_recommendations.append(recommends)
-        
-        # Count total reviews correctly
-        total_reviews = sum(len(d.get('calificaciones', [])) for d in professors_data.values())
-        
-        # Estadísticas globales
-        self.global_stats = {
-            'mu_quality': float(np.mean(all_quality)) if all_quality else None,
-            'mu_difficulty': float(np.mean(all_difficulty)) if all_difficulty else None,
-            'recommendation_rate': float(np.mean(all_recommendations)) if all_recommendations else None,
-            'total_reviews': int(total_reviews)
-        }
-        
-        # Estadísticas por materia
-        self.subject_stats = {}
-        for subject, data in subject_data.items():
-            if len(data['quality']) >= 3:  # Mínimo 3 reseñas para confiabilidad
-                self.subject_stats[subject] = {
-                    'mu_quality': np.mean(data['quality']),
-                    'sigma_quality': np.std(data['quality'], ddof=1) if len(data['quality']) > 1 else 1.0,
-                    'mu_difficulty': np.mean(data['difficulty']) if data['difficulty'] else 0,
-                    'sigma_difficulty': np.std(data['difficulty'], ddof=1) if len(data['difficulty']) > 1 else 1.0,
-                    'n_reviews': len(data['quality'])
-                }
+        """Calcula estadísticas globales necesarias para los análisis
+        
+        Las reseñas se parsean una sola vez en una tabla columnar; las estadísticas
+        globales, por materia (mínimo 3 reseñas) y los z-scores salen de ella.
+        """
+        with self.timer.stage('load_review_table'):
+            self.review_table = ReviewTable(professors_data, self.parse_fecha)
+        with self.timer.stage('global_stats'):
+            self.global_stats = self.review_table.global_stats()
+            self.subject_stats = self.review_table.subject_stats(min_reviews=3)
+            self.review_table.compute_z(self.subject_stats)
+            self.review_table.set_reference(self.reference_time)
+
+        # Texto normalizado y TF-IDF de todo el corpus, una sola vez para todos los profesores
+        with self.timer.stage('corpus_tfidf'):
+            normalized = [self._normalize(c) if c else '' for c in self.review_table.comment]
+            self.corpus = CommentCorpus(normalized, STOP_ES)
+        # Casi duplicados de todo el corpus (MinHash/LSH), también entre profesores
+        with self.timer.stage('near_duplicates'):
+            self.duplicates = NearDuplicateIndex(normalized, self.corpus.matrix, self.review_table.prof,
+                                                 keys=self.review_table.fingerprint)
 
     def analyze_professor(self, prof_id: str, data: Dict) -> Dict[str, Any]:
-        """Analiza un profesor aplicando todas las técnicas"""
+        """Analiza un profesor aplicando todas las técnicas (cada una medida en self.timer)"""
         print(f"Analizando {prof_id}...")
+        stage = lambda name: self.timer.stage(name, prof_id)
         
         # Extract atomic rows
-        reviews = self._extract_rows(data.get('calificaciones', []))
+        with stage('rows'):
+            reviews = self._professor_rows(prof_id, data)
         
         if not reviews:
             return {
                 'professor_id': prof_id,
                 'error': 'No hay reseñas disponibles'
             }
+        self.timer.count('reviews_analyzed', len(reviews))
         
         # 1. Promedios con decaimiento temporal
-        quality_decayed = self.decayed_mean_from_rows(reviews, 'calidad')
-        difficulty_decayed = self.decayed_mean_from_rows(reviews, 'dificultad')
+        with stage('decay'):
+            quality_decayed = self.decayed_mean_from_rows(reviews, 'calidad')
+            difficulty_decayed = self.decayed_mean_from_rows(reviews, 'dificultad')
         
         # 2. Ajuste Bayesiano
-        qualities = [r['calidad'] for r in reviews if r['calidad'] is not None]
-        difficulties = [r['dificultad'] for r in reviews if r['dificultad'] is not None]
-        
-        quality_bayes = self.bayesian_score(qualities, self.global_stats['mu_quality'])
-        difficulty_bayes = self.bayesian_score(difficulties, self.global_stats['mu_difficulty'])
+        with stage('bayes'):
+            qualities = [r['calidad'] for r in reviews if r['calidad'] is not None]
+            difficulties = [r['dificultad'] for r in reviews if r['dificultad'] is not None]
+            
+            quality_bayes = self.bayesian_score(qualities, self.global_stats['mu_quality'])
+            difficulty_bayes = self.bayesian_score(difficulties, self.global_stats['mu_difficulty'])
         
         # 3. Intervalo de Wilson para recomendaciones (with proper n>0 guard)
-        recommendations = [r['recomienda'] for r in reviews if r['recomienda'] is not None]
-        n = len(recommendations)
-        if n:
-            r = sum(recommendations)
-            p = r/n
-            low, high = self.wilson_interval(p, n, confidence=0.95)
-            recommendation_analysis = {'rate': round(p, 3), 'wilson_interval': [low, high], 'n_recommendations': n}
-        else:
-            recommendation_analysis = {'rate': None, 'wilson_interval': None, 'n_recommendations': 0}
+        with stage('wilson'):
+            recommendations = [r['recomienda'] for r in reviews if r['recomienda'] is not None]
+            n = len(recommendations)
+            if n:
+                r = sum(recommendations)
+                p = r/n
+                low, high = self.wilson_interval(p, n, confidence=0.95)
+                recommendation_analysis = {'rate': round(p, 3), 'wilson_interval': [low, high], 'n_recommendations': n}
+            else:
+                recommendation_analysis = {'rate': None, 'wilson_interval': None, 'n_recommendations': 0}
         
         # 4. Normalización por materia (z-score contextual) - ALL subjects
-        subject_normalization = self.subject_normalization(reviews)
+        with stage('subject_z'):
+            subject_normalization = self.subject_normalization(reviews)
         
         # 5. Análisis de notas y equidad
-        grades_analysis = self._analyze_grades(reviews)
+        with stage('grades'):
+            grades_analysis = self._analyze_grades(reviews)
         
         # 6. Análisis NLP
-        nlp_analysis = self._analyze_nlp(reviews)
+        with stage('nlp'):
+            nlp_analysis = self._analyze_nlp(reviews)
         
         # 7. Análisis de integridad
-        integrity_analysis = self._analyze_integrity(reviews)
+        with stage('integrity'):
+            integrity_analysis = self._analyze_integrity(reviews)
         
         # 8. Análisis de tendencias
-        trends_analysis = self._analyze_trends(reviews)
+        with stage('trends'):
+            trends_analysis = self._analyze_trends(reviews)
         
         # Muestras de comentarios
-        # Ordena por fecha descendente (None al final)
-        rows_sorted = sorted(reviews, key=lambda r: (r["fecha"] is None, r["fecha"]), reverse=True)
-        comments_recent = [r["comentario"] for r in rows_sorted[:10] if r["comentario"]]
+        with stage('public_payload'):
+            # Ordena por fecha descendente (None al final)
+            rows_sorted = sorted(reviews, key=lambda r: (r["fecha"] is None, r["fecha"]), reverse=True)
+            comments_recent = [r["comentario"] for r in rows_sorted[:10] if r["comentario"]]
 
-        # Payload público de filas (comentarios sin limpiar)
-        reviews_public = self._rows_to_public(rows_sorted)  # o limita con [:100] si pesa mucho
+            # Payload público de filas (comentarios sin limpiar)
+            reviews_public = self._rows_to_public(rows_sorted)  # o limita con [:100] si pesa mucho
         
         return {
             'professor_id': prof_id,
@@ -357,21 +395,13 @@ class ProfessorAnalyzer:
         """Calculate decayed average of a series"""
         if not values or not dates:
             return None
-        now = datetime.now()
-        weights = []
-        valid_values = []
-        
-        for value, date in zip(values, dates):
-            if date and value is not None:
-                months = self.months_diff(date, now)
-                weight = np.exp(-np.log(2) * months / half_life)
-                weights.append(weight)
-                valid_values.append(value)
-        
-        if not weights:
+        pairs = [(value, date) for value, date in zip(values, dates) if date and value is not None]
+        
+        if not pairs:
             return np.mean(values) if values else None
             
-        return np.average(valid_values, weights=weights)
+        valid_values, valid_dates = zip(*pairs)
+        return np.average(valid_values, weights=self._decay_weights(valid_dates, half_life))
 
     def subject_normalization(self, rows):
         """Calculate decayed z-scores for ALL subjects"""
@@ -379,30 +409,20 @@ class ProfessorAnalyzer:
         per = defaultdict(list)
         
         for r in rows:
-            subj = r['materia']
-            if not subj or r['calidad'] is None:
-                continue
-            stats = self.subject_stats.get(subj)
-            if not stats:
+            z = r['z']  # Calculado de forma vectorizada en ReviewTable.compute_z
+            if z is None:
                 continue
-            mu = stats['mu_quality']
-            sd = stats['sigma_quality'] or 1.0
-            z = (r['calidad'] - mu) / sd
-            z_vals.append((z, r['fecha']))
-            per[subj].append((z, r['fecha']))
+            z_vals.append((z, r['w']))
+            per[r['materia']].append((z, r['w']))
         
         def decayed_avg(zlist):
-            if not zlist:
+            # Pesos precalculados de cada fila; las reseñas sin fecha (w None) no cuentan
+            dated = [(z, w) for z, w in zlist if w is not None]
+            if not dated:
                 return None
-            now = datetime.now()
-            acc = ws = 0.0
-            for z, dt in zlist:
-                if not dt:
-                    continue
-                w = 0.5 ** (self.months_diff(dt, now) / 24.0)
-                acc += w * z
-                ws += w
-            return (acc / ws) if ws else None
+            z, w = np.array(dated).T
+            ws = w.sum()
+            return float(np.dot(w, z) / ws) if ws else None
         
         z_mean = np.mean([z for z, _ in z_vals]) if z_vals else None
         z_decayed = decayed_avg(z_vals)
@@ -479,9 +499,42 @@ class ProfessorAnalyzer:
             'n_grades': len(grades)
         }
     
+    def _comment_vectors(self, rows):
+        """Filas con comentario, su texto normalizado y su TF-IDF con el vocabulario del corpus
+        
+        Si las filas vienen de la tabla compartida solo se toman sus renglones de la matriz;
+        si no (profesor fuera de la tabla), se normalizan y transforman aquí.
+        """
+        commented = [r for r in rows if r['comentario']]
+        corpus = self.corpus
+        if corpus is not None and corpus.matrix is not None and all(r.get('idx') is not None for r in commented):
+            idx = [r['idx'] for r in commented]
+            return commented, [corpus.normalized[i] for i in idx], corpus.matrix[idx], corpus.feature_names
+        
+        normalized = [self._normalize(r['comentario']) for r in commented]
+        if corpus is None or corpus.matrix is None:
+            corpus = CommentCorpus(normalized, STOP_ES)
+            return commented, normalized, corpus.matrix, corpus.feature_names
+        return commented, normalized, corpus.transform(normalized), corpus.feature_names
+
+    @staticmethod
+    def _topic_columns(X, n_comments: int) -> np.ndarray:
+        """Columnas de términos en al menos 2 comentarios del profesor y en no más del 90%"""
+        df = np.diff(X.tocsc().indptr)
+        return np.flatnonzero((df >= 2) & (df <= 0.9 * n_comments))
+
+    def _topic_terms(self, prof_id: str) -> List[str]:
+        """Términos que pueden entrar en los tópicos del profesor (su IDF es del corpus completo)"""
+        rows = self.review_table.commented_rows(prof_id)
+        if self.corpus is None or self.corpus.matrix is None or len(rows) < 3:
+            return []
+        columns = self._topic_columns(self.corpus.matrix[rows], len(rows))
+        return [str(term) for term in self.corpus.feature_names[columns]]
+
     def _analyze_nlp(self, rows):
         """Analyze comments with improved Spanish NLP and text normalization"""
-        comments = [row['comentario'] for row in rows if row['comentario']]
+        commented, normalized, X, feature_names = self._comment_vectors(rows)
+        comments = [row['comentario'] for row in commented]
         
         if len(comments) < 3:
             return {
@@ -490,20 +543,20 @@ class ProfessorAnalyzer:
                 'n_comments': len(comments)
             }
         
-        # TF-IDF with normalized text and proper stopwords
+        # Topic modeling with NMF sobre las filas del profesor en la matriz TF-IDF del corpus
         try:
-            cleaned = [self._normalize(c) for c in comments]
-            vectorizer = TfidfVectorizer(
-                stop_words=list(STOP_ES),
-                min_df=2,
-                max_df=0.9,
-                ngram_range=(1, 2),
-                max_features=500
-            )
-            
-            X = vectorizer.fit_transform(cleaned)
+            # Términos en al menos 2 comentarios del profesor y en no más del 90% (máximo 500).
+            # Un vocabulario vacío deja sin tópicos pero conserva el sentimiento, como antes
+            if X is None:
+                raise ValueError("empty vocabulary")
+            columns = self._topic_columns(X, len(comments))
+            if len(columns) > 500:
+                weight = np.asarray(X[:, columns].sum(axis=0)).ravel()
+                columns = np.sort(columns[np.argsort(-weight, kind='stable')[:500]])
+            if not len(columns):
+                raise ValueError("empty vocabulary")
+            X = X[:, columns]
             
-            # Topic modeling with NMF
             n_components = min(5, len(comments) // 2, 10)  # Dynamic components
             if n_components < 2:
                 return {
@@ -516,10 +569,9 @@ class ProfessorAnalyzer:
             topic_matrix = nmf.fit_transform(X)
             
             # Extract top words per topic
-            feature_names = vectorizer.get_feature_names_out()
             topics = []
             for i, topic in enumerate(nmf.components_):
-                top_words = [feature_names[j] for j in topic.argsort()[-5:]]
+                top_words = [str(feature_names[columns[j]]) for j in topic.argsort()[-5:]]
                 topics.append({
                     'id': i,
                     'words': top_words,
@@ -543,9 +595,8 @@ class ProfessorAnalyzer:
         sentiment_scores = []
         sentiment_by_month = defaultdict(list)
         
-        for i, row in enumerate(rows):
-            if row['comentario'] and row['fecha']:
-                comment = self._normalize(row['comentario'])
+        for row, comment in zip(commented, normalized):
+            if row['fecha']:
                 words = comment.split()
                 
                 positive_count = sum(1 for word in words if word in positive_words)
@@ -601,20 +652,20 @@ class ProfessorAnalyzer:
 
     def _analyze_integrity(self, rows):
         """Analyze review integrity with O(n) burst detection and bounded penalties"""
-        comments = [r['comentario'] for r in rows if r['comentario']]
-        dups = 0
+        commented, normalized, M, _ = self._comment_vectors(rows)
+        comments = [r['comentario'] for r in commented]
         
-        if len(comments) > 1:
-            try:
-                vec = TfidfVectorizer(stop_words=list(STOP_ES), max_features=300)
-                M = vec.fit_transform([self._normalize(c) for c in comments])
-                S = cosine_similarity(M)
-                for i in range(len(S)):
-                    for j in range(i + 1, len(S)):
-                        if S[i, j] > 0.9:
-                            dups += 1
-            except:
-                pass
+        # Casi duplicados (coseno > 0.9) del índice del corpus; fuera de la tabla, índice propio
+        if self.duplicates is not None and commented and all(r.get('idx') is not None for r in commented):
+            index, owner = self.duplicates, int(self.review_table.prof[commented[0]['idx']])
+            prof_ids = self.review_table.prof_ids
+        else:
+            index, owner, prof_ids = NearDuplicateIndex(normalized, M, [0] * len(commented)), 0, []
+        dups = index.pairs_within(owner)
+        duplicate_clusters = [
+            {"cluster": cid, "reviews": n, "professors": [prof_ids[o] for o in others]}
+            for cid, n, others in index.clusters_for(owner)
+        ]
         
         dates = [r['fecha'] for r in rows if r['fecha']]
         bursts = self._burst_windows(dates, k=3, window_hours=24)
@@ -628,6 +679,7 @@ class ProfessorAnalyzer:
         
         return {
             "dup_rate": round(dup_rate, 3),
+            "duplicate_clusters": duplicate_clusters,
             "bursts": bursts,
             "low_variance_flag": int(lowvar),
             "trust_score": round(max(0.0, trust), 2)
@@ -783,25 +835,201 @@ class ProfessorAnalyzer:
             safe = re.sub(r'[^A-Z0-9_-]+', '_', materia.upper())
             self._save_json(f"indices/subjects/{safe}.json", arr)
 
-    def analyze_all_professors(self) -> Dict[str, Any]:
-        """Analiza todos los profesores y genera resultados completos"""
+    def _analyze_and_save(self, prof_id: str, data: Dict) -> Optional[Dict[str, Any]]:
+        """Analiza un profesor y guarda su archivo; None si el análisis falla"""
+        try:
+            analysis = self.analyze_professor(prof_id, data)
+            with self.timer.stage('save', prof_id):
+                self._save_professor_file(prof_id, analysis)   # <-- guarda 1 archivo por profe
+            self.timer.count('professors_analyzed')
+            return analysis
+        except Exception as e:
+            print(f"Error analizando {prof_id}: {e}")
+            self.timer.count('professors_failed')
+            return None
+    
+    def _analyze_parallel(self, items: List[Tuple[str, Dict]], workers: int) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+        """Reparte los profesores en bloques entre procesos; el orden del resultado es el de entrada"""
+        chunk_size = max(1, len(items) // (workers * 4))
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        
+        results = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.data_dir, str(self.out_dir), self.output_format,
+                                           self.global_stats, self.subject_stats,
+                                           self.review_table, self.corpus,
+                                           self.duplicates, self.reference_time)) as pool:
+            for chunk_result, timings in pool.map(_analyze_chunk, chunks):
+                results.extend(chunk_result)
+                self.timer.merge(timings)
+        return results
+    
+    def _stats_snapshot(self) -> Dict[str, Any]:
+        """Estadísticas globales y por materia en forma comparable y serializable"""
+        return {
+            "global": {k: (float(v) if v is not None else None) for k, v in self.global_stats.items()},
+            "subjects": {
+                subject: {"mu_quality": float(s['mu_quality']), "sigma_quality": float(s['sigma_quality'])}
+                for subject, s in self.subject_stats.items()
+            }
+        }
+    
+    def _integrity_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Por profesor, lo que su integridad toma del corpus: grupos de duplicados y pares internos"""
+        if self.duplicates is None:
+            return {}
+        return {
+            prof_id: {"pairs": int(self.duplicates.pairs_within(owner)),
+                      "clusters": sorted(cid for cid, _, _ in self.duplicates.clusters_for(owner))}
+            for owner, prof_id in enumerate(self.review_table.prof_ids)
+        }
+    
+    def _load_manifest(self) -> Optional[Dict[str, Any]]:
+        if not self.manifest_path.exists():
+            return None
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Manifiesto ilegible, se recalcula todo: {e}")
+            return None
+    
+    def _professor_subjects(self, prof_id: str) -> set:
+        return self.review_table.subjects_for(prof_id)
+    
+    def _plan_incremental(self, manifest: Optional[Dict[str, Any]], tolerance: float) -> Optional[List[str]]:
+        """IDs a recalcular según el manifiesto, o None si hace falta recalcular todo
+        
+        Se recalculan los profesores cuyo JSON cambió (o cuyo resultado falta), los que
+        tienen reseñas en materias cuyas estadísticas se movieron más que `tolerance` y
+        los que dependen de otros profesores a través del corpus: sus grupos de duplicados
+        cambiaron o el IDF de alguno de sus términos de tópicos se movió más que `tolerance`.
+        Si cambian las estadísticas globales se recalcula todo.
+        """
+        if not manifest:
+            print("Sin manifiesto previo: recálculo completo")
+            return None
+        
+        current = self._stats_snapshot()
+        previous = manifest.get("stats", {})
+        for key, value in current["global"].items():
+            old = previous.get("global", {}).get(key)
+            if key == 'total_reviews':
+                continue  # Cambia con cualquier reseña nueva; ya se refleja en las medias
+            if (value is None) != (old is None) or (value is not None and abs(value - old) > tolerance):
+                print(f"Estadística global '{key}' cambió ({old} -> {value}): recálculo completo")
+                return None
+        
+        old_subjects = previous.get("subjects", {})
+        shifted = set()
+        for subject in set(current["subjects"]) | set(old_subjects):
+            new, old = current["subjects"].get(subject), old_subjects.get(subject)
+            if new is None or old is None or any(abs(new[k] - old[k]) > tolerance for k in new):
+                shifted.add(subject)
+        
+        old_integrity, old_idf = manifest.get("integrity"), manifest.get("idf")
+        if old_integrity is None or old_idf is None:
+            print("Manifiesto sin datos del corpus de comentarios: recálculo completo")
+            return None
+        integrity = self._integrity_snapshot()
+        idf = self.corpus.idf_by_term() if self.corpus is not None else {}
+        
+        old_hashes = manifest.get("inputs", {})
+        changed = []
+        by_duplicates = by_idf = 0
+        for prof_id in self.professors_data:
+            if (old_hashes.get(prof_id) != self.input_hashes.get(prof_id)
+                    or not (self.out_dir / "profesores_enriquecido" / f"{prof_id}.json").exists()
+                    or (shifted and self._professor_subjects(prof_id) & shifted)):
+                changed.append(prof_id)
+            elif old_integrity.get(prof_id) != integrity.get(prof_id):
+                changed.append(prof_id)
+                by_duplicates += 1
+            elif any(term not in old_idf or abs(idf.get(term, 0.0) - old_idf[term]) > tolerance
+                     for term in self._topic_terms(prof_id)):
+                changed.append(prof_id)
+                by_idf += 1
+        
+        print(f"Incremental: {len(changed)} de {len(self.professors_data)} profesores por recalcular"
+              f" ({len(shifted)} materias con estadísticas movidas; {by_duplicates} por grupos de duplicados"
+              f" y {by_idf} por IDF del corpus)")
+        return changed
+    
+    def _load_previous_analysis(self, prof_id: str) -> Optional[Dict[str, Any]]:
+        path = self.out_dir / "profesores_enriquecido" / f"{prof_id}.json"
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _remove_stale_outputs(self, manifest: Optional[Dict[str, Any]]):
+        """Borra los resultados de profesores que ya no están en los datos de entrada"""
+        for prof_id in set((manifest or {}).get("inputs", {})) - set(self.professors_data):
+            path = self.out_dir / "profesores_enriquecido" / f"{prof_id}.json"
+            if path.exists():
+                path.unlink()
+    
+    def _save_manifest(self):
+        manifest = {
+            "schema_version": "1.0",
+            "generated_at": datetime.now().isoformat(),
+            "stats": self._stats_snapshot(),
+            "inputs": self.input_hashes,
+            "integrity": self._integrity_snapshot(),
+            "idf": self.corpus.idf_by_term() if self.corpus is not None else {},
+        }
+        self._save_json(self.manifest_path.name, manifest)
+    
+    def analyze_all_professors(self, workers: int = 1, incremental: bool = False,
+                               stats_tolerance: float = 0.01) -> Dict[str, Any]:
+        """Analiza todos los profesores y genera resultados completos
+        
+        Con workers > 1 los profesores se analizan en un pool de procesos;
+        el resultado es idéntico al de la ejecución secuencial. Con incremental=True
+        solo se recalculan los profesores que cambiaron desde el último manifiesto.
+        """
         print("Analizando todos los profesores...")
         
+        to_compute = None
+        if incremental:
+            manifest = self._load_manifest()
+            to_compute = self._plan_incremental(manifest, stats_tolerance)
+            self._remove_stale_outputs(manifest)
+        if to_compute is None:
+            to_compute = list(self.professors_data)
+        items = [(prof_id, self.professors_data[prof_id]) for prof_id in to_compute]
+        
+        with self.timer.stage('analyze'):
+            if workers > 1 and len(items) > 1:
+                print(f"Usando {workers} procesos")
+                results = dict(self._analyze_parallel(items, workers))
+            else:
+                results = {prof_id: self._analyze_and_save(prof_id, data) for prof_id, data in items}
+        
+        # Mismo orden que los datos de entrada; los no recalculados se leen del resultado anterior
         self.analyzed_data = {}
-        for prof_id, data in self.professors_data.items():
-            try:
-                analysis = self.analyze_professor(prof_id, data)
-                self.analyzed_data[prof_id] = analysis
-                self._save_professor_file(prof_id, analysis)   # <-- guarda 1 archivo por profe
-            except Exception as e:
-                print(f"Error analizando {prof_id}: {e}")
+        with self.timer.stage('load_previous'):
+            for prof_id in self.professors_data:
+                analysis = results[prof_id] if prof_id in results else self._load_previous_analysis(prof_id)
+                if analysis is not None:
+                    self.analyzed_data[prof_id] = analysis
+        self.timer.count('professors_reused', len(self.professors_data) - len(results))
+        self._save_manifest()
         
         # índices
-        list_min = self._build_list_min()
-        self._save_json("indices/list-min.json", list_min)
+        with self.timer.stage('indices'):
+            list_min = self._build_list_min()
+            self._save_json("indices/list-min.json", list_min)
+
+            pareto = self.generate_pareto()
+            self._save_json("indices/pareto.json", pareto)
+
+            self._save_json("indices/duplicate_clusters.json", self._cross_professor_duplicates())
 
-        pareto = self.generate_pareto()
-        self._save_json("indices/pareto.json", pareto)
+        if self.output_format == "compact":
+            with self.timer.stage('save_pack'):
+                self._save_pack()
 
         # meta mínimo
         meta = {
@@ -824,6 +1052,34 @@ class ProfessorAnalyzer:
             "list_min_len": len(list_min)
         }
     
+    def _cross_professor_duplicates(self) -> List[Dict[str, Any]]:
+        """Grupos de comentarios casi idénticos publicados en perfiles de distintos profesores"""
+        if self.duplicates is None:
+            return []
+        table = self.review_table
+        out = []
+        for cid, rows in self.duplicates.cross_clusters():
+            members = Counter(table.prof[rows].tolist())
+            out.append({
+                "cluster": cid,
+                "reviews": len(rows),
+                "professors": [
+                    {"id": table.prof_ids[p], "nombre": self.professors_data[table.prof_ids[p]].get('nombre', ''),
+                     "reviews": n}
+                    for p, n in sorted(members.items())
+                ],
+                "comentario": table.comment[rows[0]],
+            })
+        print(f"Grupos de comentarios duplicados entre profesores: {len(out)}")
+        return out
+
+    def save_timings(self) -> None:
+        """Escribe out/timings.json (etapas, contadores, desglose) y out/timings.csv (por profesor)"""
+        self.timer.save(str(self.out_dir / "timings.json"), str(self.out_dir / "timings.csv"))
+        print("Etapas más costosas:")
+        for line in self.timer.summary():
+            print(f"  {line}")
+
     def _generate_comparison_data(self) -> List[Dict]:
         """Genera datos para comparación A/B/C"""
         comparison_metrics = []
@@ -844,39 +1100,57 @@ class ProfessorAnalyzer:
         
         return comparison_metrics
     
-    def save_results(self, output_file: str = 'advanced_analysis_results.json'):
+    def save_results(self, output_file: str = 'advanced_analysis_results.json', workers: int = 1,
+                     incremental: bool = False):
         """Guarda los resultados del análisis"""
-        results = self.analyze_all_professors()
-        
-        # Ensure all data is JSON serializable
-        def make_serializable(obj):
-            if isinstance(obj, dict):
-                return {k: make_serializable(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [make_serializable(item) for item in obj]
-            elif isinstance(obj, bool):
-                return int(obj)
-            elif isinstance(obj, (np.integer, np.floating)):
-                return float(obj)
-            elif isinstance(obj, np.ndarray):
-                return obj.tolist()
-            elif obj is None:
-                return None
-            else:
-                return obj
+        results = self.analyze_all_professors(workers=workers, incremental=incremental)
         
-        results = make_serializable(results)
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
+        # Los tipos de NumPy se convierten al escribir (json_output.to_builtin)
+        with self.timer.stage('save_results'):
+            with open(output_file, 'w', encoding='utf-8') as f:
+                f.write(dumps_indented(results))
         
         print(f"Resultados guardados en {output_file}")
         return results
 
-def main():
-    analyzer = ProfessorAnalyzer(data_dir="profesores_json", out_dir="out")
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Análisis avanzado de profesores")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Procesos para analizar profesores en paralelo (0 = todos los núcleos; default: 1)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Solo recalcula los profesores cuyo JSON cambió desde la última corrida")
+    parser.add_argument('--tolerance', type=float, default=0.01,
+                        help="Cambio máximo de estadísticas globales/por materia y del IDF de los términos "
+                             "antes de recalcular (default: 0.01)")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default="json",
+                        help="json: archivos con indentación; compact: JSON minificado y un solo archivo "
+                             f"empaquetado ({PACK_FILE}) con índice de offsets (default: json)")
+    parser.add_argument('--timings', action='store_true',
+                        help="Escribe out/timings.json y out/timings.csv con tiempos por etapa y profesor")
+    parser.add_argument('--cprofile', metavar='ARCHIVO',
+                        help="Perfila la corrida con cProfile y guarda las estadísticas en ARCHIVO "
+                             "(solo el proceso principal)")
+    args = parser.parse_args(argv)
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    
+    profiler = None
+    if args.cprofile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    
+    analyzer = ProfessorAnalyzer(data_dir="profesores_json", out_dir="out", output_format=args.format)
     analyzer.load_all_data()
-    results = analyzer.analyze_all_professors()
+    results = analyzer.analyze_all_professors(workers=workers, incremental=args.incremental,
+                                              stats_tolerance=args.tolerance)
+    
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.cprofile)
+        print(f"\nPerfil guardado en {args.cprofile} (funciones con más tiempo acumulado):")
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
+    if args.timings:
+        analyzer.save_timings()
+    
     print("\nOK. Archivos generados en ./out")
     print(f"- Profesores: {results['list_min_len']} en indices/list-min.json")
     print(f"- Pareto: {len(results['pareto']['points'])} puntos, {len(results['pareto']['efficient_ids'])} eficientes")
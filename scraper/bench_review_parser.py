@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark del parser de reseñas: BeautifulSoup (html.parser) contra lxml
+Recorre las páginas HTML guardadas en un directorio (o un almacén de snapshots),
+verifica que ambos parsers generen exactamente el mismo JSON y muestra el tiempo de cada uno.
+
+Uso: python bench_review_parser.py <directorio_html|directorio_snapshots> [repeticiones]
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from scraper_final import MisProfesoresScraperFinal
+from snapshot_store import SnapshotStore
+
+
+def parse_with_bs4(scraper, html):
+    soup = BeautifulSoup(html, 'html.parser')
+    return scraper.extract_reviews_from_page(soup, set()), scraper.get_total_pages(soup)
+
+
+def parse_with_lxml(scraper, html):
+    rows, total_pages = scraper.parse_review_page(html)
+    return scraper.collect_new_reviews(rows, set()), total_pages
+
+
+def load_pages(html_dir: Path):
+    """HTML de un almacén de snapshots si existe su índice; si no, los *.html del directorio"""
+    if (html_dir / 'index.jsonl').exists():
+        store = SnapshotStore(str(html_dir))
+        return [store.get(url) for url in sorted(store.urls())]
+    return [p.read_text(encoding='utf-8') for p in sorted(html_dir.rglob('*.html'))]
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Uso: python bench_review_parser.py <directorio_html|directorio_snapshots> [repeticiones]")
+        return 1
+
+    html_dir = Path(sys.argv[1])
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    pages = load_pages(html_dir)
+    if not pages:
+        print(f"❌ No se encontraron páginas HTML en {html_dir}")
+        return 1
+
+    scraper = MisProfesoresScraperFinal(fetch_mode="browser")
+
+    # Verificar salida idéntica antes de medir
+    mismatches = 0
+    for i, html in enumerate(pages):
+        expected = json.dumps(parse_with_bs4(scraper, html), ensure_ascii=False)
+        actual = json.dumps(parse_with_lxml(scraper, html), ensure_ascii=False)
+        if expected != actual:
+            mismatches += 1
+            print(f"⚠️ Diferencia en la página {i}")
+
+    timings = {}
+    for name, parse in (('bs4', parse_with_bs4), ('lxml', parse_with_lxml)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for html in pages:
+                parse(scraper, html)
+        timings[name] = time.perf_counter() - start
+
+    print(f"📄 Páginas: {len(pages)} x {repeat} repeticiones")
+    print(f"   bs4:  {timings['bs4']:.3f} s")
+    print(f"   lxml: {timings['lxml']:.3f} s ({timings['bs4'] / max(timings['lxml'], 1e-9):.1f}x)")
+    print("✅ Salida idéntica" if not mismatches else f"❌ {mismatches} páginas con diferencias")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Chromium compartido entre corridas del scraper y las herramientas de diagnóstico
+`python browser_server.py` lanza un Chromium de larga vida con el puerto de depuración
+remota (CDP) abierto y deja su dirección en un archivo conocido. Los scripts se conectan
+con connect_over_cdp en lugar de arrancar un navegador nuevo en cada corrida; si no hay
+servidor activo, lanzan un Chromium local como antes.
+
+Lo que se ahorra es el arranque de Chromium: cada script sigue iniciando su propio
+driver de Playwright (sync_playwright(), un proceso de Node de ~0.6 s) para conectarse.
+"""
+
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Optional, Tuple
+
+# Variable de entorno con un endpoint CDP explícito (ej. http://127.0.0.1:9222)
+ENDPOINT_ENV = "MISPROFESORES_CDP"
+
+
+def state_dir() -> str:
+    """Directorio privado del usuario para el registro del servidor
+
+    $XDG_RUNTIME_DIR (por usuario y con permisos 0700) si existe; si no, el caché del
+    usuario. No se usa el directorio temporal compartido: otro usuario podría crear o
+    reemplazar el archivo y dirigir los scrapers a su propio endpoint.
+    """
+    base = (os.environ.get('XDG_RUNTIME_DIR') or os.environ.get('XDG_CACHE_HOME')
+            or os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(base, 'misprofesores')
+
+
+# Archivo donde el servidor deja su endpoint y su PID mientras está activo
+ENDPOINT_FILE = os.path.join(state_dir(), "chromium.json")
+
+DEFAULT_PORT = 9222
+
+# Argumentos de Chromium, tanto del servidor como de un navegador local
+CHROMIUM_ARGS = [
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-extensions',
+    '--disable-plugins',
+    '--disable-images',  # Acelera la carga
+]
+
+
+def endpoint_alive(endpoint: str, timeout: float = 0.5) -> bool:
+    """Indica si hay un Chromium respondiendo en `endpoint`"""
+    try:
+        with urllib.request.urlopen(f"{endpoint.rstrip('/')}/json/version", timeout=timeout) as response:
+            return response.status == 200
+    except Exception:
+        return False
+
+
+def write_server_state(state: dict):
+    """Escribe ENDPOINT_FILE con permisos 0600, dentro de un directorio 0700"""
+    directory = os.path.dirname(ENDPOINT_FILE)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    tmp_path = f"{ENDPOINT_FILE}.{os.getpid()}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, ENDPOINT_FILE)
+
+
+def read_server_state() -> Optional[dict]:
+    """Endpoint y PID del servidor registrado, si existe"""
+    try:
+        with open(ENDPOINT_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def find_endpoint(endpoint: Optional[str] = None) -> Optional[str]:
+    """Endpoint CDP a usar: el explícito, el de MISPROFESORES_CDP o el del servidor activo"""
+    endpoint = endpoint or os.environ.get(ENDPOINT_ENV)
+    if not endpoint:
+        state = read_server_state()
+        endpoint = state.get('endpoint') if state else None
+    if endpoint and endpoint_alive(endpoint):
+        return endpoint
+    return None
+
+
+def connect_or_launch(playwright, headless: bool = True, endpoint: Optional[str] = None,
+                      use_server: bool = True, args=None) -> Tuple[object, bool]:
+    """Browser conectado al servidor compartido o, si no hay, uno local; indica si es compartido
+
+    Cerrar un browser conectado solo cierra sus contextos y se desconecta: el servidor sigue.
+    """
+    found = find_endpoint(endpoint) if use_server else None
+    if found:
+        print(f"🔌 Usando Chromium compartido en {found}")
+        return playwright.chromium.connect_over_cdp(found), True
+    if endpoint:
+        print(f"⚠️ No hay Chromium en {endpoint}; se lanza uno local")
+    return playwright.chromium.launch(headless=headless, args=args or CHROMIUM_ARGS), False
+
+
+async def connect_or_launch_async(playwright, headless: bool = True, endpoint: Optional[str] = None,
+                                  use_server: bool = True, args=None) -> Tuple[object, bool]:
+    """Versión asíncrona de connect_or_launch"""
+    found = find_endpoint(endpoint) if use_server else None
+    if found:
+        print(f"🔌 Usando Chromium compartido en {found}")
+        return await playwright.chromium.connect_over_cdp(found), True
+    if endpoint:
+        print(f"⚠️ No hay Chromium en {endpoint}; se lanza uno local")
+    return await playwright.chromium.launch(headless=headless, args=args or CHROMIUM_ARGS), False
+
+
+def serve(port: int = DEFAULT_PORT, headless: bool = True):
+    """Lanza Chromium con CDP en `port` y espera hasta Ctrl+C o --stop"""
+    from playwright.sync_api import sync_playwright
+
+    endpoint = f"http://127.0.0.1:{port}"
+    if endpoint_alive(endpoint):
+        print(f"✅ Ya hay un Chromium escuchando en {endpoint}")
+        return
+
+    # Solo se usa Playwright para ubicar su Chromium; el driver no queda corriendo
+    with sync_playwright() as playwright:
+        executable = playwright.chromium.executable_path
+
+    user_data_dir = tempfile.mkdtemp(prefix="misprofesores_chromium_")
+    command = [executable, f'--remote-debugging-port={port}', f'--user-data-dir={user_data_dir}',
+               *CHROMIUM_ARGS, 'about:blank']
+    if headless:
+        command.insert(1, '--headless=new')
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    # SIGTERM (--stop) sale por el mismo camino que Ctrl+C para limpiar
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        deadline = time.monotonic() + 15
+        while not endpoint_alive(endpoint):
+            if process.poll() is not None or time.monotonic() > deadline:
+                print(f"❌ Chromium no respondió en {endpoint}")
+                return
+            time.sleep(0.1)
+
+        write_server_state({'endpoint': endpoint, 'pid': os.getpid()})
+        print(f"🚀 Chromium compartido en {endpoint} (PID {process.pid})")
+        print("   Los scrapers con --browser-server y los scripts de diagnóstico se conectan solos")
+        print("   Ctrl+C o `python browser_server.py --stop` para detenerlo")
+        process.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        state = read_server_state()
+        if state and state.get('pid') == os.getpid():
+            os.remove(ENDPOINT_FILE)
+        shutil.rmtree(user_data_dir, ignore_errors=True)
+        print("🛑 Chromium compartido detenido")
+
+
+def stop():
+    """Detiene el servidor registrado en ENDPOINT_FILE"""
+    state = read_server_state()
+    if not state:
+        print("ℹ️ No hay servidor registrado")
+        return
+    try:
+        os.kill(state['pid'], signal.SIGTERM)
+        print(f"🛑 Señal enviada al servidor (PID {state['pid']})")
+    except ProcessLookupError:
+        os.remove(ENDPOINT_FILE)
+        print("ℹ️ El servidor ya no estaba activo; se limpió su registro")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Chromium compartido (CDP) para los scrapers de Mis Profesores")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f"Puerto de depuración remota (default: {DEFAULT_PORT})")
+    parser.add_argument('--headed', action='store_true', help="Muestra la ventana del navegador")
+    parser.add_argument('--status', action='store_true', help="Indica si hay un servidor activo")
+    parser.add_argument('--stop', action='store_true', help="Detiene el servidor activo")
+    args = parser.parse_args()
+
+    if args.stop:
+        stop()
+    elif args.status:
+        endpoint = find_endpoint()
+        print(f"✅ Activo en {endpoint}" if endpoint else "ℹ️ No hay servidor activo")
+    else:
+        serve(args.port, headless=not args.headed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Corpus de comentarios para el análisis avanzado
+Normaliza una sola vez todos los comentarios y ajusta un único TfidfVectorizer sobre
+el corpus completo; cada profesor usa las filas que le corresponden de la matriz.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+
+class CommentCorpus:
+    """Texto normalizado y matriz TF-IDF alineados con las filas de ReviewTable"""
+
+    def __init__(self, normalized: List[str], stop_words: Iterable[str]):
+        self.normalized = normalized
+        self.vectorizer = TfidfVectorizer(stop_words=list(stop_words), ngram_range=(1, 2), max_df=0.9)
+        self.matrix: Optional[sparse.csr_matrix] = None
+        self.feature_names = np.empty(0, dtype=object)
+
+        present = [i for i, text in enumerate(normalized) if text.strip()]
+        if not present:
+            return
+        try:
+            fitted = self.vectorizer.fit_transform([normalized[i] for i in present]).tocsr()
+        except ValueError:
+            return  # Solo stopwords: vocabulario vacío
+        self.feature_names = self.vectorizer.get_feature_names_out()
+
+        # Las filas sin comentario quedan vacías para que el índice coincida con la tabla
+        nnz = np.zeros(len(normalized), dtype=np.int64)
+        nnz[present] = np.diff(fitted.indptr)
+        indptr = np.concatenate(([0], np.cumsum(nnz)))
+        self.matrix = sparse.csr_matrix((fitted.data, fitted.indices, indptr),
+                                        shape=(len(normalized), len(self.feature_names)))
+
+    def idf_by_term(self, min_df: int = 2) -> Dict[str, float]:
+        """IDF de los términos presentes en al menos `min_df` comentarios (los únicos que entran en los tópicos)"""
+        if self.matrix is None:
+            return {}
+        df = np.diff(self.matrix.tocsc().indptr)
+        return {str(self.feature_names[j]): round(float(self.vectorizer.idf_[j]), 6)
+                for j in np.flatnonzero(df >= min_df)}
+
+    def transform(self, normalized: List[str]) -> Optional[sparse.csr_matrix]:
+        """TF-IDF de textos externos con el vocabulario del corpus"""
+        if self.matrix is None:
+            return None
+        return self.vectorizer.transform(normalized).tocsr()
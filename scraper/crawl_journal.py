@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Bitácora persistente del scraper de Mis Profesores
+Guarda en SQLite los profesores descubiertos y el estado de cada profesor y página
+para poder reanudar un scraping interrumpido.
+"""
+
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS professors (
+    url TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    department TEXT,
+    ratings TEXT,
+    average TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS pages (
+    professor_url TEXT NOT NULL,
+    page_num INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    updated_at TEXT,
+    PRIMARY KEY (professor_url, page_num)
+);
+"""
+
+
+class CrawlJournal:
+    """Bitácora de scraping respaldada por SQLite"""
+
+    def __init__(self, path: str = "crawl_journal.sqlite", max_attempts: int = 3):
+        self.path = path
+        self.max_attempts = max_attempts
+        # Una sola conexión; el scraper asíncrono la usa desde su hilo de E/S
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        # WAL deja la bitácora consistente aunque el proceso muera a mitad de una escritura
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def _now(self) -> str:
+        return datetime.now().isoformat(timespec='seconds')
+
+    def has_roster(self) -> bool:
+        """Indica si ya se registró la lista de profesores en una corrida anterior"""
+        return self.conn.execute("SELECT 1 FROM professors LIMIT 1").fetchone() is not None
+
+    def reset(self):
+        """Borra la corrida anterior (profesores y páginas) para empezar una nueva"""
+        with self.conn:
+            self.conn.execute("DELETE FROM pages")
+            self.conn.execute("DELETE FROM professors")
+
+    def record_roster(self, professors: List[Dict[str, str]]):
+        """Registra los profesores descubiertos; los ya conocidos conservan su estado"""
+        offset = self.conn.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM professors").fetchone()[0]
+        with self.conn:
+            self.conn.executemany(
+                """INSERT OR IGNORE INTO professors (url, position, name, department, ratings, average, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                [
+                    (p['url'], offset + i, p['name'], p.get('department', ''), p.get('ratings', ''),
+                     p.get('average', ''), self._now())
+                    for i, p in enumerate(professors)
+                ]
+            )
+
+    def pending_professors(self) -> List[Dict[str, str]]:
+        """Profesores aún no completados y con reintentos disponibles, en el orden original"""
+        rows = self.conn.execute(
+            """SELECT name, url, department, ratings, average FROM professors
+               WHERE status != 'done' AND attempts < ? ORDER BY position""",
+            (self.max_attempts,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def start_professor(self, url: str):
+        """Marca un profesor como en proceso y cuenta el intento"""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE professors SET status = 'in_progress', attempts = attempts + 1, updated_at = ? WHERE url = ?",
+                (self._now(), url)
+            )
+
+    def finish_professor(self, url: str, ok: bool, error: Optional[str] = None):
+        """Marca un profesor como terminado ('done') o fallido ('failed')"""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE professors SET status = ?, last_error = ?, updated_at = ? WHERE url = ?",
+                ('done' if ok else 'failed', error, self._now(), url)
+            )
+
+    def record_page(self, professor_url: str, page_num: int, ok: bool, error: Optional[str] = None):
+        """Registra el resultado de una página de reseñas"""
+        with self.conn:
+            self.conn.execute(
+                """INSERT INTO pages (professor_url, page_num, status, attempts, last_error, updated_at)
+                   VALUES (?, ?, ?, 1, ?, ?)
+                   ON CONFLICT (professor_url, page_num) DO UPDATE SET
+                       status = excluded.status, attempts = attempts + 1,
+                       last_error = excluded.last_error, updated_at = excluded.updated_at""",
+                (professor_url, page_num, 'done' if ok else 'failed', error, self._now())
+            )
+
+    def done_pages(self) -> Dict[str, List[int]]:
+        """Páginas ya descargadas de los profesores que quedaron sin terminar"""
+        rows = self.conn.execute(
+            """SELECT pages.professor_url, pages.page_num FROM pages
+               JOIN professors ON professors.url = pages.professor_url
+               WHERE pages.status = 'done' AND professors.status != 'done'
+               ORDER BY pages.professor_url, pages.page_num"""
+        ).fetchall()
+        done: Dict[str, List[int]] = {}
+        for professor_url, page_num in rows:
+            done.setdefault(professor_url, []).append(page_num)
+        return done
+
+    def summary(self) -> Dict[str, Any]:
+        """Conteo de profesores por estado"""
+        rows = self.conn.execute("SELECT status, COUNT(*) FROM professors GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def close(self):
+        self.conn.close()
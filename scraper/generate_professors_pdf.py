@@ -28,12 +28,18 @@ from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from professor_loader import iter_professors
+
 # Set up matplotlib for better PDF output
 plt.rcParams['font.family'] = 'DejaVu Sans'
 plt.rcParams['font.size'] = 10
 plt.rcParams['figure.dpi'] = 300
 plt.rcParams['savefig.dpi'] = 300
 
+# Fields needed by the title/summary pages and the demo scripts; the rest is re-read per page
+SUMMARY_FIELDS = ('nombre', 'universidad', 'n_reviews', 'bayes_analysis',
+                  'recommendation_analysis', 'integrity_analysis')
+
 class ProfessorPDFGenerator:
     """Professional PDF generator for professor evaluation data."""
     
@@ -53,25 +59,41 @@ class ProfessorPDFGenerator:
         }
         
     def load_professor_data(self):
-        """Load all professor JSON files from the data folder."""
+        """Load a summary of every professor JSON file in the data folder.
+        
+        Files are streamed (see professor_loader); only SUMMARY_FIELDS are kept in
+        memory and full profiles are re-read one at a time while rendering pages.
+        """
         print("Loading professor data...")
-        json_files = list(self.data_folder.glob("*.json"))
-        
-        for file_path in json_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # Skip invalid or empty files
-                    if 'nombre' in data and 'universidad' in data:
-                        self.professors_data.append(data)
-                    else:
-                        print(f"Skipping invalid file: {file_path.name}")
-            except (json.JSONDecodeError, KeyError) as e:
-                print(f"Error loading {file_path.name}: {e}")
+        
+        for record in iter_professors(str(self.data_folder)):
+            if record.error is not None:
+                print(f"Error loading {record.filename}: {record.error}")
+                continue
+            data = record.data
+            # Skip invalid or empty files
+            if 'nombre' in data and 'universidad' in data:
+                summary = {key: data[key] for key in SUMMARY_FIELDS if key in data}
+                summary['_path'] = record.path
+                self.professors_data.append(summary)
+            else:
+                print(f"Skipping invalid file: {record.filename}")
                 
         print(f"Loaded {len(self.professors_data)} professor profiles")
         return len(self.professors_data)
     
+    def iter_full_profiles(self):
+        """Yield full profiles in professors_data order, streamed from disk."""
+        paths = [prof['_path'] for prof in self.professors_data if '_path' in prof]
+        records = iter_professors(paths=paths)
+        for prof in self.professors_data:
+            if '_path' not in prof:
+                yield prof
+                continue
+            record = next(records)
+            yield record.data if record.error is None else prof
+        records.close()
+    
     def get_rating_color(self, rating):
         """Get color based on rating value."""
         if rating is None:
@@ -480,7 +502,7 @@ class ProfessorPDFGenerator:
             
             # Individual professor pages
             print("Creating individual professor pages...")
-            for i, prof_data in enumerate(self.professors_data):
+            for i, prof_data in enumerate(self.iter_full_profiles()):
                 print(f"Processing professor {i+1}/{len(self.professors_data)}: {prof_data.get('nombre', 'Unknown')}")
                 self.create_professor_page(prof_data, pdf, i + 3)
         
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Descarga directa por HTTP de páginas de Mis Profesores
+Usa una sesión de requests con keep-alive, compresión y reintentos, sin navegador.
+Cada intento reserva turno en un AdaptiveRateController y le informa la latencia,
+el código de estado y los timeouts.
+"""
+
+import time
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from rate_limiter import AdaptiveRateController
+
+
+# Marcadores que solo aparecen en un perfil real renderizado por el servidor
+# (una página de bloqueo o de verificación anti-bots no los contiene)
+PROFILE_MARKERS = ('prof_headers', 'profesor_info_div')
+
+# Respuestas que se reintentan (con el ritmo que marque el controlador)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class HttpFetcher:
+    """Cliente HTTP con pool de conexiones para perfiles y páginas de reseñas"""
+
+    def __init__(self, user_agent: str, pool_size: int = 10, retries: int = 3,
+                 backoff: float = 0.5, timeout: float = 20.0,
+                 rate_controller: Optional[AdaptiveRateController] = None):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.rate_controller = rate_controller
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': user_agent,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'es-MX,es;q=0.9',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+        })
+
+        # urllib3 solo reintenta errores de conexión; los 429/5xx se reintentan en fetch
+        # para que el controlador de ritmo los vea
+        retry = Retry(total=retries, connect=retries, read=0, status=0,
+                      backoff_factor=backoff, allowed_methods=('GET',))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def fetch(self, url: str) -> Optional[str]:
+        """Descarga `url` y devuelve el HTML, o None si la petición falla"""
+        for attempt in range(self.retries + 1):
+            if self.rate_controller:
+                self.rate_controller.acquire()
+            start = time.monotonic()
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+            except requests.Timeout as e:
+                self._record(time.monotonic() - start, timeout=True)
+                if attempt < self.retries:
+                    self._backoff(attempt)
+                    continue
+                print(f"   ⚠️ Timeout HTTP en {url}: {e}")
+                return None
+            except requests.RequestException as e:
+                print(f"   ⚠️ Error HTTP en {url}: {e}")
+                return None
+
+            self._record(time.monotonic() - start, status=response.status_code,
+                         retry_after=self._retry_after(response))
+            if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                self._backoff(attempt)
+                continue
+            try:
+                response.raise_for_status()
+                return self._decode(response)
+            except requests.RequestException as e:
+                print(f"   ⚠️ Error HTTP en {url}: {e}")
+                return None
+        return None
+
+    def _record(self, latency: float, status: Optional[int] = None, timeout: bool = False,
+                retry_after: Optional[float] = None):
+        if self.rate_controller:
+            self.rate_controller.record(latency, status=status, timeout=timeout, retry_after=retry_after)
+
+    def _backoff(self, attempt: int):
+        """Sin controlador se espera de forma exponencial; con él, su ritmo ya frena el reintento"""
+        if not self.rate_controller:
+            time.sleep(self.backoff * (2 ** attempt))
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        """Segundos del encabezado Retry-After, si viene como número"""
+        value = response.headers.get('Retry-After', '')
+        try:
+            return float(value) if value else None
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _decode(response: requests.Response) -> str:
+        """Texto de la respuesta; sin charset en Content-Type se asume UTF-8
+
+        requests usa ISO-8859-1 cuando el encabezado no declara charset, lo que
+        convierte 'Matemáticas' en 'MatemÃ¡ticas'. Si el cuerpo no es UTF-8 válido se
+        usa la codificación que detecta requests.
+        """
+        if response.encoding and 'charset' in response.headers.get('Content-Type', '').lower():
+            return response.text
+        try:
+            return response.content.decode('utf-8')
+        except UnicodeDecodeError:
+            response.encoding = response.apparent_encoding
+            return response.text
+
+    @staticmethod
+    def is_valid_profile_html(html: Optional[str]) -> bool:
+        """Verifica que el HTML sea un perfil de profesor y no una página de error"""
+        return bool(html) and any(marker in html for marker in PROFILE_MARKERS)
+
+    def close(self):
+        """Cierra las conexiones del pool"""
+        self.session.close()
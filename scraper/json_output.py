@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Serialización JSON de los resultados del análisis
+Los tipos de NumPy se convierten en el hook `default` del codificador, sin reconstruir
+cada dict y lista antes de escribir. La salida indentada usa json estándar (mismos bytes
+de siempre); la compacta usa orjson cuando está instalado.
+"""
+
+import json
+from typing import Any
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # Opcional: json estándar como respaldo
+    orjson = None
+
+
+def to_builtin(o: Any) -> Any:
+    """Hook `default`: NumPy a tipos nativos (escalares numéricos como float, como antes)
+
+    np.bool_ se escribe como 0/1. Los bool de Python no pasan por el hook y salen como
+    true/false; el antiguo make_serializable los convertía a 0/1, pero el análisis no
+    produce ninguno (advanced_analysis_results.json y out/ no tienen true ni false).
+    """
+    if isinstance(o, (np.integer, np.floating)):
+        return float(o)
+    if isinstance(o, np.ndarray):
+        return o.tolist()
+    if isinstance(o, np.bool_):
+        return int(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def dumps_indented(obj: Any) -> str:
+    """JSON con indent=2 y sin escapar acentos"""
+    return json.dumps(obj, ensure_ascii=False, indent=2, default=to_builtin)
+
+
+def dumps_compact(obj: Any) -> bytes:
+    """JSON minificado en UTF-8; con orjson si está disponible
+
+    orjson escribe los flotantes muy grandes o pequeños sin el cero del exponente
+    (1e-5 en lugar de 1e-05): el valor es el mismo, los bytes no.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=to_builtin, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=to_builtin).encode('utf-8')
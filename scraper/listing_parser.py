@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Extracción de la tabla de profesores de la página de una escuela
+Toda la tabla se lee en una sola llamada al navegador (LISTING_ROWS_JS) o se parsea
+con lxml a partir del HTML ya descargado; el filtrado de filas es común a los dos.
+También calcula cuántas páginas tiene el listado a partir de su paginación.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+import lxml.html
+from lxml import etree
+
+
+# Selector de las filas de la tabla de profesores
+LISTING_ROWS_SELECTOR = 'table tbody tr'
+
+# Para page.eval_on_selector_all(LISTING_ROWS_SELECTOR, ...): por fila, el número de
+# celdas, el enlace (href, texto) de las columnas 2 y 3 y el texto de las columnas 4 a 6
+LISTING_ROWS_JS = """
+rows => rows.map(row => {
+    const cells = Array.from(row.querySelectorAll('td'));
+    return {
+        cells: cells.length,
+        links: cells.slice(1, 3).map(cell => {
+            const link = cell.querySelector('a');
+            return link ? [link.getAttribute('href'), link.innerText] : null;
+        }),
+        texts: cells.slice(3, 6).map(cell => cell.innerText),
+    };
+})
+"""
+
+# Enlaces de la paginación del listado: [href, texto] de cada uno
+LISTING_PAGINATION_SELECTOR = '.pagination a, .pager a'
+LISTING_PAGES_JS = "links => links.map(link => [link.getAttribute('href'), link.innerText])"
+
+_PAGE_PARAM_RE = re.compile(r'[?&]page=(\d+)')
+
+_ROWS = etree.XPath('//table//tbody//tr')
+_PAGINATION = etree.XPath(
+    "//*[contains(concat(' ', normalize-space(@class), ' '), ' pagination ')"
+    " or contains(concat(' ', normalize-space(@class), ' '), ' pager ')]//a"
+)
+_CELLS = etree.XPath('.//td')
+_FIRST_LINK = etree.XPath('(.//a)[1]')
+
+
+def parse_listing_html(html: str) -> List[Dict[str, Any]]:
+    """Filas de la tabla con la misma forma que devuelve LISTING_ROWS_JS
+
+    text_content() no aplica el CSS como innerText, pero tras strip() coincide
+    en las celdas de esta tabla.
+    """
+    rows = []
+    for row in _ROWS(lxml.html.fromstring(html)):
+        cells = _CELLS(row)
+        links = []
+        for cell in cells[1:3]:
+            found = _FIRST_LINK(cell)
+            links.append([found[0].get('href'), found[0].text_content()] if found else None)
+        rows.append({
+            'cells': len(cells),
+            'links': links,
+            'texts': [cell.text_content() for cell in cells[3:6]],
+        })
+    return rows
+
+
+def parse_listing_pagination(html: str) -> List[List[Optional[str]]]:
+    """Enlaces de la paginación con la misma forma que devuelve LISTING_PAGES_JS"""
+    return [[link.get('href'), link.text_content()] for link in _PAGINATION(lxml.html.fromstring(html))]
+
+
+def listing_page_count(links: Iterable[List[Optional[str]]]) -> int:
+    """Número de páginas del listado: el mayor `page=N` o número visible en la paginación"""
+    total = 1
+    for href, text in links:
+        match = _PAGE_PARAM_RE.search(href or '')
+        if match:
+            total = max(total, int(match.group(1)))
+        text = (text or '').strip()
+        if text.isdigit():
+            total = max(total, int(text))
+    return total
+
+
+def listing_page_url(school_url: str, page_num: int) -> str:
+    """URL de la página `page_num` del listado (la primera es la de la escuela)"""
+    return school_url if page_num <= 1 else f"{school_url}?page={page_num}"
+
+
+def professors_from_rows(rows: Iterable[Dict[str, Any]], base_url: str,
+                         max_professors: Optional[int] = None) -> List[Dict[str, str]]:
+    """Profesores de las filas extraídas: primer enlace válido de las columnas 2 y 3
+
+    Se omiten las filas con menos de 6 celdas y los enlaces que no apuntan a un
+    perfil o cuyo texto es '.'.
+    """
+    professors = []
+    for row in rows:
+        if row['cells'] < 6:
+            continue
+
+        # Los enlaces de profesores están en las columnas 2 y 3 (índices 1 y 2)
+        professor_links = []
+        for link in row['links']:
+            if not link:
+                continue
+            href, name = link[0], (link[1] or '').strip()
+            if href and name and 'profesores' in href and name != '.':
+                professor_links.append((name, href))
+
+        if not professor_links:
+            continue
+
+        name, href = professor_links[0]
+        department, ratings, average = (text.strip() for text in row['texts'])
+        professors.append({
+            'name': name,
+            'url': href if href.startswith('http') else f"{base_url}{href}",
+            'department': department,
+            'ratings': ratings,
+            'average': average
+        })
+
+        # Limitar al número máximo de profesores si se especifica
+        if max_professors and len(professors) >= max_professors:
+            break
+
+    return professors
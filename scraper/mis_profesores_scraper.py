@@ -17,14 +17,17 @@ from playwright.sync_api import sync_playwright, Page, Browser
 from bs4 import BeautifulSoup
 from fake_useragent import UserAgent
 
+from scraper_final import DEFAULT_SCHOOL, school_display_name
+
 
 class MisProfesoresScraper:
     """Scraper principal para Mis Profesores"""
     
-    def __init__(self):
+    def __init__(self, school: str = DEFAULT_SCHOOL, output_dir: str = "profesores_json"):
         self.base_url = "https://www.misprofesores.com"
-        self.universidad = "Instituto Tecnológico de Culiacán"
-        self.output_dir = "profesores_json"
+        self.universidad = school_display_name(school)
+        self.school_url = f"{self.base_url}/escuelas/{school}"
+        self.output_dir = output_dir
         self.ua = UserAgent()
         self.total_professors = 0
         self.current_professor = 0
@@ -112,7 +115,7 @@ class MisProfesoresScraper:
         """Obtiene los enlaces a los perfiles de profesores de una página específica"""
         try:
             if page_num > 1:
-                page_url = f"{self.base_url}/escuelas/Instituto-Tecnologico-de-Culiacan_1642?page={page_num}"
+                page_url = f"{self.school_url}?page={page_num}"
                 page.goto(page_url)
                 time.sleep(self.get_random_delay())
             
@@ -492,7 +495,7 @@ class MisProfesoresScraper:
             page = context.new_page()
             
             # Ir a la página principal
-            main_url = f"{self.base_url}/escuelas/Instituto-Tecnologico-de-Culiacan_1642"
+            main_url = self.school_url
             print(f"🌐 Navegando a: {main_url}")
             
             page.goto(main_url)
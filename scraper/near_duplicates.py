@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Detección de reseñas casi duplicadas en todo el corpus
+Los candidatos salen de MinHash + LSH sobre los términos (palabras y pares de palabras)
+presentes en cada fila TF-IDF; cada candidato se confirma con la similitud coseno.
+Así no se compara cada par de comentarios y se detectan también copias entre profesores.
+"""
+
+import hashlib
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Primo de Mersenne 2^31 - 1: a*x + b cabe en uint64 sin desbordarse
+_PRIME = (1 << 31) - 1
+
+
+class NearDuplicateIndex:
+    """Pares de comentarios con similitud coseno > threshold y sus grupos (componentes conexas)
+
+    normalized, vectors (filas TF-IDF L2-normalizadas), owners (profesor de cada fila) y
+    keys (huella de cada reseña; por defecto, el texto) están alineados. Los textos
+    idénticos se agrupan antes de firmar, así que LSH solo compara textos distintos.
+    El id de cada grupo es un hash de las huellas de sus miembros: es el mismo en otra
+    corrida mientras el grupo tenga las mismas reseñas.
+    """
+
+    def __init__(self, normalized: Sequence[str], vectors, owners: Sequence[int],
+                 keys: Optional[Sequence[str]] = None, threshold: float = 0.9,
+                 num_perm: int = 128, bands: int = 32, seed: int = 42):
+        self.threshold = threshold
+        self.owners = np.asarray(owners, dtype=np.int64)
+        self.keys = keys if keys is not None else normalized
+        self.cluster = np.full(len(normalized), -1, dtype=np.int64)  # grupo de cada fila (-1: ninguno)
+        self.clusters: List[np.ndarray] = []
+        self.cluster_ids: List[str] = []
+        self.pair_counts: Counter = Counter()  # pares duplicados dentro de cada profesor
+        self._by_owner: Dict[int, List[Tuple[int, int, List[int]]]] = defaultdict(list)
+        if vectors is None or not len(normalized):
+            return
+
+        # Comentarios con vector no nulo (solo stopwords no cuentan), agrupados por texto
+        has_vector = np.diff(vectors.indptr) > 0
+        text_of_row = np.full(len(normalized), -1, dtype=np.int64)
+        text_ids: Dict[str, int] = {}
+        reps = []
+        for i in np.flatnonzero(has_vector):
+            tid = text_ids.setdefault(normalized[i], len(text_ids))
+            if tid == len(reps):
+                reps.append(i)
+            text_of_row[i] = tid
+
+        counts: Dict[int, Counter] = defaultdict(Counter)  # texto -> profesor -> filas
+        for tid, owner in zip(text_of_row[has_vector].tolist(), self.owners[has_vector].tolist()):
+            counts[tid][owner] += 1
+
+        edges = self._similar_texts(vectors[reps], num_perm, bands, seed)
+
+        # Pares dentro de cada profesor: copias exactas más pares de textos similares
+        for per_owner in counts.values():
+            for owner, c in per_owner.items():
+                self.pair_counts[owner] += c * (c - 1) // 2
+        for u, v in edges:
+            for owner, c in counts[u].items():
+                self.pair_counts[owner] += c * counts[v].get(owner, 0)
+
+        # Componentes conexas de textos (union-find)
+        parent = list(range(len(reps)))
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for u, v in edges:
+            ru, rv = find(u), find(v)
+            if ru != rv:
+                parent[max(ru, rv)] = min(ru, rv)
+
+        root_of_row = np.full(len(normalized), -1, dtype=np.int64)
+        roots = np.asarray([find(t) for t in range(len(reps))], dtype=np.int64)
+        root_of_row[has_vector] = roots[text_of_row[has_vector]]
+        valid = np.flatnonzero(has_vector)
+        order = valid[np.argsort(root_of_row[valid], kind='stable')]
+        _, starts = np.unique(root_of_row[order], return_index=True)
+        groups = [g for g in np.split(order, starts[1:]) if len(g) > 1]
+        groups.sort(key=lambda g: g[0])  # Orden de salida: por la primera fila del grupo
+
+        for position, rows in enumerate(groups):
+            cid = self._cluster_id(rows)
+            self.clusters.append(rows)
+            self.cluster_ids.append(cid)
+            self.cluster[rows] = position
+            members = Counter(self.owners[rows].tolist())
+            for owner, c in members.items():
+                others = sorted(o for o in members if o != owner)
+                if c > 1 or others:
+                    self._by_owner[owner].append((cid, c, others))
+
+    def _cluster_id(self, rows: np.ndarray) -> str:
+        """Hash de las huellas ordenadas de los miembros; no depende de la posición del grupo"""
+        content = '\x1f'.join(sorted(str(self.keys[r]) for r in rows.tolist()))
+        return hashlib.blake2b(content.encode('utf-8'), digest_size=8).hexdigest()
+
+    def _similar_texts(self, vectors, num_perm: int, bands: int, seed: int) -> List[Tuple[int, int]]:
+        """Pares (u, v) de textos distintos con coseno > threshold"""
+        if vectors.shape[0] < 2:
+            return []
+        rng = np.random.default_rng(seed)
+        a = rng.integers(1, _PRIME, num_perm, dtype=np.uint64)
+        b = rng.integers(0, _PRIME, num_perm, dtype=np.uint64)
+
+        # Firma MinHash del conjunto de columnas no nulas de cada fila
+        signatures = np.empty((vectors.shape[0], num_perm), dtype=np.uint64)
+        for k in range(vectors.shape[0]):
+            h = vectors.indices[vectors.indptr[k]:vectors.indptr[k + 1]].astype(np.uint64)
+            signatures[k] = ((np.outer(a, h) + b[:, None]) % _PRIME).min(axis=1)
+
+        # Candidatos: textos que coinciden en todas las filas de al menos una banda
+        rows_per_band = num_perm // bands
+        candidates = []
+        for band in range(bands):
+            keys = signatures[:, band * rows_per_band:(band + 1) * rows_per_band]
+            _, inverse, sizes = np.unique(keys, axis=0, return_inverse=True, return_counts=True)
+            inverse = inverse.ravel()
+            if sizes.max() < 2:
+                continue
+            order = np.argsort(inverse, kind='stable')
+            for bucket in np.split(order, np.cumsum(sizes)[:-1]):
+                if len(bucket) > 1:
+                    i, j = np.triu_indices(len(bucket), k=1)
+                    candidates.append(np.stack([bucket[i], bucket[j]], axis=1))
+        if not candidates:
+            return []
+        pairs = np.unique(np.sort(np.concatenate(candidates), axis=1), axis=0)
+
+        # Verificación exacta: producto punto de filas L2-normalizadas
+        sims = np.asarray(vectors[pairs[:, 0]].multiply(vectors[pairs[:, 1]]).sum(axis=1)).ravel()
+        return [tuple(p) for p in pairs[sims > self.threshold].tolist()]
+
+    def pairs_within(self, owner: int) -> int:
+        """Pares de comentarios casi duplicados dentro de un profesor"""
+        return self.pair_counts.get(owner, 0)
+
+    def clusters_for(self, owner: int) -> List[Tuple[str, int, List[int]]]:
+        """(grupo, filas del profesor, otros profesores) de los grupos en que participa"""
+        return self._by_owner.get(owner, [])
+
+    def cross_clusters(self) -> List[Tuple[str, np.ndarray]]:
+        """Grupos con comentarios de más de un profesor"""
+        return [(cid, rows) for cid, rows in zip(self.cluster_ids, self.clusters)
+                if len(np.unique(self.owners[rows])) > 1]
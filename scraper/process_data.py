@@ -7,9 +7,12 @@ Combina todos los archivos JSON en uno solo y genera estadísticas.
 import os
 import json
 import glob
-from typing import Dict, List, Any
+import shutil
+from typing import Dict, Iterator, List, Any
 from datetime import datetime
 
+from professor_loader import iter_professors
+
 
 class DataProcessor:
     """Procesador de datos extraídos"""
@@ -17,7 +20,8 @@ class DataProcessor:
     def __init__(self, input_dir: str = "profesores_json", output_file: str = "profesores_completos.json"):
         self.input_dir = input_dir
         self.output_file = output_file
-        self.professors_data = []
+        self.json_files: List[str] = []
+        self.valid_professors = 0
         self.stats = {
             "total_professors": 0,
             "total_reviews": 0,
@@ -29,32 +33,33 @@ class DataProcessor:
         }
     
     def load_all_professors(self) -> bool:
-        """Carga todos los archivos JSON de profesores"""
+        """Localiza los archivos JSON de profesores (se leen en streaming en cada pasada)"""
         try:
-            json_files = glob.glob(os.path.join(self.input_dir, "*.json"))
+            self.json_files = glob.glob(os.path.join(self.input_dir, "*.json"))
             
-            if not json_files:
+            if not self.json_files:
                 print(f"❌ No se encontraron archivos JSON en {self.input_dir}")
                 return False
             
-            print(f"📁 Cargando {len(json_files)} archivos de profesores...")
-            
-            for file_path in json_files:
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        professor_data = json.load(f)
-                        self.professors_data.append(professor_data)
-                except Exception as e:
-                    print(f"⚠️ Error cargando {file_path}: {e}")
-            
-            self.stats["total_professors"] = len(self.professors_data)
-            print(f"✅ Cargados {self.stats['total_professors']} profesores")
+            print(f"📁 Cargando {len(self.json_files)} archivos de profesores...")
             return True
             
         except Exception as e:
             print(f"❌ Error cargando archivos: {e}")
             return False
     
+    def iter_professors(self) -> Iterator[Dict[str, Any]]:
+        """Recorre los profesores sin cargarlos todos en memoria"""
+        unreadable = set()
+        for record in iter_professors(paths=self.json_files):
+            if record.error is not None:
+                print(f"⚠️ Error cargando {record.path}: {record.error}")
+                unreadable.add(record.path)
+                continue
+            yield record.data
+        # Los ilegibles se reportan una sola vez: las siguientes pasadas ya no los leen
+        self.json_files = [path for path in self.json_files if path not in unreadable]
+    
     def validate_professor_data(self, professor: Dict[str, Any]) -> bool:
         """Valida que los datos del profesor sean correctos"""
         required_fields = ["nombre", "universidad", "departamento"]
@@ -110,95 +115,145 @@ class DataProcessor:
         
         return cleaned
     
-    def calculate_statistics(self):
-        """Calcula estadísticas de los datos"""
-        print("📊 Calculando estadísticas...")
+    @staticmethod
+    def _empty_totals() -> Dict[str, Any]:
+        """Acumuladores de calculate_statistics"""
+        return {
+            "total_professors": 0,
+            "valid_professors": 0,
+            "total_rating": 0,
+            "total_reviews": 0,
+            "departments": {},
+            "tags_frequency": {},
+            "rating_distribution": {},
+            "review_years": {}
+        }
+    
+    def _accumulate_statistics(self, totals: Dict[str, Any], professor: Dict[str, Any]):
+        """Suma un profesor a los acumuladores de estadísticas"""
+        totals["total_professors"] += 1
+        if self.validate_professor_data(professor):
+            totals["valid_professors"] += 1
         
-        total_rating = 0
-        total_reviews = 0
-        departments = {}
-        tags_frequency = {}
-        rating_distribution = {}
-        review_years = {}
+        # Estadísticas de departamentos
+        departments = totals["departments"]
+        dept = professor.get("departamento", "Sin departamento")
+        departments[dept] = departments.get(dept, 0) + 1
         
-        for professor in self.professors_data:
-            # Estadísticas de departamentos
-            dept = professor.get("departamento", "Sin departamento")
-            departments[dept] = departments.get(dept, 0) + 1
-            
-            # Estadísticas de calificaciones
-            rating = professor.get("promedio_general", 0)
-            if rating > 0:
-                total_rating += rating
-                rating_bucket = int(rating)
-                rating_distribution[rating_bucket] = rating_distribution.get(rating_bucket, 0) + 1
-            
-            # Estadísticas de reseñas
-            reviews = professor.get("calificaciones", [])
-            total_reviews += len(reviews)
-            
-            # Años de reseñas
-            for review in reviews:
-                date_str = review.get("fecha", "")
-                if date_str and "/" in date_str:
-                    try:
-                        year = date_str.split("/")[-1]
-                        if year.isdigit():
-                            review_years[year] = review_years.get(year, 0) + 1
-                    except:
-                        pass
-            
-            # Frecuencia de etiquetas
-            for tag in professor.get("etiquetas", []):
-                tags_frequency[tag] = tags_frequency.get(tag, 0) + 1
+        # Estadísticas de calificaciones
+        rating = professor.get("promedio_general", 0)
+        if rating > 0:
+            totals["total_rating"] += rating
+            rating_bucket = int(rating)
+            rating_distribution = totals["rating_distribution"]
+            rating_distribution[rating_bucket] = rating_distribution.get(rating_bucket, 0) + 1
+        
+        # Estadísticas de reseñas
+        reviews = professor.get("calificaciones", [])
+        totals["total_reviews"] += len(reviews)
         
-        # Actualizar estadísticas
-        self.stats["total_reviews"] = total_reviews
-        self.stats["average_rating"] = total_rating / len(self.professors_data) if self.professors_data else 0
-        self.stats["departments"] = departments
-        self.stats["tags_frequency"] = dict(sorted(tags_frequency.items(), key=lambda x: x[1], reverse=True)[:20])
-        self.stats["rating_distribution"] = rating_distribution
-        self.stats["review_years"] = dict(sorted(review_years.items()))
+        # Años de reseñas
+        review_years = totals["review_years"]
+        for review in reviews:
+            date_str = review.get("fecha", "")
+            if date_str and "/" in date_str:
+                try:
+                    year = date_str.split("/")[-1]
+                    if year.isdigit():
+                        review_years[year] = review_years.get(year, 0) + 1
+                except:
+                    pass
+        
+        # Frecuencia de etiquetas
+        tags_frequency = totals["tags_frequency"]
+        for tag in professor.get("etiquetas", []):
+            tags_frequency[tag] = tags_frequency.get(tag, 0) + 1
+    
+    def _finish_statistics(self, totals: Dict[str, Any]):
+        """Pasa los acumuladores a self.stats"""
+        total_professors = totals["total_professors"]
+        print(f"✅ Cargados {total_professors} profesores")
+        
+        self.valid_professors = totals["valid_professors"]
+        self.stats["total_professors"] = total_professors
+        self.stats["total_reviews"] = totals["total_reviews"]
+        self.stats["average_rating"] = totals["total_rating"] / total_professors if total_professors else 0
+        self.stats["departments"] = totals["departments"]
+        self.stats["tags_frequency"] = dict(sorted(totals["tags_frequency"].items(), key=lambda x: x[1], reverse=True)[:20])
+        self.stats["rating_distribution"] = totals["rating_distribution"]
+        self.stats["review_years"] = dict(sorted(totals["review_years"].items()))
+    
+    def calculate_statistics(self):
+        """Calcula estadísticas de los datos sin escribir el archivo combinado"""
+        print("📊 Calculando estadísticas...")
+        totals = self._empty_totals()
+        for professor in self.iter_professors():
+            self._accumulate_statistics(totals, professor)
+        self._finish_statistics(totals)
     
     def save_combined_data(self) -> bool:
-        """Guarda todos los datos combinados en un archivo"""
+        """Calcula las estadísticas y guarda todos los datos combinados en un archivo
+        
+        Cada archivo se lee una sola vez: los profesores se limpian y escriben uno por
+        uno (mismo formato que json.dump con indent=2) en un archivo temporal mientras
+        se acumulan las estadísticas. Como metadata y statistics van antes que la lista,
+        al final se escriben ellas y se copia la lista desde el temporal. Los profesores
+        nunca están todos en memoria.
+        """
+        print("📊 Calculando estadísticas...")
+        professors_tmp = self.output_file + ".profesores.tmp"
         try:
-            # Filtrar y limpiar datos
-            valid_professors = []
+            totals = self._empty_totals()
+            written = 0
             invalid_count = 0
-            
-            for professor in self.professors_data:
-                if self.validate_professor_data(professor):
+            with open(professors_tmp, 'w', encoding='utf-8') as tmp:
+                # Filtrar y limpiar datos
+                for professor in self.iter_professors():
+                    self._accumulate_statistics(totals, professor)
+                    if not self.validate_professor_data(professor):
+                        invalid_count += 1
+                        continue
                     cleaned_professor = self.clean_professor_data(professor)
-                    valid_professors.append(cleaned_professor)
-                else:
-                    invalid_count += 1
-            
-            if invalid_count > 0:
-                print(f"⚠️ {invalid_count} profesores con datos inválidos fueron excluidos")
+                    tmp.write(',\n    ' if written else '\n    ')
+                    tmp.write(self._dump_nested(cleaned_professor, 4))
+                    written += 1
+            self._finish_statistics(totals)
             
             # Crear archivo combinado
-            combined_data = {
-                "metadata": {
-                    "generated_at": datetime.now().isoformat(),
-                    "total_professors": len(valid_professors),
-                    "university": "Instituto Tecnológico de Culiacán",
-                    "source": "Mis Profesores"
-                },
-                "statistics": self.stats,
-                "professors": valid_professors
+            metadata = {
+                "generated_at": datetime.now().isoformat(),
+                "total_professors": self.valid_professors,
+                "university": "Instituto Tecnológico de Culiacán",
+                "source": "Mis Profesores"
             }
             
             with open(self.output_file, 'w', encoding='utf-8') as f:
-                json.dump(combined_data, f, ensure_ascii=False, indent=2)
+                f.write('{\n')
+                f.write(f'  "metadata": {self._dump_nested(metadata, 2)},\n')
+                f.write(f'  "statistics": {self._dump_nested(self.stats, 2)},\n')
+                f.write('  "professors": [')
+                with open(professors_tmp, 'r', encoding='utf-8') as tmp:
+                    shutil.copyfileobj(tmp, f)
+                f.write('\n  ]\n}' if written else ']\n}')
+            
+            if invalid_count > 0:
+                print(f"⚠️ {invalid_count} profesores con datos inválidos fueron excluidos")
             
             print(f"✅ Datos combinados guardados en {self.output_file}")
-            print(f"📊 {len(valid_professors)} profesores válidos procesados")
+            print(f"📊 {written} profesores válidos procesados")
             return True
             
         except Exception as e:
             print(f"❌ Error guardando datos combinados: {e}")
             return False
+        finally:
+            if os.path.exists(professors_tmp):
+                os.remove(professors_tmp)
+    
+    @staticmethod
+    def _dump_nested(obj: Any, level: int) -> str:
+        """JSON con indent=2 para insertarlo a `level` espacios de profundidad"""
+        return json.dumps(obj, ensure_ascii=False, indent=2).replace('\n', '\n' + ' ' * level)
     
     def save_statistics_report(self) -> bool:
         """Guarda un reporte de estadísticas"""
@@ -261,10 +316,7 @@ class DataProcessor:
         if not self.load_all_professors():
             return False
         
-        # Calcular estadísticas
-        self.calculate_statistics()
-        
-        # Guardar datos combinados
+        # Calcular estadísticas y guardar datos combinados en una sola pasada
         if not self.save_combined_data():
             return False
         
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Lectura en streaming de los JSON de profesores
+Un generador compartido por el análisis, el procesamiento y el generador de PDF:
+lee los archivos con varios hilos, decodifica con orjson si está instalado y solo
+mantiene en memoria una ventana acotada de registros a la vez.
+"""
+
+import hashlib
+import json
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+try:
+    import orjson
+except ImportError:  # Opcional: json estándar como respaldo
+    orjson = None
+
+
+class ProfessorFile(NamedTuple):
+    """Un archivo de profesor ya decodificado (o el error que impidió leerlo)"""
+    prof_id: str
+    path: str
+    data: Optional[Dict[str, Any]]
+    sha256: Optional[str]
+    error: Optional[Exception]
+
+    @property
+    def filename(self) -> str:
+        return os.path.basename(self.path)
+
+
+def decode_json(raw: bytes) -> Any:
+    """Decodifica JSON con orjson si está disponible; si lo rechaza (p. ej. NaN), con json"""
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(raw.decode('utf-8'))
+
+
+def list_professor_files(directory: str) -> List[str]:
+    """Rutas de los JSON de un directorio, en el orden del sistema de archivos"""
+    return [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.json')]
+
+
+def _read(path: str, with_hash: bool) -> ProfessorFile:
+    prof_id = os.path.basename(path).replace('.json', '')
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest() if with_hash else None
+        return ProfessorFile(prof_id, path, decode_json(raw), digest, None)
+    except Exception as e:
+        return ProfessorFile(prof_id, path, None, None, e)
+
+
+def iter_professors(directory: Optional[str] = None, paths: Optional[Iterable[str]] = None,
+                    workers: int = 4, window: int = 64, with_hash: bool = False) -> Iterator[ProfessorFile]:
+    """Genera los profesores de `directory` (o de `paths`) en orden, leyendo en paralelo
+
+    Como máximo `window` archivos están leídos o en lectura a la vez, así que la
+    memoria no crece con el tamaño del corpus. Los errores no cortan el recorrido:
+    se entregan en `error` para que cada consumidor los reporte a su manera.
+    """
+    paths = list_professor_files(directory) if paths is None else list(paths)
+    window = max(1, window)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        pending = deque()
+        for path in paths:
+            pending.append(pool.submit(_read, path, with_hash))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
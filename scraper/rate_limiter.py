@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Control de ritmo de peticiones para el scraper de Mis Profesores
+Limita la concurrencia por host y ajusta la tasa de peticiones (AIMD) según la
+latencia, los códigos 429/5xx y los timeouts observados.
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Any
+from urllib.parse import urlparse
+
+
+class AdaptiveRateController:
+    """Cubeta de tokens con tasa adaptativa: sube de forma aditiva y baja de forma multiplicativa
+
+    Es segura entre hilos, así que la comparten el modo secuencial, los hilos de
+    descarga HTTP y el motor asíncrono.
+    """
+
+    def __init__(self, requests_per_second: float = 2.0, min_rate: float = 0.25, max_rate: float = 8.0,
+                 burst: int = 2, increase: float = 0.1, decrease: float = 0.5,
+                 latency_threshold: float = 3.0):
+        self.min_rate = max(min_rate, 0.01)
+        self.max_rate = max(max_rate, self.min_rate)
+        self.rate = min(max(requests_per_second, self.min_rate), self.max_rate)
+        self.burst = max(1, burst)
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_threshold = latency_threshold
+
+        self._lock = threading.Lock()
+        self._tat = 0.0  # Instante teórico de llegada de la siguiente petición
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self.counters: Dict[str, int] = {
+            'requests': 0, 'ok': 0, 'throttled': 0, 'server_errors': 0, 'timeouts': 0, 'slow': 0,
+        }
+
+    def _reserve(self) -> float:
+        """Reserva el siguiente turno y devuelve cuántos segundos hay que esperar"""
+        with self._lock:
+            now = time.monotonic()
+            interval = 1.0 / self.rate
+            tat = max(self._tat, now)
+            start = max(now, tat - (self.burst - 1) * interval, self._paused_until)
+            self._tat = max(tat, start) + interval
+            self.counters['requests'] += 1
+            return start - now
+
+    def acquire(self):
+        """Bloquea el hilo actual hasta que haya un token disponible"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Versión asíncrona de acquire"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def record(self, latency: float, status: Optional[int] = None, timeout: bool = False,
+               retry_after: Optional[float] = None):
+        """Ajusta la tasa según el resultado de una petición"""
+        with self._lock:
+            now = time.monotonic()
+            if timeout:
+                self.counters['timeouts'] += 1
+            elif status == 429:
+                self.counters['throttled'] += 1
+            elif status is not None and status >= 500:
+                self.counters['server_errors'] += 1
+            elif latency > self.latency_threshold:
+                self.counters['slow'] += 1
+            else:
+                self.counters['ok'] += 1
+                self.rate = min(self.max_rate, self.rate + self.increase)
+                return
+
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+            # Varias peticiones en vuelo pueden fallar por la misma causa: una sola bajada por intervalo
+            if now - self._last_decrease >= max(1.0 / self.rate, latency):
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self._last_decrease = now
+
+    def stats(self) -> Dict[str, Any]:
+        """Tasa actual y contadores de resultados"""
+        with self._lock:
+            return {'rate': round(self.rate, 2), **self.counters}
+
+
+class HostRateLimiter:
+    """Limita peticiones simultáneas por host; el ritmo lo marca un AdaptiveRateController"""
+
+    def __init__(self, max_concurrent: int = 4, controller: Optional[AdaptiveRateController] = None):
+        self.max_concurrent = max(1, max_concurrent)
+        self.controller = controller or AdaptiveRateController()
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        """Crea de forma perezosa el semáforo de un host"""
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphores[host]
+
+    @asynccontextmanager
+    async def limit(self, url: str, pace: bool = True):
+        """Contexto que se mantiene durante toda la petición a `url`
+
+        Con pace=False solo se limita la concurrencia (p. ej. cuando HttpFetcher
+        ya reserva su turno en el controlador en cada intento).
+        """
+        async with self._semaphore(urlparse(url).netloc):
+            if pace:
+                await self.controller.acquire_async()
+            yield
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Prioridad de re-scraping según la frescura esperada de cada profesor
+Estima a qué ritmo llegan reseñas nuevas a cada profesor (historial de `fecha` hasta
+su última descarga, modelo Poisson con un previo Gamma) y ordena la cola por la
+probabilidad de que haya cambiado desde entonces por petición gastada, cortando en
+un presupuesto fijo de peticiones.
+"""
+
+import math
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from review_dates import parse_review_date
+from roster_discovery import KnownRoster, RosterDelta
+
+
+# Ventana de historial que se usa para estimar el ritmo de reseñas
+HISTORY_DAYS = 730
+
+# Previo Gamma: equivale a haber visto media reseña en un año
+PRIOR_REVIEWS = 0.5
+PRIOR_DAYS = 365.0
+
+
+def _listed_reviews(info: Dict[str, str]) -> Optional[int]:
+    """Número de calificaciones de la columna del listado, si se puede leer"""
+    m = re.search(r'\d+', info.get('ratings') or '')
+    return int(m.group()) if m else None
+
+
+def review_history(reviews: List[Dict[str, Any]], crawled_at: datetime) -> Dict[str, Any]:
+    """Resumen del historial que se guarda en la lista conocida al descargar un profesor
+
+    El periodo observado va del inicio de la ventana (o de la primera reseña, si es
+    posterior) hasta la descarga: una descarga sin reseñas nuevas alarga el periodo
+    sin llegadas y baja el ritmo estimado.
+    """
+    window_start = crawled_at - timedelta(days=HISTORY_DAYS)
+    dates = [d for d in (parse_review_date(r.get('fecha')) for r in reviews) if d and d <= crawled_at]
+    recent = [d for d in dates if d >= window_start]
+    observed_from = max(window_start, min(dates)) if dates else window_start
+    return {
+        'crawled_at': crawled_at.isoformat(timespec='seconds'),
+        'reviews': len(reviews),
+        'recent_reviews': len(recent),
+        'observed_days': round((crawled_at - observed_from).total_seconds() / 86400, 2),
+    }
+
+
+def arrival_rate(entry: Dict[str, Any]) -> float:
+    """Reseñas por día esperadas (media posterior Gamma-Poisson)"""
+    return ((entry.get('recent_reviews', 0) + PRIOR_REVIEWS)
+            / (entry.get('observed_days', 0.0) + PRIOR_DAYS))
+
+
+class RecrawlPlan(NamedTuple):
+    """Profesores a descargar en orden de prioridad y lo que se espera obtener"""
+    professors: List[Dict[str, str]]
+    requests: int            # peticiones estimadas
+    expected_changes: float  # profesores con cambios esperados entre los elegidos
+    total_changes: float     # profesores con cambios esperados entre todos los candidatos
+    skipped: int
+
+
+class RecrawlScheduler:
+    """Ordena y acota la cola de profesores por probabilidad de cambio por petición
+
+    Los profesores nuevos, con cambios en el listado o sin historial guardado tienen
+    probabilidad 1. En modo incremental una descarga cuesta la primera página más las
+    páginas extra que ocupan las reseñas nuevas; en modo completo, todas sus páginas.
+    """
+
+    def __init__(self, known: KnownRoster, budget: Optional[int] = None, incremental: bool = False,
+                 reviews_per_page: int = 5, now: Optional[datetime] = None):
+        self.known = known
+        self.budget = budget
+        self.incremental = incremental
+        self.reviews_per_page = max(1, reviews_per_page)
+        self.now = now or datetime.now()
+
+    def days_since_crawl(self, entry: Dict[str, Any]) -> Optional[float]:
+        try:
+            crawled_at = datetime.fromisoformat(entry['crawled_at'])
+        except (KeyError, TypeError, ValueError):
+            return None
+        return max(0.0, (self.now - crawled_at).total_seconds() / 86400)
+
+    def change_probability(self, entry: Optional[Dict[str, Any]]) -> float:
+        """P(al menos una reseña nueva desde la última descarga) = 1 - exp(-ritmo * días)"""
+        days = self.days_since_crawl(entry) if entry else None
+        if days is None:
+            return 1.0
+        return 1.0 - math.exp(-arrival_rate(entry) * days)
+
+    def pages(self, reviews: int) -> int:
+        return max(1, math.ceil(reviews / self.reviews_per_page))
+
+    def cost(self, info: Dict[str, str], entry: Optional[Dict[str, Any]]) -> int:
+        """Peticiones estimadas para descargar al profesor
+
+        El número de calificaciones del listado da el total actual; comparado con el
+        de la última descarga da cuántas reseñas nuevas hay que paginar.
+        """
+        listed = _listed_reviews(info)
+        if entry is None:
+            return self.pages(listed or 0)
+        if self.incremental:
+            if listed is not None and 'reviews' in entry:
+                new_reviews = max(0, listed - entry['reviews'])
+            else:
+                new_reviews = arrival_rate(entry) * (self.days_since_crawl(entry) or 0.0)
+            return 1 + int(new_reviews // self.reviews_per_page)
+        return self.pages(listed if listed is not None else entry.get('reviews', 0))
+
+    def plan(self, delta: RosterDelta) -> RecrawlPlan:
+        """Cola priorizada: sin presupuesto, en modo incremental solo los cambios del listado"""
+        sure = {info['url'] for info in delta.to_crawl}
+        candidates = list(delta.to_crawl)
+        if not self.incremental or self.budget:
+            candidates += delta.unchanged
+
+        scored = []
+        for position, info in enumerate(candidates):
+            entry = self.known.entries.get(info['url'])
+            probability = 1.0 if info['url'] in sure else self.change_probability(entry)
+            cost = self.cost(info, entry)
+            scored.append((-probability / cost, position, probability, cost, info))
+        scored.sort(key=lambda item: item[:2])
+
+        chosen, requests, expected = [], 0, 0.0
+        for _, _, probability, cost, info in scored:
+            if self.budget and requests + cost > self.budget:
+                continue
+            chosen.append(info)
+            requests += cost
+            expected += probability
+        total = sum(item[2] for item in scored)
+        return RecrawlPlan(chosen, requests, expected, total, len(scored) - len(chosen))
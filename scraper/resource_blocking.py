@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Bloqueo de recursos para las páginas de Chromium del scraper de Mis Profesores
+Solo el HTML (y los scripts/XHR del propio sitio) hacen falta para leer los perfiles:
+imágenes, fuentes, CSS, anuncios y analítica se abortan antes de descargarse.
+"""
+
+from urllib.parse import urlparse
+
+
+# Tipos de recurso de Playwright que nunca se necesitan para extraer datos
+BLOCKED_RESOURCE_TYPES = frozenset({
+    'image', 'media', 'font', 'stylesheet', 'texttrack', 'manifest', 'eventsource', 'websocket',
+})
+
+# Dominios de anuncios y analítica (se comparan como sufijo del host)
+BLOCKED_DOMAINS = (
+    'doubleclick.net', 'googlesyndication.com', 'googleadservices.com', 'google-analytics.com',
+    'googletagmanager.com', 'googletagservices.com', 'adservice.google.com', 'amazon-adsystem.com',
+    'facebook.net', 'facebook.com', 'hotjar.com', 'quantserve.com', 'scorecardresearch.com',
+    'criteo.com', 'taboola.com', 'outbrain.com', 'adnxs.com', 'pubmatic.com', 'rubiconproject.com',
+)
+
+# Selector que indica que el perfil ya trae la tabla de reseñas
+PROFILE_READY_SELECTOR = 'table.tftable'
+
+
+def should_block(resource_type: str, url: str, site_host: str) -> bool:
+    """Decide si se aborta una petición: tipos pesados, anuncios y todo lo de terceros salvo el documento"""
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    host = urlparse(url).hostname or ''
+    if any(host == domain or host.endswith('.' + domain) for domain in BLOCKED_DOMAINS):
+        return True
+    site_domain = site_host[4:] if site_host.startswith('www.') else site_host
+    first_party = host == site_domain or host.endswith('.' + site_domain)
+    return resource_type != 'document' and not first_party
+
+
+def install_resource_blocking(context, site_host: str):
+    """Intercepta las peticiones de un BrowserContext síncrono"""
+    def handle(route):
+        request = route.request
+        if should_block(request.resource_type, request.url, site_host):
+            route.abort()
+        else:
+            route.continue_()
+    context.route('**/*', handle)
+
+
+async def install_resource_blocking_async(context, site_host: str):
+    """Intercepta las peticiones de un BrowserContext asíncrono"""
+    async def handle(route):
+        request = route.request
+        if should_block(request.resource_type, request.url, site_host):
+            await route.abort()
+        else:
+            await route.continue_()
+    await context.route('**/*', handle)
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Fechas de las reseñas de Mis Profesores
+El sitio publica las fechas como 28/Dic/2016; los JSON editados a mano o de otras
+fuentes pueden traer formatos numéricos. Lo comparten el análisis avanzado y la
+prioridad de re-scraping.
+"""
+
+import re
+from datetime import datetime
+from typing import Optional
+
+
+# Meses abreviados en español
+MONTHS = {
+    "Ene": 1, "Feb": 2, "Mar": 3, "Abr": 4, "May": 5, "Jun": 6,
+    "Jul": 7, "Ago": 8, "Sep": 9, "Oct": 10, "Nov": 11, "Dic": 12
+}
+
+# Formatos numéricos aceptados si la fecha no viene con el mes abreviado
+NUMERIC_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y', '%Y/%m/%d')
+
+_FECHA_RE = re.compile(r'^(\d{1,2})/([A-Za-z]{3})/(\d{4})$')
+
+
+def parse_review_date(fecha: Optional[str]) -> Optional[datetime]:
+    """Fecha de una reseña (28/Dic/2016 o un formato numérico), o None si no se reconoce"""
+    if not fecha:
+        return None
+    m = _FECHA_RE.match(fecha.strip())
+    if m:
+        d, mon, y = m.groups()
+        mon = mon.title()
+        if mon in MONTHS:
+            try:
+                return datetime(int(y), MONTHS[mon], int(d))
+            except ValueError:
+                return None  # Día imposible (ej. 31/Feb)
+    for fmt in NUMERIC_FORMATS:
+        try:
+            return datetime.strptime(fecha, fmt)
+        except ValueError:
+            continue
+    return None
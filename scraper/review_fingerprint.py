@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Huella estable de reseñas de Mis Profesores
+Calcula un identificador determinista (blake2b) a partir de los campos normalizados
+de una reseña y mantiene un índice global en SQLite para deduplicar entre corridas
+y entre profesores.
+"""
+
+import hashlib
+import re
+import sqlite3
+import unicodedata
+from datetime import datetime
+from typing import Dict, Iterable, List, Any
+
+
+# Campos que identifican una reseña; los votos y etiquetas cambian con el tiempo y no entran
+FINGERPRINT_FIELDS = ('fecha', 'materia', 'puntaje_calidad_general', 'puntaje_facilidad', 'comentario')
+
+_SPACES_RE = re.compile(r'\s+')
+
+
+def _normalize(value: Any) -> str:
+    """Texto en NFC, sin espacios repetidos ni en los extremos; números con un decimal"""
+    if isinstance(value, (int, float)):
+        return f"{float(value):.1f}"
+    text = unicodedata.normalize('NFC', str(value or ''))
+    return _SPACES_RE.sub(' ', text).strip()
+
+
+def review_fingerprint(review: Dict[str, Any]) -> str:
+    """Huella hexadecimal de 32 caracteres, igual en cualquier proceso y corrida"""
+    content = '\x1f'.join(_normalize(review.get(field, '')) for field in FINGERPRINT_FIELDS)
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class FingerprintIndex:
+    """Índice global huella -> profesor respaldado por SQLite
+
+    Cada profesor se identifica por la URL de su perfil: dos profesores con el mismo
+    nombre (en la misma o en otra escuela) no comparten huellas.
+    """
+
+    def __init__(self, path: str = "huellas.sqlite"):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)  # ver CrawlJournal
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # La tabla `reviews` de versiones anteriores usaba el nombre del profesor y se ignora
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS review_owners (
+                   fingerprint TEXT PRIMARY KEY,
+                   professor_url TEXT NOT NULL,
+                   first_seen TEXT
+               )"""
+        )
+        self.conn.commit()
+
+    def owner(self, fingerprint: str):
+        """URL del profesor al que se asignó primero la reseña, o None si no se ha visto"""
+        row = self.conn.execute("SELECT professor_url FROM review_owners WHERE fingerprint = ?",
+                                (fingerprint,)).fetchone()
+        return row[0] if row else None
+
+    def register(self, professor_url: str, fingerprints: Iterable[str]) -> List[str]:
+        """Registra las huellas del profesor de `professor_url` y devuelve las que ya pertenecían a otro"""
+        fingerprints = list(fingerprints)
+        foreign = []
+        for start in range(0, len(fingerprints), 500):
+            chunk = fingerprints[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            foreign.extend(
+                row[0] for row in self.conn.execute(
+                    f"SELECT fingerprint FROM review_owners WHERE professor_url != ? AND fingerprint IN ({placeholders})",
+                    (professor_url, *chunk)
+                )
+            )
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO review_owners (fingerprint, professor_url, first_seen) VALUES (?, ?, ?)",
+                [(fp, professor_url, now) for fp in fingerprints]
+            )
+        return foreign
+
+    def close(self):
+        self.conn.close()
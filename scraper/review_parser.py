@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Parser rápido de páginas de reseñas de Mis Profesores basado en lxml
+Recorre una sola vez cada fila de `table.tftable` y extrae todos los campos,
+con la misma salida que MisProfesoresScraperFinal.extract_reviews_from_page.
+"""
+
+import re
+from typing import Callable, Dict, List, Tuple, Any
+
+import lxml.html
+from lxml import etree
+
+
+# Campos de cada reseña en el orden del JSON de salida: (clave, selector CSS, tipo)
+REVIEW_FIELDS = [
+    ('fecha', 'td.rating .date', 'text'),
+    ('tipo_calificacion', 'td.rating .rating-type', 'text'),
+    ('puntaje_calidad_general', 'td.rating .descriptor-container:nth-of-type(1) .score', 'number'),
+    ('puntaje_facilidad', 'td.rating .descriptor-container:nth-of-type(2) .score', 'number'),
+    ('materia', 'td.class .name .response', 'text'),
+    ('asistencia', 'td.class .attendance .response', 'text'),
+    ('calificacion_recibida', 'td.class .grade .response', 'text'),
+    ('interes_clase', 'td.class .grade:nth-of-type(2) .response', 'text'),
+    ('comentario', 'td.comments p.commentsParagraph', 'text'),
+    ('etiquetas_comentario', 'td.comments .tagbox span', 'list'),
+    ('votos_utiles', 'a.votar_icon.helpful span.count', 'text'),
+    ('votos_no_utiles', 'a.votar_icon.nothelpful span.count', 'text'),
+]
+
+# Clave con la huella estable de cada reseña (ver review_fingerprint.py)
+FINGERPRINT_KEY = 'huella'
+
+
+_STEP_RE = re.compile(r'^([a-z][a-z0-9]*)?((?:\.[\w-]+)*)(?::nth-of-type\((\d+)\))?$')
+_NUMBER_RE = re.compile(r'[\d.]+')
+
+# Filas de la tabla: primero las de tbody; si no hay tbody, todas menos la cabecera
+_TBODY_ROWS = etree.XPath("//table[contains(concat(' ', normalize-space(@class), ' '), ' tftable ')]//tbody//tr")
+_ALL_ROWS = etree.XPath("//table[contains(concat(' ', normalize-space(@class), ' '), ' tftable ')]//tr")
+_PAGINATION_LISTS = etree.XPath("//nav//ul[contains(concat(' ', normalize-space(@class), ' '), ' pagination ')]")
+_NAV_RE = re.compile(r'<nav\b.*?</nav\s*>', re.S | re.I)
+_PAGINATION_LINKS = etree.XPath(
+    "(//nav//ul[contains(concat(' ', normalize-space(@class), ' '), ' pagination ')])[1]//li//a[not(@aria-label)]"
+)
+
+
+class _Step:
+    """Un paso compuesto de un selector CSS: tag, clases y :nth-of-type opcional"""
+
+    __slots__ = ('tag', 'classes', 'nth')
+
+    def __init__(self, text: str):
+        match = _STEP_RE.match(text)
+        if not match:
+            raise ValueError(f"Selector no soportado: {text}")
+        tag, classes, nth = match.groups()
+        self.tag = tag
+        self.classes = frozenset(c for c in classes.split('.') if c)
+        self.nth = int(nth) if nth else None
+
+    def matches(self, el) -> bool:
+        if self.tag and el.tag != self.tag:
+            return False
+        if self.classes and not self.classes.issubset((el.get('class') or '').split()):
+            return False
+        if self.nth is not None:
+            position = 1 + sum(1 for sib in el.itersiblings(preceding=True) if sib.tag == el.tag)
+            if position != self.nth:
+                return False
+        return True
+
+
+class _Selector:
+    """Selector de descendientes (`a .b c.d`) compilado en una cadena de pasos"""
+
+    __slots__ = ('steps',)
+
+    def __init__(self, css: str):
+        self.steps = [_Step(part) for part in css.split()]
+
+    def matches(self, el) -> bool:
+        steps = self.steps
+        if not steps[-1].matches(el):
+            return False
+        # Con combinadores de descendiente basta emparejar ancestros de forma voraz
+        idx = len(steps) - 2
+        for ancestor in el.iterancestors():
+            if idx < 0:
+                break
+            if steps[idx].matches(ancestor):
+                idx -= 1
+        return idx < 0
+
+
+def element_text(el) -> str:
+    """Equivalente a BeautifulSoup get_text(strip=True)"""
+    return ''.join(_iter_text(el))
+
+
+def _iter_text(el):
+    """Recorre los textos de `el` en orden de documento, ignorando comentarios"""
+    if isinstance(el.tag, str) and el.text:
+        stripped = el.text.strip()
+        if stripped:
+            yield stripped
+    for child in el:
+        if isinstance(child.tag, str):
+            yield from _iter_text(child)
+        if child.tail:
+            stripped = child.tail.strip()
+            if stripped:
+                yield stripped
+
+
+def _to_number(text: str, default: float = 0.0) -> float:
+    """Misma conversión que safe_extract_number"""
+    try:
+        match = _NUMBER_RE.search(text)
+        return float(match.group()) if match else default
+    except ValueError:
+        return default
+
+
+class FastReviewParser:
+    """Parser de una página de reseñas en una sola pasada por fila"""
+
+    def __init__(self, review_key: Callable[[Dict[str, Any]], str]):
+        self.review_key = review_key
+        self.fields = [(key, _Selector(css), kind) for key, css, kind in REVIEW_FIELDS]
+
+    def parse_document(self, html: str):
+        try:
+            return lxml.html.fromstring(html)
+        except ValueError:
+            # lxml no acepta str con declaración de codificación
+            return lxml.html.fromstring(html.encode('utf-8'))
+
+    def total_pages(self, doc) -> int:
+        """Mismo criterio que get_total_pages: el mayor número del paginador"""
+        numbers = []
+        for link in _PAGINATION_LINKS(doc):
+            text = element_text(link)
+            if text.isdigit():
+                numbers.append(int(text))
+        return max(numbers) if numbers else 1
+
+    def page_count(self, html: str) -> int:
+        """Solo el total de páginas, para saber qué descargar antes de parsear las filas
+
+        Parsea únicamente los bloques <nav> que mencionan el paginador, no el documento
+        completo: la descarga lo llama por cada perfil y el parseo completo queda para
+        su propia etapa.
+        """
+        for match in _NAV_RE.finditer(html):
+            block = match.group()
+            if 'pagination' not in block:
+                continue
+            doc = self.parse_document(block)
+            if _PAGINATION_LISTS(doc):
+                return self.total_pages(doc)
+        return 1
+
+    def parse_row(self, row) -> Dict[str, Any]:
+        """Extrae todos los campos de una fila recorriendo sus descendientes una sola vez"""
+        found: Dict[str, Any] = {}
+        tags: List[str] = []
+        pending = [field for field in self.fields if field[2] != 'list']
+        list_fields = [field for field in self.fields if field[2] == 'list']
+
+        for el in row.iterdescendants():
+            if not isinstance(el.tag, str):
+                continue
+            for field in list_fields:
+                if field[1].matches(el):
+                    text = element_text(el)
+                    if text:
+                        tags.append(text)
+            matched = [field for field in pending if field[1].matches(el)]
+            if matched:
+                for field in matched:
+                    found[field[0]] = element_text(el)
+                pending = [field for field in pending if field[0] not in found]
+
+        review: Dict[str, Any] = {}
+        for key, _, kind in self.fields:
+            if kind == 'list':
+                review[key] = tags
+            elif kind == 'number':
+                review[key] = _to_number(found.get(key, ''))
+            else:
+                review[key] = found.get(key, '')
+        return review
+
+    def parse(self, html: str) -> Tuple[List[Tuple[str, Dict[str, Any]]], int]:
+        """Devuelve [(review_id, reseña)] en orden de página y el total de páginas"""
+        doc = self.parse_document(html)
+        rows = _TBODY_ROWS(doc) or _ALL_ROWS(doc)[1:]
+
+        parsed = []
+        for row in rows:
+            review = self.parse_row(row)
+            review_id = self.review_key(review)
+            review[FINGERPRINT_KEY] = review_id
+            parsed.append((review_id, review))
+        return parsed, self.total_pages(doc)
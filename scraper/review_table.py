@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Tabla columnar de reseñas para el análisis avanzado
+Convierte una sola vez todas las reseñas de todos los profesores en arreglos de NumPy
+(profesor, fecha, calidad, dificultad, nota, materia, recomendación) sobre los que se
+calculan las estadísticas globales, por materia y los z-scores de forma vectorizada.
+"""
+
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union, Any
+
+import numpy as np
+
+from review_fingerprint import review_fingerprint
+
+
+class ReviewTable:
+    """Reseñas de todos los profesores en columnas; las de cada profesor quedan contiguas"""
+
+    def __init__(self, professors_data: Union[Dict[str, Dict], Iterable[Tuple[str, Dict]]],
+                 parse_fecha: Callable[[Optional[str]], Any]):
+        """`professors_data` puede ser un dict o un iterable de (id, datos) que se consume una vez"""
+        items = professors_data.items() if isinstance(professors_data, dict) else professors_data
+        self.prof_ids: List[str] = []
+        self.subjects: List[str] = []  # código de materia -> nombre
+        self.errors: Dict[str, str] = {}  # profesores cuyas reseñas no se pudieron convertir
+
+        subject_codes: Dict[str, int] = {}
+        offsets = [0]
+        fechas, quality, difficulty, grade, subject, recommend, comments = [], [], [], [], [], [], []
+        self.fingerprint: List[str] = []  # huella de cada reseña (la guardada o recalculada)
+
+        for prof_id, data in items:
+            self.prof_ids.append(prof_id)
+            for cal in data.get('calificaciones', []):
+                tipo = (cal.get('tipo_calificacion') or '').strip().upper()
+                recommend.append(1 if tipo == 'BUENO' else 0 if tipo else -1)
+
+                q = cal.get('puntaje_calidad_general')
+                quality.append(float(q) if q is not None else np.nan)
+
+                # Facilidad -> dificultad: 0 o ausente es dato faltante, tope en 5.0
+                fac = cal.get('puntaje_facilidad')
+                fac = float(fac) if fac not in (None, '') else 0.0
+                difficulty.append(min(5.0, fac) if fac > 0 else np.nan)
+
+                nota = cal.get('calificacion_recibida')
+                try:
+                    grade.append(float(nota) if nota not in (None, 'N/A', 'NA', '') else np.nan)
+                except (TypeError, ValueError) as e:
+                    # Mismo efecto que antes: el análisis de este profesor falla con el error original
+                    self.errors.setdefault(prof_id, str(e))
+                    grade.append(np.nan)
+
+                name = (cal.get('materia') or '').upper().strip()
+                if name and name not in subject_codes:
+                    subject_codes[name] = len(self.subjects)
+                    self.subjects.append(name)
+                subject.append(subject_codes[name] if name else -1)
+
+                fechas.append(parse_fecha(cal.get('fecha')))
+                comments.append((cal.get('comentario') or '').strip())
+                self.fingerprint.append(cal.get('huella') or review_fingerprint(cal))
+            offsets.append(len(quality))
+
+        self._prof_pos = {prof_id: i for i, prof_id in enumerate(self.prof_ids)}
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.prof = np.repeat(np.arange(len(self.prof_ids), dtype=np.int32), np.diff(self.offsets))
+        self.fecha = fechas
+        self.has_date = np.fromiter((f is not None for f in fechas), dtype=bool, count=len(fechas))
+        self.year = np.fromiter((f.year if f else 0 for f in fechas), dtype=np.int64, count=len(fechas))
+        self.month = np.fromiter((f.month if f else 0 for f in fechas), dtype=np.int64, count=len(fechas))
+        self.day = np.fromiter((f.day if f else 0 for f in fechas), dtype=np.int64, count=len(fechas))
+        self.quality = np.asarray(quality, dtype=np.float64)
+        self.difficulty = np.asarray(difficulty, dtype=np.float64)
+        self.grade = np.asarray(grade, dtype=np.float64)
+        self.subject = np.asarray(subject, dtype=np.int32)
+        self.recommend = np.asarray(recommend, dtype=np.int8)
+        self.comment = comments
+        self.z = np.full(len(quality), np.nan)
+        self.weights = np.full(len(quality), np.nan)  # peso de decaimiento (ver set_reference)
+
+    def __len__(self) -> int:
+        return len(self.quality)
+
+    def __contains__(self, prof_id: str) -> bool:
+        return prof_id in self._prof_pos
+
+    def _span(self, prof_id: str) -> slice:
+        pos = self._prof_pos[prof_id]
+        return slice(int(self.offsets[pos]), int(self.offsets[pos + 1]))
+
+    def _grouped(self, values: np.ndarray, mask: np.ndarray):
+        """(código, valores) por materia, conservando el orden original dentro de cada grupo"""
+        codes = self.subject[mask]
+        vals = values[mask]
+        order = np.argsort(codes, kind='stable')
+        codes, vals = codes[order], vals[order]
+        uniq, starts = np.unique(codes, return_index=True)
+        return dict(zip(uniq.tolist(), np.split(vals, starts[1:])))
+
+    def subjects_for(self, prof_id: str) -> set:
+        """Materias (normalizadas) en las que tiene reseñas un profesor"""
+        codes = np.unique(self.subject[self._span(prof_id)])
+        return {self.subjects[c] for c in codes.tolist() if c >= 0}
+
+    def global_stats(self) -> Dict[str, Any]:
+        quality = self.quality[~np.isnan(self.quality)]
+        difficulty = self.difficulty[~np.isnan(self.difficulty)]
+        recommend = self.recommend[self.recommend >= 0]
+        return {
+            'mu_quality': float(np.mean(quality)) if quality.size else None,
+            'mu_difficulty': float(np.mean(difficulty)) if difficulty.size else None,
+            'recommendation_rate': float(np.mean(recommend)) if recommend.size else None,
+            'total_reviews': int(len(self))
+        }
+
+    def subject_stats(self, min_reviews: int = 3) -> Dict[str, Dict[str, Any]]:
+        """Media y desviación de calidad/dificultad por materia (mínimo `min_reviews` calificaciones)"""
+        has_subject = self.subject >= 0
+        quality = self._grouped(self.quality, has_subject & ~np.isnan(self.quality))
+        difficulty = self._grouped(self.difficulty, has_subject & ~np.isnan(self.difficulty))
+
+        out = {}
+        for code, name in enumerate(self.subjects):
+            q = quality.get(code)
+            if q is None or len(q) < min_reviews:
+                continue
+            d = difficulty.get(code, np.empty(0))
+            out[name] = {
+                'mu_quality': np.mean(q),
+                'sigma_quality': np.std(q, ddof=1) if len(q) > 1 else 1.0,
+                'mu_difficulty': np.mean(d) if len(d) else 0,
+                'sigma_difficulty': np.std(d, ddof=1) if len(d) > 1 else 1.0,
+                'n_reviews': len(q)
+            }
+        return out
+
+    def compute_z(self, subject_stats: Dict[str, Dict[str, Any]]):
+        """z-score de calidad de cada reseña respecto a su materia (NaN si no aplica)"""
+        mu = np.full(len(self.subjects) + 1, np.nan)  # el último índice corresponde a "sin materia"
+        sd = np.ones(len(self.subjects) + 1)
+        for code, name in enumerate(self.subjects):
+            stats = subject_stats.get(name)
+            if stats:
+                mu[code] = stats['mu_quality']
+                sd[code] = stats['sigma_quality'] or 1.0
+        codes = np.where(self.subject >= 0, self.subject, len(self.subjects))
+        self.z = (self.quality - mu[codes]) / sd[codes]
+
+    def decay_weights(self, reference: datetime, half_life: float = 24) -> np.ndarray:
+        """Peso 0.5^(meses/half_life) de cada reseña respecto a `reference` (NaN sin fecha)
+
+        Los meses se cuentan igual que ProfessorAnalyzer.months_diff (fracción de día / 30).
+        """
+        months = ((reference.year - self.year) * 12 + (reference.month - self.month)
+                  + (reference.day - self.day) / 30.0)
+        return np.where(self.has_date, np.power(0.5, months / half_life), np.nan)
+
+    def set_reference(self, reference: datetime, half_life: float = 24):
+        """Calcula una sola vez los pesos de decaimiento que usan todas las métricas"""
+        self.weights = self.decay_weights(reference, half_life)
+
+    def commented_rows(self, prof_id: str) -> np.ndarray:
+        """Índices de las filas del profesor con comentario (renglones de la matriz del corpus)"""
+        span = self._span(prof_id)
+        return np.asarray([i for i in range(span.start, span.stop) if self.comment[i]], dtype=np.int64)
+
+    def rows_for(self, prof_id: str) -> List[Dict[str, Any]]:
+        """Filas atómicas de un profesor (mismo formato que ProfessorAnalyzer._extract_rows)"""
+        if prof_id in self.errors:
+            raise ValueError(self.errors[prof_id])
+        span = self._span(prof_id)
+        rows = []
+        for i in range(span.start, span.stop):
+            code = self.subject[i]
+            rows.append({
+                'fecha': self.fecha[i],
+                'calidad': None if np.isnan(self.quality[i]) else float(self.quality[i]),
+                'dificultad': None if np.isnan(self.difficulty[i]) else float(self.difficulty[i]),
+                'materia': self.subjects[code] if code >= 0 else '',
+                'nota': None if np.isnan(self.grade[i]) else float(self.grade[i]),
+                'comentario': self.comment[i],
+                'recomienda': None if self.recommend[i] < 0 else int(self.recommend[i]),
+                'z': None if np.isnan(self.z[i]) else float(self.z[i]),
+                'w': None if np.isnan(self.weights[i]) else float(self.weights[i]),
+                'idx': i,  # fila en la tabla (y en la matriz del corpus de comentarios)
+            })
+        return rows
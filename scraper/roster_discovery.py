@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Lista conocida de profesores de una escuela y su comparación con el listado actual
+Guarda, por URL, cómo aparecía en el listado cada profesor guardado con éxito.
+Al descubrir de nuevo el listado completo se obtienen los profesores nuevos, los que
+cambiaron (nombre, departamento, número de calificaciones o promedio) y los eliminados.
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+
+# Archivo en el directorio de salida (.jsonl para no mezclarse con los JSON de profesores)
+ROSTER_FILE = "roster_conocido.jsonl"
+DELTA_FILE = "roster_cambios.jsonl"
+
+# Columnas del listado que, si cambian, obligan a volver a descargar al profesor
+ROSTER_FIELDS = ('name', 'department', 'ratings', 'average')
+
+
+class RosterDelta(NamedTuple):
+    """Diferencias entre el listado descubierto y la lista conocida"""
+    new: List[Dict[str, str]]
+    changed: List[Dict[str, str]]
+    removed: List[Dict[str, str]]
+    unchanged: List[Dict[str, str]]
+    to_crawl: List[Dict[str, str]]  # nuevos y con cambios, en el orden del listado
+
+    def summary(self) -> str:
+        return (f"{len(self.new)} nuevos, {len(self.changed)} con cambios, "
+                f"{len(self.removed)} eliminados, {len(self.unchanged)} sin cambios")
+
+
+def unique_by_url(professors: Iterable[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Quita repetidos entre páginas del listado conservando la primera aparición"""
+    seen = {}
+    for info in professors:
+        seen.setdefault(info['url'], info)
+    return list(seen.values())
+
+
+class KnownRoster:
+    """Profesores ya guardados, tal como aparecían en el listado, respaldados en JSONL
+
+    Cada cambio se agrega al final del archivo (una línea por profesor guardado y una
+    marca `removed` por eliminado), así que guardar un profesor no reescribe la lista.
+    Al leer, la última línea de cada URL gana; close() compacta el archivo.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict[str, str]] = {}
+        self._lines = 0  # Líneas en el archivo, incluidas las reemplazadas
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        self._lines += 1
+                        entry = json.loads(line)
+                        if entry.get('removed'):
+                            self.entries.pop(entry['url'], None)
+                        else:
+                            self.entries[entry['url']] = entry
+        # Si la corrida anterior no llegó a compactar, se compacta ahora
+        if self._lines > 2 * len(self.entries) + 100:
+            self.save()
+
+    def diff(self, discovered: List[Dict[str, str]], complete: bool = True) -> RosterDelta:
+        """Compara el listado con lo conocido
+
+        Si alguna página del listado falló (`complete=False`) no se marca a nadie
+        como eliminado: su ausencia no sería confiable.
+        """
+        new, changed, unchanged, to_crawl = [], [], [], []
+        for info in discovered:
+            known = self.entries.get(info['url'])
+            if known is None:
+                new.append(info)
+                to_crawl.append(info)
+            elif any(known.get(field, '') != info.get(field, '') for field in ROSTER_FIELDS):
+                changed.append(info)
+                to_crawl.append(info)
+            else:
+                unchanged.append(info)
+
+        removed = []
+        if complete:
+            urls = {info['url'] for info in discovered}
+            removed = [entry for url, entry in self.entries.items() if url not in urls]
+        return RosterDelta(new, changed, removed, unchanged, to_crawl)
+
+    def save_delta(self, delta: RosterDelta, path: str):
+        """Escribe una línea por profesor nuevo, con cambios o eliminado"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for change, professors in (('new', delta.new), ('changed', delta.changed), ('removed', delta.removed)):
+                for info in professors:
+                    f.write(json.dumps({'change': change, **info}, ensure_ascii=False) + '\n')
+
+    def mark_saved(self, info: Dict[str, str], history: Optional[Dict[str, Any]] = None):
+        """Registra al profesor con los datos del listado con que se descargó
+
+        `history` es el resumen de sus reseñas que usa recrawl_scheduler.py.
+        """
+        entry = {'url': info['url'], **{field: info.get(field, '') for field in ROSTER_FIELDS}, **(history or {})}
+        self.entries[info['url']] = entry
+        self._append([entry])
+
+    def forget(self, professors: Iterable[Dict[str, str]]):
+        """Quita de la lista a los profesores que ya no aparecen en el listado"""
+        removed = [{'url': info['url'], 'removed': True}
+                   for info in professors if self.entries.pop(info['url'], None) is not None]
+        self._append(removed)
+
+    def _append(self, records: List[Dict[str, Any]]):
+        """Agrega las líneas al final del archivo en una sola escritura"""
+        if not records:
+            return
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records))
+        self._lines += len(records)
+
+    def save(self):
+        """Reescribe el archivo completo (compactado) de forma atómica"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        os.replace(tmp_path, self.path)
+        self._lines = len(self.entries)
+
+    def close(self):
+        """Compacta el archivo si tiene líneas reemplazadas o marcas de eliminados"""
+        if self._lines != len(self.entries):
+            self.save()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Planificador de scraping para varias escuelas de Mis Profesores
+Descubre los profesores de cada escuela, los intercala en una sola cola global y
+los procesa con un solo navegador, una sola sesión HTTP y un ritmo de peticiones
+compartido. Cada escuela guarda sus JSON en su propio directorio.
+"""
+
+import asyncio
+import os
+import time
+from itertools import zip_longest
+from typing import Dict, List, Optional, Tuple
+
+from playwright.async_api import async_playwright
+
+from scraper_async import AsyncMisProfesoresScraper
+
+
+class MultiSchoolScheduler:
+    """Ejecuta el scraper asíncrono sobre varias escuelas con recursos compartidos"""
+
+    def __init__(self, schools: List[str], output_root: str = "profesores_json", max_professors=None,
+                 fetch_mode: str = "http", incremental: bool = False, use_journal: bool = False,
+                 snapshot_root: Optional[str] = None, fingerprint_index: Optional[str] = None,
+                 concurrency: int = 4, requests_per_second: float = 2.0,
+                 min_rate: float = 0.25, max_rate: float = 8.0, recrawl_budget: Optional[int] = None,
+                 browser_server: bool = False, browser_endpoint: Optional[str] = None,
+                 context_max_pages: int = 200):
+        self.schools = list(dict.fromkeys(schools))  # Sin repetidos, en el orden dado
+        self.output_root = output_root
+        self.concurrency = max(1, concurrency)
+
+        # El scraper principal es dueño de los recursos compartidos
+        self.lead = AsyncMisProfesoresScraper(fetch_mode=fetch_mode, fingerprint_index=fingerprint_index,
+                                              concurrency=self.concurrency,
+                                              requests_per_second=requests_per_second,
+                                              min_rate=min_rate, max_rate=max_rate,
+                                              output_dir=output_root, browser_server=browser_server,
+                                              browser_endpoint=browser_endpoint,
+                                              context_max_pages=context_max_pages)
+
+        # Un scraper por escuela con su propio directorio, bitácora y snapshots
+        self.workers: Dict[str, AsyncMisProfesoresScraper] = {}
+        for school in self.schools:
+            output_dir = os.path.join(output_root, school)
+            self.workers[school] = AsyncMisProfesoresScraper(
+                max_professors=max_professors,
+                fetch_mode="browser",  # La sesión HTTP se toma del principal
+                incremental=incremental,
+                journal_path=os.path.join(output_dir, "crawl_journal.sqlite") if use_journal else None,
+                snapshot_dir=os.path.join(snapshot_root, school) if snapshot_root else None,
+                concurrency=self.concurrency,
+                school=school,
+                output_dir=output_dir,
+                recrawl_budget=recrawl_budget,
+            )
+
+    async def discover(self) -> Dict[str, List[Dict[str, str]]]:
+        """Obtiene la lista de profesores pendientes de cada escuela en paralelo"""
+        results = await asyncio.gather(
+            *(worker.load_work_queue_async() for worker in self.workers.values()),
+            return_exceptions=True
+        )
+
+        rosters = {}
+        for school, result in zip(self.workers, results):
+            if isinstance(result, Exception):
+                print(f"❌ {school}: error obteniendo profesores: {result}")
+                result = []
+            print(f"🏫 {school}: {len(result)} profesores")
+            rosters[school] = result
+        return rosters
+
+    def build_queue(self, rosters: Dict[str, List[Dict[str, str]]]) -> List[Tuple[str, Dict[str, str]]]:
+        """Intercala las escuelas (round-robin) para que todas avancen a la vez"""
+        tagged = [[(school, info) for info in roster] for school, roster in rosters.items()]
+        return [item for batch in zip_longest(*tagged) for item in batch if item is not None]
+
+    async def run_async(self):
+        """Ejecuta todas las escuelas con una cola global y consumidores acotados"""
+        print(f"🚀 Iniciando scraping de {len(self.schools)} escuelas")
+        print(f"📁 Directorio de salida: {self.output_root}/<escuela>")
+        print(f"⚡ Concurrencia: {self.concurrency} páginas")
+        start = time.time()
+
+        async with async_playwright() as playwright:
+            browser = await self.lead.launch_browser(playwright)
+
+            try:
+                await self.lead.setup_page_pool(browser)
+                for worker in self.workers.values():
+                    worker.share_resources(self.lead)
+
+                items = self.build_queue(await self.discover())
+                total = len(items)
+                if not total:
+                    print("❌ No se encontraron profesores")
+                    return
+
+                print(f"👥 Total de profesores en la cola global: {total}")
+                queue: asyncio.Queue = asyncio.Queue()
+                for index, (school, info) in enumerate(items, 1):
+                    queue.put_nowait((index, school, info))
+
+                saved: Dict[str, int] = {school: 0 for school in self.schools}
+
+                async def consume():
+                    while True:
+                        try:
+                            index, school, info = queue.get_nowait()
+                        except asyncio.QueueEmpty:
+                            return
+                        try:
+                            if await self.workers[school].process_professor(info, index, total):
+                                saved[school] += 1
+                        except Exception as e:
+                            print(f"❌ Error procesando {info['name']} ({school}): {e}")
+                            worker = self.workers[school]
+                            await worker.run_io(worker.finish_professor, info, False, str(e))
+
+                # Acota cuántos profesores están en vuelo para no acumular HTML en memoria
+                await asyncio.gather(*(consume() for _ in range(self.concurrency * 2)))
+
+                print(f"\n🎉 Scraping completado en {(time.time() - start) / 60:.1f} min")
+                for school in self.schools:
+                    print(f"   🏫 {school}: {saved[school]} profesores guardados")
+
+            except Exception as e:
+                print(f"❌ Error durante el scraping: {e}")
+
+            finally:
+                await browser.close()
+                for school, worker in self.workers.items():
+                    worker.known_roster.close()
+                    if worker.journal:
+                        print(f"📒 {school}: {worker.journal.summary()}")
+                        worker.journal.close()
+                self.lead.close_resources()
+
+    def run(self):
+        """Punto de entrada síncrono"""
+        asyncio.run(self.run_async())
+
+
+def read_schools(values: List[str]) -> List[str]:
+    """Identificadores de escuela desde la línea de comandos; `@archivo` lee uno por línea"""
+    schools = []
+    for value in values:
+        if value.startswith('@'):
+            with open(value[1:], 'r', encoding='utf-8') as f:
+                schools.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+        else:
+            schools.append(value)
+    # Se aceptan también URLs completas de la escuela
+    return [school.rstrip('/').rsplit('/escuelas/', 1)[-1] for school in schools]
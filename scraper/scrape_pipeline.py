@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Pipeline por etapas para el scraper final
+Hilos de descarga HTTP → cola acotada → parseo en un pool de procesos → escritura en el hilo principal.
+Cada cola tiene un tamaño máximo: si una etapa se atrasa, las anteriores se bloquean en
+lugar de acumular HTML en memoria, y el rendimiento queda limitado por la etapa más
+lenta en lugar de por la suma de todas.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+
+# Marca de fin que cada productor deja en la cola de la etapa siguiente
+_DONE = None
+
+# Scraper de cada proceso del pool (solo se usan sus métodos de parseo)
+_parser = None
+
+
+def _init_parser(scraper_cls, school: str, output_dir: str):
+    global _parser
+    _parser = scraper_cls(fetch_mode="browser", school=school, output_dir=output_dir)
+
+
+def _parse_professor(professor_info: Dict[str, str], pages: List[str]) -> Tuple[Dict[str, Any], int]:
+    return _parser.parse_professor_pages(professor_info, pages)
+
+
+class FetchedProfessor(NamedTuple):
+    """HTML de un profesor; sin páginas si la respuesta HTTP no sirvió y toca usar Chromium"""
+    index: int
+    info: Dict[str, str]
+    pages: List[Tuple[str, str]]  # (url, html) del perfil y de cada página de reseñas
+    error: Optional[str] = None   # la descarga falló con una excepción: se registra como fallido
+
+
+class ParsedProfessor(NamedTuple):
+    """Resultado del parseo listo para escribir"""
+    index: int
+    info: Dict[str, str]
+    pages: List[Tuple[str, str]]
+    data: Optional[Dict[str, Any]]
+    error: Optional[str]
+
+
+class StageStats:
+    """Elementos procesados y tiempo de cada etapa: trabajando, esperando entrada y bloqueada por la salida"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.busy = 0.0
+        self.idle = 0.0
+        self.blocked = 0.0
+        self.max_queue = 0
+        self._lock = threading.Lock()
+
+    def add(self, items: int = 0, busy: float = 0.0, idle: float = 0.0, blocked: float = 0.0, queued: int = 0):
+        with self._lock:
+            self.items += items
+            self.busy += busy
+            self.idle += idle
+            self.blocked += blocked
+            self.max_queue = max(self.max_queue, queued)
+
+    def summary(self) -> str:
+        return (f"{self.name:<9} {self.items:>5} profesores  ocupada {self.busy:8.1f} s  "
+                f"esperando {self.idle:8.1f} s  bloqueada {self.blocked:8.1f} s  cola máx. {self.max_queue}")
+
+
+class ScrapePipeline:
+    """Descarga, parseo y escritura en paralelo con colas acotadas entre etapas
+
+    La descarga solo usa la sesión HTTP (segura entre hilos y con el mismo control de
+    ritmo); Chromium, la bitácora, los snapshots y el índice de huellas se usan solo
+    desde el hilo principal, que es el que escribe. Cada profesor se escribe por
+    separado: su JSON, sus snapshots y su fila de la bitácora.
+    """
+
+    def __init__(self, scraper, fetchers: int = 4, parse_workers: Optional[int] = None,
+                 queue_size: int = 8):
+        self.scraper = scraper
+        self.fetchers = max(1, fetchers)
+        self.parse_workers = max(1, parse_workers or os.cpu_count() or 1)
+        self.fetched: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self.parsed: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self.stop = threading.Event()
+        self.stats = {name: StageStats(name) for name in ('descarga', 'parseo', 'escritura')}
+        self.page = None  # página de Chromium del respaldo; fresh_page la reemplaza al reciclar el contexto
+        self._pending_fetchers = self.fetchers
+        self._lock = threading.Lock()
+
+    def _put(self, target: queue.Queue, item, stats: StageStats) -> bool:
+        """put bloqueante (backpressure) que se rinde si el pipeline se detiene"""
+        start = time.perf_counter()
+        while not self.stop.is_set():
+            try:
+                target.put(item, timeout=0.5)
+                stats.add(blocked=time.perf_counter() - start, queued=target.qsize())
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue, stats: StageStats):
+        start = time.perf_counter()
+        while not self.stop.is_set():
+            try:
+                item = source.get(timeout=0.5)
+                stats.add(idle=time.perf_counter() - start)
+                return item
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def fetch_professor(self, index: int, professor_info: Dict[str, str]) -> FetchedProfessor:
+        """Perfil y todas sus páginas de reseñas por HTTP; si alguna no es válida, sin páginas
+
+        Del perfil solo se lee el paginador (page_count); el documento se parsea completo
+        en la etapa de parseo, que además confirma el total de páginas.
+        """
+        fetcher = self.scraper.http_fetcher
+        url = professor_info['url']
+        html = self.scraper.resumed_html(url) or fetcher.fetch(url)
+        if not fetcher.is_valid_profile_html(html):
+            return FetchedProfessor(index, professor_info, [])
+
+        pages = [(url, html)]
+        for page_num in range(2, self.scraper.review_parser.page_count(html) + 1):
+            page_url = f"{url}?pag={page_num}"
+            page_html = self.scraper.resumed_html(page_url) or fetcher.fetch(page_url)
+            if not fetcher.is_valid_profile_html(page_html):
+                return FetchedProfessor(index, professor_info, [])
+            pages.append((page_url, page_html))
+        return FetchedProfessor(index, professor_info, pages)
+
+    def _fetch_loop(self, todo: queue.Queue):
+        stats = self.stats['descarga']
+        try:
+            while not self.stop.is_set():
+                try:
+                    index, professor_info = todo.get_nowait()
+                except queue.Empty:
+                    return
+                start = time.perf_counter()
+                try:
+                    item = self.fetch_professor(index, professor_info)
+                except Exception as e:
+                    # El profesor sigue hasta la escritura para quedar registrado como fallido
+                    item = FetchedProfessor(index, professor_info, [], error=f"error descargando: {e}")
+                stats.add(items=1, busy=time.perf_counter() - start)
+                if not self._put(self.fetched, item, stats):
+                    return
+        finally:
+            # El último hilo de descarga avisa el fin a cada hilo de parseo
+            with self._lock:
+                self._pending_fetchers -= 1
+                last = self._pending_fetchers == 0
+            if last:
+                for _ in range(self.parse_workers):
+                    self._put(self.fetched, _DONE, stats)
+
+    def _parse_loop(self, pool: ProcessPoolExecutor):
+        stats = self.stats['parseo']
+        try:
+            while True:
+                item = self._get(self.fetched, stats)
+                if item is _DONE:
+                    return
+                data, error, pages = None, item.error, item.pages
+                start = time.perf_counter()
+                if pages:
+                    try:
+                        data, total_pages = pool.submit(_parse_professor, item.info,
+                                                        [html for _, html in pages]).result()
+                        if total_pages != len(pages):
+                            # El paginador completo no coincide con el leído al descargar: va por Chromium
+                            print(f"   ⚠️ {item.info['name']}: {total_pages} páginas de reseñas, "
+                                  f"se descargaron {len(pages)}")
+                            data, pages = None, []
+                    except Exception as e:
+                        error = str(e)
+                stats.add(items=1, busy=time.perf_counter() - start)
+                parsed = ParsedProfessor(item.index, item.info, pages, data, error)
+                if not self._put(self.parsed, parsed, stats):
+                    return
+        finally:
+            self._put(self.parsed, _DONE, stats)
+
+    def write_professor(self, item: ParsedProfessor, total: int) -> bool:
+        """Guarda un profesor parseado; los que no se pudieron descargar por HTTP van por Chromium"""
+        scraper = self.scraper
+        professor_info = item.info
+        print(f"\n📊 ({item.index}/{total}) {professor_info['name']}")
+        if scraper.journal:
+            scraper.journal.start_professor(professor_info['url'])
+
+        if not item.pages and item.error:
+            print(f"❌ {item.error}")
+            scraper.finish_professor(professor_info, False, item.error)
+            return False
+        if not item.pages:
+            print(f"   ↩️ Respuesta HTTP no válida, usando Chromium: {professor_info['url']}")
+            self.page = scraper.fresh_page(self.page)
+            professor_data = scraper.extract_professor_data(self.page, professor_info)
+        else:
+            for page_num, (url, html) in enumerate(item.pages, 1):
+                if scraper.snapshots:
+                    scraper.snapshots.put(url, html)
+                scraper.record_page(professor_info['url'], page_num, item.data is not None, item.error)
+            professor_data = item.data
+            if item.error:
+                print(f"Error extrayendo datos del profesor {professor_info['name']}: {item.error}")
+
+        if not professor_data:
+            print("❌ Error extrayendo datos")
+            scraper.finish_professor(professor_info, False, item.error or "error extrayendo datos")
+            return False
+
+        saved = scraper.save_professor_data(professor_data, professor_info['url'])
+        print(f"   {len(professor_data['calificaciones'])} reseñas en {len(item.pages) or 1} páginas")
+        scraper.finish_professor(professor_info, saved, None if saved else "error guardando JSON", professor_data)
+        return saved
+
+    def run(self, professors: List[Dict[str, str]], page) -> int:
+        """Procesa `professors` y devuelve cuántos se guardaron; `page` es el respaldo de Chromium"""
+        todo: queue.Queue = queue.Queue()
+        for index, professor_info in enumerate(professors, 1):
+            todo.put((index, professor_info))
+
+        print(f"🧵 Pipeline: {self.fetchers} hilos de descarga, {self.parse_workers} procesos de parseo, "
+              f"colas de {self.fetched.maxsize} profesores")
+        start = time.perf_counter()
+        saved = 0
+        self.page = page
+        stats = self.stats['escritura']
+        scraper = self.scraper
+        with ProcessPoolExecutor(max_workers=self.parse_workers, initializer=_init_parser,
+                                 initargs=(type(scraper), scraper.school, scraper.output_dir)) as pool:
+            threads = [threading.Thread(target=self._fetch_loop, args=(todo,), daemon=True)
+                       for _ in range(self.fetchers)]
+            threads += [threading.Thread(target=self._parse_loop, args=(pool,), daemon=True)
+                        for _ in range(self.parse_workers)]
+            for thread in threads:
+                thread.start()
+
+            try:
+                running = self.parse_workers
+                while running:
+                    item = self._get(self.parsed, stats)
+                    if item is _DONE:
+                        running -= 1
+                        continue
+                    write_start = time.perf_counter()
+                    try:
+                        saved += self.write_professor(item, len(professors))
+                    except Exception as e:
+                        print(f"❌ Error procesando {item.info['name']}: {e}")
+                        scraper.finish_professor(item.info, False, str(e))
+                    stats.add(items=1, busy=time.perf_counter() - write_start)
+            finally:
+                self.stop.set()
+                for thread in threads:
+                    thread.join()
+
+        elapsed = time.perf_counter() - start
+        print(f"\n📈 Pipeline: {len(professors)} profesores en {elapsed:.1f} s")
+        for stage in self.stats.values():
+            print(f"   {stage.summary()}")
+        return saved
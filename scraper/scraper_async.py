@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Scraper asíncrono para Mis Profesores - Instituto Tecnológico de Culiacán
+Procesa varios profesores en paralelo con un pool acotado de páginas de Chromium
+y un límite de concurrencia/tasa por host. Reutiliza el parseo de MisProfesoresScraperFinal.
+"""
+
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Any
+from urllib.parse import urlparse
+
+from playwright.async_api import async_playwright, Page, TimeoutError as PlaywrightTimeoutError
+from bs4 import BeautifulSoup
+
+from scraper_final import DEFAULT_SCHOOL, MisProfesoresScraperFinal
+from listing_parser import (LISTING_PAGES_JS, LISTING_PAGINATION_SELECTOR, LISTING_ROWS_JS, LISTING_ROWS_SELECTOR,
+                            listing_page_count, listing_page_url, professors_from_rows)
+from roster_discovery import unique_by_url
+from browser_server import connect_or_launch_async
+from rate_limiter import HostRateLimiter
+from resource_blocking import PROFILE_READY_SELECTOR, install_resource_blocking_async
+
+
+class AsyncMisProfesoresScraper(MisProfesoresScraperFinal):
+    """Variante asíncrona del scraper final con pool de páginas"""
+
+    def __init__(self, max_professors=None, fetch_mode: str = "http", incremental: bool = False,
+                 journal_path: Optional[str] = None, snapshot_dir: Optional[str] = None,
+                 fingerprint_index: Optional[str] = None, concurrency: int = 4,
+                 requests_per_second: float = 2.0, min_rate: float = 0.25, max_rate: float = 8.0,
+                 school: str = DEFAULT_SCHOOL, output_dir: str = "profesores_json",
+                 recrawl_budget: Optional[int] = None, browser_server: bool = False,
+                 browser_endpoint: Optional[str] = None, context_max_pages: int = 200):
+        super().__init__(max_professors=max_professors, fetch_mode=fetch_mode, incremental=incremental,
+                         journal_path=journal_path, snapshot_dir=snapshot_dir,
+                         fingerprint_index=fingerprint_index, requests_per_second=requests_per_second,
+                         min_rate=min_rate, max_rate=max_rate, school=school, output_dir=output_dir,
+                         recrawl_budget=recrawl_budget, browser_server=browser_server,
+                         browser_endpoint=browser_endpoint, context_max_pages=context_max_pages)
+        self.concurrency = max(1, concurrency)
+        self.limiter = HostRateLimiter(max_concurrent=self.concurrency, controller=self.rate_controller)
+        self.page_pool: Optional[asyncio.Queue] = None
+        self.page_uses: Dict[Any, int] = {}  # navegaciones de cada página desde que se creó su contexto
+        # Un solo hilo para la E/S de disco (JSON, snapshots, bitácora, huellas): no detiene el
+        # event loop y las escrituras en SQLite quedan en orden y sin concurrencia
+        self.io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scraper-io")
+
+    async def run_io(self, func, *args, **kwargs):
+        """Ejecuta una operación bloqueante de disco en el hilo de E/S"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.io_executor, functools.partial(func, *args, **kwargs))
+
+    async def setup_page_pool(self, browser) -> List[Any]:
+        """Crea un contexto con una página por cada slot de concurrencia
+
+        Los contextos (con su caché y cookies) se reutilizan hasta `context_max_pages`
+        navegaciones; después release_page los reemplaza por uno nuevo.
+        """
+        self.page_pool = asyncio.Queue()
+        pages = [await self.new_pool_page(browser) for _ in range(self.concurrency)]
+        for page in pages:
+            self.page_pool.put_nowait(page)
+        return [page.context for page in pages]
+
+    async def new_pool_page(self, browser) -> Page:
+        """Contexto nuevo con bloqueo de recursos y su única página"""
+        context = await browser.new_context(user_agent=self.ua.random)
+        await install_resource_blocking_async(context, urlparse(self.base_url).netloc)
+        page = await context.new_page()
+        self.page_uses[page] = 0
+        return page
+
+    async def release_page(self, page: Page):
+        """Devuelve la página al pool; tras `context_max_pages` navegaciones, en un contexto nuevo"""
+        if self.context_max_pages and self.page_uses.get(page, 0) >= self.context_max_pages:
+            try:
+                fresh = await self.new_pool_page(page.context.browser)
+            except Exception as e:
+                # Se sigue con el contexto actual para no dejar el pool con un slot menos
+                print(f"   ⚠️ No se pudo reciclar el contexto: {e}")
+                self.page_uses[page] = 0
+            else:
+                self.page_uses.pop(page, None)
+                await page.context.close()
+                page = fresh
+        self.page_pool.put_nowait(page)
+
+    async def fetch_html(self, url: str) -> str:
+        """Obtiene el HTML de `url`: HTTP directo en un hilo, o una página del pool como respaldo"""
+        html = await self.run_io(self.resumed_html, url) if self.resume_urls else None
+        if html is not None:
+            return html
+        if self.http_fetcher:
+            # HttpFetcher reserva turno en el controlador en cada intento
+            async with self.limiter.limit(url, pace=False):
+                html = await asyncio.to_thread(self.http_fetcher.fetch, url)
+            if not self.http_fetcher.is_valid_profile_html(html):
+                print(f"   ↩️ Respuesta HTTP no válida, usando Chromium: {url}")
+                html = None
+
+        if html is None:
+            page = await self.page_pool.get()
+            try:
+                async with self.limiter.limit(url):
+                    await self.navigate_async(page, url)
+                    html = await page.content()
+            finally:
+                await self.release_page(page)
+
+        if self.snapshots:
+            await self.run_io(self.snapshots.put, url, html)
+        return html
+
+    async def navigate_async(self, page: Page, url: str, ready_selector: Optional[str] = PROFILE_READY_SELECTOR):
+        """Versión asíncrona de navigate; el turno ya lo reservó self.limiter"""
+        self.page_uses[page] = self.page_uses.get(page, 0) + 1
+        start = time.monotonic()
+        try:
+            response = await page.goto(url, wait_until='domcontentloaded', timeout=30000)
+        except PlaywrightTimeoutError:
+            self.rate_controller.record(time.monotonic() - start, timeout=True)
+            raise
+        self.rate_controller.record(time.monotonic() - start, status=response.status if response else None)
+
+        if ready_selector:
+            try:
+                await page.wait_for_selector(ready_selector, state='attached', timeout=10000)
+            except PlaywrightTimeoutError:
+                pass  # Perfil sin reseñas
+
+    async def extract_professor_data_async(self, professor_info: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Descarga el perfil y todas sus páginas de reseñas en paralelo"""
+        try:
+            professor_url = professor_info['url']
+            html = await self.fetch_html(professor_url)
+            soup = BeautifulSoup(html, 'html.parser')
+            rows, total_pages = self.parse_review_page(html)
+            await self.run_io(self.record_page, professor_url, 1, True)
+
+            if self.incremental:
+                existing = await self.run_io(self.load_existing_professor, soup, professor_info)
+                if existing:
+                    reviews = await self.fetch_new_reviews(rows, professor_url, total_pages,
+                                                           self.stored_review_ids(existing))
+                    return self.build_professor_data(soup, professor_info,
+                                                     self.merge_reviews(reviews, existing.get('calificaciones', [])))
+
+            # Las páginas 2..N se piden en paralelo; el parseo respeta el orden original
+            extra_pages = await asyncio.gather(
+                *(self.fetch_html(f"{professor_url}?pag={page_num}") for page_num in range(2, total_pages + 1)),
+                return_exceptions=True
+            )
+
+            reviews = []
+            seen_review_ids = set()
+            reviews.extend(self.collect_new_reviews(rows, seen_review_ids))
+            for page_num, page_html in enumerate(extra_pages, 2):
+                if isinstance(page_html, Exception):
+                    print(f"   ❌ Error procesando página {page_num} de {professor_info['name']}: {page_html}")
+                    await self.run_io(self.record_page, professor_url, page_num, False, str(page_html))
+                    continue
+                await self.run_io(self.record_page, professor_url, page_num, True)
+                page_rows, _ = self.parse_review_page(page_html)
+                reviews.extend(self.collect_new_reviews(page_rows, seen_review_ids))
+
+            return self.build_professor_data(soup, professor_info, reviews)
+
+        except Exception as e:
+            print(f"Error extrayendo datos del profesor {professor_info['name']}: {e}")
+            return None
+
+    async def fetch_new_reviews(self, rows: List[Tuple[str, Dict[str, Any]]], professor_url: str,
+                                total_pages: int, known_review_ids: set) -> List[Dict[str, Any]]:
+        """Pagina en orden hasta encontrar una reseña ya guardada (modo incremental)"""
+        reviews = []
+        seen_review_ids = set(known_review_ids)
+
+        for page_num in range(1, total_pages + 1):
+            if page_num > 1:
+                rows, _ = self.parse_review_page(await self.fetch_html(f"{professor_url}?pag={page_num}"))
+                await self.run_io(self.record_page, professor_url, page_num, True)
+            reviews.extend(self.collect_new_reviews(rows, seen_review_ids))
+            if self.page_has_known_review(rows, known_review_ids):
+                break
+
+        return reviews
+
+    async def process_professor(self, professor_info: Dict[str, str], index: int, total: int) -> bool:
+        """Extrae y guarda un profesor"""
+        if self.journal:
+            await self.run_io(self.journal.start_professor, professor_info['url'])
+
+        professor_data = await self.extract_professor_data_async(professor_info)
+        if not professor_data:
+            print(f"❌ Error extrayendo datos de {professor_info['name']} ({index}/{total})")
+            await self.run_io(self.finish_professor, professor_info, False, "error extrayendo datos")
+            return False
+
+        saved = await self.run_io(self.save_professor_data, professor_data, professor_info['url'])
+        await self.run_io(self.finish_professor, professor_info, saved,
+                          None if saved else "error guardando JSON", professor_data)
+        print(f"   ({index}/{total}) {len(professor_data['calificaciones'])} reseñas")
+        return saved
+
+    async def load_work_queue_async(self) -> List[Dict[str, str]]:
+        """Versión asíncrona de load_work_queue"""
+        if self.journal and self.journal.has_roster():
+            professors = self.journal.pending_professors()
+            if professors:
+                print(f"📒 Reanudando desde {self.journal.path}: {len(professors)} profesores pendientes")
+                self.load_resume_pages()
+                return professors
+            # Sin pendientes la corrida anterior ya terminó: se empieza una nueva
+            print(f"📒 La corrida anterior de {self.journal.path} ya terminó; se inicia una nueva")
+            self.journal.reset()
+
+        print(f"🌐 Navegando a: {self.school_url}")
+        print("📖 Obteniendo enlaces de profesores...")
+        professors, complete = await self.discover_roster_async()
+        return self.register_roster(professors, complete)
+
+    async def listing_page_async(self, page_num: int) -> Tuple[List[Dict[str, str]], List[Any]]:
+        """Página del listado por HTTP (lxml, como el scraper secuencial) o, si no trae profesores, con Chromium"""
+        url = listing_page_url(self.school_url, page_num)
+        if self.http_fetcher:
+            # HttpFetcher reserva turno en el controlador en cada intento
+            async with self.limiter.limit(url, pace=False):
+                result = await asyncio.to_thread(self.read_listing_page_http, page_num)
+            if result is not None:
+                return result
+            print(f"   ↩️ Página {page_num} del listado sin filas por HTTP, usando Chromium")
+        return await self.read_listing_page_async(url, with_pagination=page_num == 1)
+
+    async def read_listing_page_async(self, url: str, with_pagination: bool = False) -> Tuple[List[Dict[str, str]], List[Any]]:
+        """Profesores de una página del listado con Chromium y, si se pide, los enlaces de su paginación"""
+        page = await self.page_pool.get()
+        try:
+            async with self.limiter.limit(url):
+                await self.navigate_async(page, url, ready_selector=LISTING_ROWS_SELECTOR)
+            rows = await page.eval_on_selector_all(LISTING_ROWS_SELECTOR, LISTING_ROWS_JS)
+            links = await page.eval_on_selector_all(LISTING_PAGINATION_SELECTOR, LISTING_PAGES_JS) if with_pagination else []
+        finally:
+            await self.release_page(page)
+        return professors_from_rows(rows, self.base_url), links
+
+    async def discover_roster_async(self) -> Tuple[List[Dict[str, str]], bool]:
+        """Versión asíncrona de discover_roster: tras la primera página, las demás se piden en paralelo
+
+        Cada página toma un turno de self.limiter (y, si va por Chromium, una página del
+        pool), así que el listado comparte la concurrencia y el ritmo con el resto del scraping.
+        """
+        try:
+            professors, links = await self.listing_page_async(1)
+        except Exception as e:
+            print(f"Error obteniendo enlaces de profesores: {e}")
+            return [], False
+
+        total_pages = listing_page_count(links)
+        print(f"📄 Páginas del listado: {total_pages}")
+        complete = bool(professors)
+        results = await asyncio.gather(
+            *(self.listing_page_async(page_num) for page_num in range(2, total_pages + 1)),
+            return_exceptions=True
+        )
+        for page_num, result in enumerate(results, 2):
+            if isinstance(result, Exception):
+                print(f"Error obteniendo enlaces de profesores (página {page_num}): {result}")
+                result = ([], [])
+            if not result[0]:
+                complete = False  # Sin esa página no se sabe quién ya no está
+            professors.extend(result[0])
+
+        professors = unique_by_url(professors)
+        print(f"   Encontrados {len(professors)} profesores en {total_pages} páginas")
+        return professors, complete
+
+    async def launch_browser(self, playwright):
+        """Versión asíncrona de setup_browser"""
+        browser, _ = await connect_or_launch_async(playwright, headless=True, endpoint=self.browser_endpoint,
+                                                   use_server=self.browser_server)
+        return browser
+
+    def share_resources(self, lead: 'AsyncMisProfesoresScraper'):
+        """Usa la sesión HTTP, el ritmo, el pool de páginas y el índice de huellas de `lead`"""
+        self.http_fetcher = lead.http_fetcher
+        self.rate_controller = lead.rate_controller
+        self.limiter = lead.limiter
+        self.page_pool = lead.page_pool
+        self.page_uses = lead.page_uses
+        self.context_max_pages = lead.context_max_pages
+        self.fingerprints = lead.fingerprints
+        self.io_executor.shutdown()
+        self.io_executor = lead.io_executor
+
+    def close_resources(self):
+        """Espera las escrituras pendientes del hilo de E/S antes de cerrar la bitácora y las huellas"""
+        self.io_executor.shutdown(wait=True)
+        super().close_resources()
+
+    async def run_async(self):
+        """Ejecuta el scraper completo con concurrencia acotada"""
+        print("🚀 Iniciando scraper asíncrono de Mis Profesores - ITC")
+        print(f"📁 Directorio de salida: {self.output_dir}")
+        print(f"⚡ Concurrencia: {self.concurrency} páginas")
+
+        if self.max_professors:
+            print(f"🎯 Modo prueba: máximo {self.max_professors} profesores")
+
+        async with async_playwright() as playwright:
+            browser = await self.launch_browser(playwright)
+
+            try:
+                await self.setup_page_pool(browser)
+                professors = await self.load_work_queue_async()
+
+                if not professors:
+                    print("❌ No se encontraron profesores")
+                    return
+
+                total = len(professors)
+                print(f"👥 Total de profesores encontrados: {total}")
+
+                # Acota cuántos profesores están en vuelo para no acumular HTML en memoria
+                in_flight = asyncio.Semaphore(self.concurrency * 2)
+
+                async def bounded(professor_info, index):
+                    async with in_flight:
+                        return await self.process_professor(professor_info, index, total)
+
+                results = await asyncio.gather(
+                    *(bounded(info, i) for i, info in enumerate(professors, 1)),
+                    return_exceptions=True
+                )
+
+                saved = sum(1 for result in results if result is True)
+                print(f"\n🎉 Scraping completado! {saved}/{total} profesores guardados")
+
+            except Exception as e:
+                print(f"❌ Error durante el scraping: {e}")
+
+            finally:
+                await browser.close()
+                self.close_resources()
+
+    def run(self):
+        """Punto de entrada síncrono"""
+        asyncio.run(self.run_async())
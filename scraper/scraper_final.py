@@ -7,51 +7,127 @@ Versión corregida con los selectores CSS correctos
 import os
 import json
 import time
-import random
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Tuple, Any
 from urllib.parse import urljoin, urlparse
 
-from playwright.sync_api import sync_playwright, Page, Browser
+from playwright.sync_api import sync_playwright, Page, Browser, TimeoutError as PlaywrightTimeoutError
 from bs4 import BeautifulSoup
 from fake_useragent import UserAgent
 
+from browser_server import ENDPOINT_ENV, connect_or_launch
+from http_fetcher import HttpFetcher
+from listing_parser import (LISTING_PAGES_JS, LISTING_PAGINATION_SELECTOR, LISTING_ROWS_JS, LISTING_ROWS_SELECTOR,
+                            listing_page_count, listing_page_url, parse_listing_html, parse_listing_pagination,
+                            professors_from_rows)
+from rate_limiter import AdaptiveRateController
+from resource_blocking import PROFILE_READY_SELECTOR, install_resource_blocking
+from crawl_journal import CrawlJournal
+from review_fingerprint import FingerprintIndex, review_fingerprint
+from review_parser import FINGERPRINT_KEY, FastReviewParser
+from recrawl_scheduler import RecrawlScheduler, review_history
+from roster_discovery import DELTA_FILE, ROSTER_FILE, KnownRoster, unique_by_url
+from scrape_pipeline import ScrapePipeline
+from snapshot_store import SnapshotStore
+
+
+# Escuela por defecto: el identificador es la parte final de /escuelas/<id> en el sitio
+DEFAULT_SCHOOL = "Instituto-Tecnologico-de-Culiacan_1642"
+DEFAULT_UNIVERSITY = "Instituto Tecnológico de Culiacán"
+
+
+def school_display_name(school: str) -> str:
+    """Nombre legible aproximado a partir del identificador de la escuela (sin acentos)"""
+    if school == DEFAULT_SCHOOL:
+        return DEFAULT_UNIVERSITY
+    return re.sub(r'_\d+$', '', school).replace('-', ' ')
+
 
 class MisProfesoresScraperFinal:
     """Scraper final para Mis Profesores"""
     
-    def __init__(self, max_professors=None):
+    def __init__(self, max_professors=None, fetch_mode: str = "http", incremental: bool = False,
+                 journal_path: Optional[str] = None, snapshot_dir: Optional[str] = None, replay: bool = False,
+                 fingerprint_index: Optional[str] = None, requests_per_second: float = 2.0,
+                 min_rate: float = 0.25, max_rate: float = 8.0, school: str = DEFAULT_SCHOOL,
+                 output_dir: str = "profesores_json", pipeline: bool = False, fetchers: int = 4,
+                 parse_workers: Optional[int] = None, recrawl_budget: Optional[int] = None,
+                 browser_server: bool = False, browser_endpoint: Optional[str] = None,
+                 context_max_pages: int = 200):
         self.base_url = "https://www.misprofesores.com"
-        self.universidad = "Instituto Tecnológico de Culiacán"
-        self.output_dir = "profesores_json"
+        self.school = school
+        self.universidad = school_display_name(school)
+        self.output_dir = output_dir
+        os.makedirs(self.output_dir, exist_ok=True)  # Crear directorio de salida
         self.ua = UserAgent()
         self.max_professors = max_professors
+        self.incremental = incremental
+        self.pipeline = pipeline
+        self.fetchers = fetchers
+        self.parse_workers = parse_workers
+        self.recrawl_budget = recrawl_budget
+        
+        # Chromium compartido entre corridas y reciclaje de contextos
+        self.browser_server = browser_server
+        self.browser_endpoint = browser_endpoint
+        self.context_max_pages = context_max_pages
+        self.pages_in_context = 0
+        self.playwright = None
+        self.school_url = f"{self.base_url}/escuelas/{school}"
+        
+        # Ritmo de peticiones adaptativo compartido por HTTP y Chromium
+        self.rate_controller = AdaptiveRateController(requests_per_second, min_rate=min_rate, max_rate=max_rate)
+        
+        # Modo "http": descarga directa con Chromium solo como respaldo
+        self.http_fetcher = (HttpFetcher(user_agent=self.ua.random, rate_controller=self.rate_controller)
+                             if fetch_mode == "http" else None)
+        
+        # Parser lxml de una sola pasada para las filas de reseñas
+        self.review_parser = FastReviewParser(self.review_key)
         
-        # Crear directorio de salida
-        os.makedirs(self.output_dir, exist_ok=True)
+        # Bitácora opcional para reanudar corridas interrumpidas
+        self.journal = CrawlJournal(journal_path) if journal_path else None
+        
+        # Snapshots HTML: se escriben al descargar y en modo replay son la única fuente
+        self.snapshots = SnapshotStore(snapshot_dir) if snapshot_dir else None
+        self.replay = replay and self.snapshots is not None
+        
+        # Al reanudar con snapshots, URLs de páginas que la corrida anterior ya descargó
+        self.resume_urls: set = set()
+        
+        # Índice global de huellas de reseñas (deduplicación entre corridas y profesores)
+        self.fingerprints = FingerprintIndex(fingerprint_index) if fingerprint_index else None
+        
+        # Profesores ya guardados, para comparar contra el listado descubierto
+        self.known_roster = KnownRoster(os.path.join(self.output_dir, ROSTER_FILE))
+
         
     def setup_browser(self) -> Browser:
-        """Configura y retorna el navegador"""
-        playwright = sync_playwright().start()
-        
-        browser = playwright.chromium.launch(
-            headless=True,  # Cambiar a False para debug
-            args=[
-                '--no-sandbox',
-                '--disable-dev-shm-usage',
-                '--disable-blink-features=AutomationControlled',
-                '--disable-extensions',
-                '--disable-plugins',
-                '--disable-images',  # Acelera la carga
-            ]
-        )
+        """Se conecta al Chromium compartido (browser_server.py) o lanza uno local
         
+        El driver de Playwright queda en self.playwright y se detiene en close_resources.
+        """
+        self.playwright = sync_playwright().start()
+        browser, _ = connect_or_launch(self.playwright, headless=True,  # Cambiar a False para debug
+                                       endpoint=self.browser_endpoint, use_server=self.browser_server)
         return browser
     
-    def get_random_delay(self) -> float:
-        """Retorna un delay aleatorio entre 1.5 y 4 segundos"""
-        return random.uniform(1.5, 4.0)
+    def setup_page(self, browser: Browser) -> Page:
+        """Contexto con bloqueo de recursos; su página se reutiliza hasta `context_max_pages` navegaciones"""
+        context = browser.new_context(user_agent=self.ua.random)
+        install_resource_blocking(context, urlparse(self.base_url).netloc)
+        self.pages_in_context = 0
+        return context.new_page()
+    
+    def fresh_page(self, page: Page) -> Page:
+        """Cambia a un contexto nuevo tras `context_max_pages` navegaciones para acotar la memoria"""
+        if not self.context_max_pages or self.pages_in_context < self.context_max_pages:
+            return page
+        browser = page.context.browser
+        page.context.close()
+        return self.setup_page(browser)
     
     def safe_extract_text(self, element, selector: str, default: str = "") -> str:
         """Extrae texto de forma segura de un elemento"""
@@ -71,139 +147,149 @@ class MisProfesoresScraperFinal:
         except Exception:
             return default
     
-    def get_professor_links_from_page(self, page: Page) -> List[Dict[str, str]]:
-        """Obtiene los enlaces de profesores de la página actual"""
-        professors = []
+    def navigate(self, page: Page, url: str, ready_selector: Optional[str] = PROFILE_READY_SELECTOR):
+        """Navega con Chromium respetando el ritmo del controlador e informándole el resultado
         
+        En lugar de esperar a `networkidle` se espera al DOM y a `ready_selector`;
+        un perfil sin reseñas no trae la tabla, así que su ausencia no es un error.
+        """
+        self.rate_controller.acquire()
+        self.pages_in_context += 1
+        start = time.monotonic()
         try:
-            # Esperar a que cargue la tabla
-            page.wait_for_selector('table tbody tr', timeout=10000)
-            
-            # Obtener todas las filas de la tabla
-            rows = page.query_selector_all('table tbody tr')
-            
-            for row in rows:
-                try:
-                    # Obtener todas las celdas de la fila
-                    cells = row.query_selector_all('td')
-                    
-                    if len(cells) < 6:
-                        continue
-                    
-                    # Los enlaces de profesores están en las columnas 2 y 3 (índices 1 y 2)
-                    professor_links = []
-                    
-                    # Buscar en la columna 2 (Apellido, Nombre)
-                    cell2 = cells[1]
-                    link2 = cell2.query_selector('a')
-                    if link2:
-                        href2 = link2.get_attribute('href')
-                        name2 = link2.inner_text().strip()
-                        if href2 and name2 and 'profesores' in href2 and name2 != '.':
-                            professor_links.append((name2, href2))
-                    
-                    # Buscar en la columna 3 (Nombre / Depto)
-                    cell3 = cells[2]
-                    link3 = cell3.query_selector('a')
-                    if link3:
-                        href3 = link3.get_attribute('href')
-                        name3 = link3.inner_text().strip()
-                        if href3 and name3 and 'profesores' in href3 and name3 != '.':
-                            professor_links.append((name3, href3))
-                    
-                    # Usar el primer enlace válido encontrado
-                    if professor_links:
-                        name, href = professor_links[0]
-                        
-                        # Obtener información adicional de la fila
-                        department = ""
-                        if len(cells) > 3:
-                            dept_cell = cells[3]
-                            department = dept_cell.inner_text().strip()
-                        
-                        # Extraer calificaciones y promedio
-                        ratings = ""
-                        average = ""
-                        if len(cells) > 4:
-                            ratings_cell = cells[4]
-                            ratings = ratings_cell.inner_text().strip()
-                        
-                        if len(cells) > 5:
-                            avg_cell = cells[5]
-                            average = avg_cell.inner_text().strip()
-                        
-                        professor_info = {
-                            'name': name,
-                            'url': href if href.startswith('http') else f"{self.base_url}{href}",
-                            'department': department,
-                            'ratings': ratings,
-                            'average': average
-                        }
-                        
-                        professors.append(professor_info)
-                        
-                        # Limitar al número máximo de profesores si se especifica
-                        if self.max_professors and len(professors) >= self.max_professors:
-                            break
-                        
-                except Exception as e:
-                    print(f"Error procesando fila: {e}")
-                    continue
-            
-            print(f"   Encontrados {len(professors)} profesores en esta página")
-            
-        except Exception as e:
-            print(f"Error obteniendo enlaces de profesores: {e}")
+            response = page.goto(url, wait_until='domcontentloaded', timeout=30000)
+        except PlaywrightTimeoutError:
+            self.rate_controller.record(time.monotonic() - start, timeout=True)
+            raise
+        self.rate_controller.record(time.monotonic() - start, status=response.status if response else None)
         
-        return professors
+        if ready_selector:
+            try:
+                page.wait_for_selector(ready_selector, state='attached', timeout=10000)
+            except PlaywrightTimeoutError:
+                pass
+    
+    def fetch_page_html(self, page: Page, url: str) -> str:
+        """Obtiene el HTML de `url`: primero por HTTP directo, Chromium como respaldo"""
+        if self.replay:
+            return self.load_snapshot(url)
+        
+        html = self.resumed_html(url)
+        if html is not None:
+            return html
+        if self.http_fetcher:
+            html = self.http_fetcher.fetch(url)
+            if not self.http_fetcher.is_valid_profile_html(html):
+                print(f"   ↩️ Respuesta HTTP no válida, usando Chromium: {url}")
+                html = None
+        
+        if html is None:
+            self.navigate(page, url)
+            html = page.content()
+        
+        if self.snapshots:
+            self.snapshots.put(url, html)
+        return html
+    
+    def resumed_html(self, url: str) -> Optional[str]:
+        """HTML de una página que la corrida interrumpida ya había descargado, si hay snapshot"""
+        if url not in self.resume_urls:
+            return None
+        self.resume_urls.discard(url)
+        return self.snapshots.get(url)
+    
+    def load_resume_pages(self):
+        """Toma de la bitácora las páginas ya descargadas para no volver a pedirlas
+        
+        Solo sirve con --snapshots: la bitácora guarda el estado de cada página y el
+        almacén de snapshots su HTML.
+        """
+        if not self.snapshots:
+            return
+        for professor_url, page_nums in self.journal.done_pages().items():
+            for page_num in page_nums:
+                url = professor_url if page_num == 1 else f"{professor_url}?pag={page_num}"
+                if url in self.snapshots.index:
+                    self.resume_urls.add(url)
+        if self.resume_urls:
+            print(f"📒 {len(self.resume_urls)} páginas ya descargadas se leerán de los snapshots")
+    
+    def load_snapshot(self, url: str) -> str:
+        """HTML de `url` desde el almacén de snapshots (modo replay)"""
+        html = self.snapshots.get(url)
+        if html is None:
+            raise FileNotFoundError(f"No hay snapshot para {url}")
+        return html
     
     def extract_professor_data(self, page: Page, professor_info: Dict[str, str]) -> Optional[Dict[str, Any]]:
         """Extrae los datos completos de un profesor usando los selectores CSS correctos"""
         try:
-            # Navegar al perfil del profesor
-            page.goto(professor_info['url'], wait_until='networkidle', timeout=30000)
-            time.sleep(2)
-            
-            # Obtener el contenido de la página
-            content = page.content()
-            soup = BeautifulSoup(content, 'html.parser')
+            # Obtener el perfil del profesor
+            html = self.fetch_page_html(page, professor_info['url'])
+            soup = BeautifulSoup(html, 'html.parser')
             
-            # Extraer información básica usando los selectores correctos
-            name = self.extract_professor_name(soup)
-            university = self.extract_university(soup)
-            city = self.extract_city(soup)
-            department = self.extract_department(soup)
-            
-            # Extraer calificaciones usando los selectores correctos
-            general_quality = self.extract_general_quality(soup)
-            recommendation_percentage = self.extract_recommendation_percentage(soup)
-            difficulty_level = self.extract_difficulty_level(soup)
-            
-            # Extraer etiquetas
-            tags = self.extract_tags(soup)
+            # En modo incremental solo se descargan las reseñas que aún no están guardadas
+            existing = self.load_existing_professor(soup, professor_info) if self.incremental else None
+            known_review_ids = self.stored_review_ids(existing) if existing else None
             
             # Extraer reseñas detalladas
-            reviews = self.extract_detailed_reviews(soup, page, professor_info['url'])
+            reviews = self.extract_detailed_reviews(html, page, professor_info['url'], known_review_ids)
+            if existing:
+                print(f"   🔁 Incremental: {len(reviews)} reseñas nuevas")
+                reviews = self.merge_reviews(reviews, existing.get('calificaciones', []))
             
-            professor_data = {
-                'nombre': name or professor_info['name'],
-                'universidad': university or self.universidad,
-                'ciudad': city,
-                'departamento': department or professor_info['department'],
-                'calidad_general': general_quality,
-                'porcentaje_recomienda': recommendation_percentage,
-                'nivel_dificultad': difficulty_level,
-                'etiquetas': tags,
-                'numero_calificaciones': len(reviews),
-                'calificaciones': reviews
-            }
-            
-            return professor_data
+            return self.build_professor_data(soup, professor_info, reviews)
             
         except Exception as e:
             print(f"Error extrayendo datos del profesor {professor_info['name']}: {e}")
             return None
     
+    def parse_professor_pages(self, professor_info: Dict[str, str], pages: List[str]) -> Tuple[Dict[str, Any], int]:
+        """Arma el profesor a partir del HTML ya descargado: el perfil y luego sus páginas de reseñas
+        
+        También devuelve el total de páginas según el paginador del perfil.
+        """
+        soup = BeautifulSoup(pages[0], 'html.parser')
+        reviews = []
+        seen_review_ids = set()
+        total_pages = 1
+        for page_num, html in enumerate(pages, 1):
+            rows, page_total = self.parse_review_page(html)
+            if page_num == 1:
+                total_pages = page_total
+            reviews.extend(self.collect_new_reviews(rows, seen_review_ids))
+        return self.build_professor_data(soup, professor_info, reviews), total_pages
+    
+    def build_professor_data(self, soup: BeautifulSoup, professor_info: Dict[str, str],
+                             reviews: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Arma el diccionario del profesor a partir del perfil ya parseado y sus reseñas"""
+        # Extraer información básica usando los selectores correctos
+        name = self.extract_professor_name(soup)
+        university = self.extract_university(soup)
+        city = self.extract_city(soup)
+        department = self.extract_department(soup)
+        
+        # Extraer calificaciones usando los selectores correctos
+        general_quality = self.extract_general_quality(soup)
+        recommendation_percentage = self.extract_recommendation_percentage(soup)
+        difficulty_level = self.extract_difficulty_level(soup)
+        
+        # Extraer etiquetas
+        tags = self.extract_tags(soup)
+        
+        return {
+            'nombre': name or professor_info['name'],
+            'universidad': university or self.universidad,
+            'ciudad': city,
+            'departamento': department or professor_info['department'],
+            'calidad_general': general_quality,
+            'porcentaje_recomienda': recommendation_percentage,
+            'nivel_dificultad': difficulty_level,
+            'etiquetas': tags,
+            'numero_calificaciones': len(reviews),
+            'calificaciones': reviews
+        }
+    
     def extract_professor_name(self, soup: BeautifulSoup) -> str:
         """Extrae el nombre del profesor usando los selectores correctos"""
         selectors = [
@@ -260,14 +346,19 @@ class MisProfesoresScraperFinal:
         
         return tags[:10]  # Limitar a 10 etiquetas
     
-    def extract_detailed_reviews(self, soup: BeautifulSoup, page: Page, professor_url: str) -> List[Dict[str, Any]]:
-        """Extrae las reseñas detalladas usando los selectores correctos, manejando paginación"""
+    def extract_detailed_reviews(self, html: str, page: Page, professor_url: str,
+                                 known_review_ids: Optional[set] = None) -> List[Dict[str, Any]]:
+        """Extrae las reseñas detalladas usando los selectores correctos, manejando paginación.
+        
+        Si se pasan `known_review_ids` (modo incremental), las reseñas conocidas se omiten y se
+        deja de paginar en cuanto una página contiene alguna de ellas.
+        """
         reviews = []
-        seen_review_ids = set()  # Para evitar duplicados
+        seen_review_ids = set(known_review_ids or ())  # Para evitar duplicados
         
         try:
             # Primero, detectar el número total de páginas
-            total_pages = self.get_total_pages(soup)
+            rows, total_pages = self.parse_review_page(html)
             print(f"   📄 Total de páginas de comentarios: {total_pages}")
             
             # Iterar por cada página
@@ -275,24 +366,26 @@ class MisProfesoresScraperFinal:
                 try:
                     print(f"   📖 Procesando página {page_num}/{total_pages} de comentarios...")
                     
-                    # Si no es la primera página, navegar a la página específica
+                    # Si no es la primera página, obtener la página específica
                     if page_num > 1:
                         page_url = f"{professor_url}?pag={page_num}"
-                        page.goto(page_url, wait_until='networkidle', timeout=30000)
-                        time.sleep(1)  # Pequeña pausa para que cargue
-                        
-                        # Obtener el contenido actualizado
-                        content = page.content()
-                        soup = BeautifulSoup(content, 'html.parser')
+                        rows, _ = self.parse_review_page(self.fetch_page_html(page, page_url))
                     
                     # Extraer reseñas de la página actual
-                    page_reviews = self.extract_reviews_from_page(soup, seen_review_ids)
+                    page_reviews = self.collect_new_reviews(rows, seen_review_ids)
                     reviews.extend(page_reviews)
+                    self.record_page(professor_url, page_num, True)
                     
                     print(f"   ✅ Página {page_num}: {len(page_reviews)} reseñas extraídas")
                     
+                    # Las páginas van de la más reciente a la más antigua
+                    if known_review_ids and self.page_has_known_review(rows, known_review_ids):
+                        print("   ⏹️ Reseñas ya conocidas alcanzadas, se omiten las páginas restantes")
+                        break
+                    
                 except Exception as e:
                     print(f"   ❌ Error procesando página {page_num}: {e}")
+                    self.record_page(professor_url, page_num, False, str(e))
                     continue
             
             print(f"   📊 Total de reseñas únicas extraídas: {len(reviews)}")
@@ -302,6 +395,11 @@ class MisProfesoresScraperFinal:
         
         return reviews
     
+    def record_page(self, professor_url: str, page_num: int, ok: bool, error: Optional[str] = None):
+        """Registra el resultado de una página de reseñas en la bitácora, si está activa"""
+        if self.journal:
+            self.journal.record_page(professor_url, page_num, ok, error)
+    
     def get_total_pages(self, soup: BeautifulSoup) -> int:
         """Detecta el número total de páginas de comentarios"""
         try:
@@ -335,28 +433,44 @@ class MisProfesoresScraperFinal:
             print(f"Error detectando páginas: {e}")
             return 1
     
+    def select_review_rows(self, soup: BeautifulSoup) -> list:
+        """Devuelve las filas de la tabla de calificaciones (excepto la cabecera)"""
+        table_rows = soup.select('table.tftable tbody tr')
+        if not table_rows:
+            # Fallback si no hay tbody
+            table_rows = soup.select('table.tftable tr')[1:]  # Excluir la primera fila (cabecera)
+        return table_rows
+    
+    def parse_review_page(self, html: str) -> Tuple[List[Tuple[str, Dict[str, Any]]], int]:
+        """Parsea una página de reseñas con lxml: [(review_id, reseña)] y total de páginas"""
+        return self.review_parser.parse(html)
+    
+    def collect_new_reviews(self, rows: List[Tuple[str, Dict[str, Any]]], seen_review_ids: set) -> List[Dict[str, Any]]:
+        """Filtra duplicados y filas vacías con el mismo criterio que extract_reviews_from_page"""
+        page_reviews = []
+        for review_id, review_data in rows:
+            # Evitar duplicados
+            if review_id in seen_review_ids:
+                continue
+            seen_review_ids.add(review_id)
+            
+            # Solo agregar reseña si hay algún contenido
+            if (review_data['fecha'] or review_data['tipo_calificacion']
+                    or review_data['materia'] or review_data['comentario']):
+                page_reviews.append(review_data)
+        return page_reviews
+    
+    def page_has_known_review(self, rows: List[Tuple[str, Dict[str, Any]]], known_review_ids: set) -> bool:
+        """Indica si alguna reseña de la página ya estaba guardada"""
+        return any(review_id in known_review_ids for review_id, _ in rows)
+    
     def extract_reviews_from_page(self, soup: BeautifulSoup, seen_review_ids: set) -> List[Dict[str, Any]]:
         """Extrae las reseñas de una página específica"""
         page_reviews = []
         
         try:
-            # Buscar todas las filas de la tabla de calificaciones (excepto la cabecera)
-            table_rows = soup.select('table.tftable tbody tr')
-            if not table_rows:
-                # Fallback si no hay tbody
-                table_rows = soup.select('table.tftable tr')[1:]  # Excluir la primera fila (cabecera)
-            
-            for row in table_rows:
+            for row in self.select_review_rows(soup):
                 try:
-                    # Generar un ID único para esta reseña basado en su contenido
-                    review_id = self.generate_review_id(row)
-                    
-                    # Evitar duplicados
-                    if review_id in seen_review_ids:
-                        continue
-                    
-                    seen_review_ids.add(review_id)
-                    
                     # Extraer fecha
                     date = self.safe_extract_text(row, 'td.rating .date')
                     
@@ -396,23 +510,33 @@ class MisProfesoresScraperFinal:
                     helpful_votes = self.safe_extract_text(row, 'a.votar_icon.helpful span.count')
                     not_helpful_votes = self.safe_extract_text(row, 'a.votar_icon.nothelpful span.count')
                     
+                    review_data = {
+                        'fecha': date,
+                        'tipo_calificacion': rating_type,
+                        'puntaje_calidad_general': quality_score,
+                        'puntaje_facilidad': ease_score,
+                        'materia': subject,
+                        'asistencia': attendance,
+                        'calificacion_recibida': grade_received,
+                        'interes_clase': class_interest,
+                        'comentario': comment,
+                        'etiquetas_comentario': comment_tags,
+                        'votos_utiles': helpful_votes,
+                        'votos_no_utiles': not_helpful_votes
+                    }
+                    
+                    # Huella estable de la reseña basada en su contenido
+                    review_id = self.review_key(review_data)
+                    review_data[FINGERPRINT_KEY] = review_id
+                    
+                    # Evitar duplicados
+                    if review_id in seen_review_ids:
+                        continue
+                    
+                    seen_review_ids.add(review_id)
+                    
                     # Solo agregar reseña si hay algún contenido
                     if date or rating_type or subject or comment:
-                        review_data = {
-                            'fecha': date,
-                            'tipo_calificacion': rating_type,
-                            'puntaje_calidad_general': quality_score,
-                            'puntaje_facilidad': ease_score,
-                            'materia': subject,
-                            'asistencia': attendance,
-                            'calificacion_recibida': grade_received,
-                            'interes_clase': class_interest,
-                            'comentario': comment,
-                            'etiquetas_comentario': comment_tags,
-                            'votos_utiles': helpful_votes,
-                            'votos_no_utiles': not_helpful_votes
-                        }
-                        
                         page_reviews.append(review_data)
                         
                 except Exception as e:
@@ -424,64 +548,261 @@ class MisProfesoresScraperFinal:
         
         return page_reviews
     
-    def generate_review_id(self, row) -> str:
-        """Genera un ID único para una reseña basado en su contenido"""
+    def review_key(self, review: Dict[str, Any]) -> str:
+        """Huella estable (blake2b) de fecha, materia, puntajes y comentario completo"""
+        return review_fingerprint(review)
+    
+    def stored_review_key(self, review: Dict[str, Any]) -> str:
+        """Huella de una reseña guardada; los JSON anteriores a la huella se recalculan"""
+        return review.get(FINGERPRINT_KEY) or self.review_key(review)
+    
+    def stored_review_ids(self, professor_data: Dict[str, Any]) -> set:
+        """Huellas de las reseñas ya guardadas de un profesor"""
+        return {self.stored_review_key(review) for review in professor_data.get('calificaciones', [])}
+    
+    def merge_reviews(self, new_reviews: List[Dict[str, Any]], stored_reviews: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Antepone las reseñas nuevas a las guardadas, sin repetir huellas"""
+        merged = []
+        seen = set()
+        for review in new_reviews + stored_reviews:
+            review_id = self.stored_review_key(review)
+            if review_id in seen:
+                continue
+            seen.add(review_id)
+            review.setdefault(FINGERPRINT_KEY, review_id)
+            merged.append(review)
+        return merged
+    
+    def professor_filepath(self, nombre: str) -> str:
+        """Ruta del JSON de un profesor a partir de su nombre"""
+        safe_name = re.sub(r'[^\w\s-]', '', nombre)
+        safe_name = re.sub(r'[-\s]+', '_', safe_name)
+        return os.path.join(self.output_dir, f"{safe_name}.json")
+    
+    def load_existing_professor(self, soup: BeautifulSoup, professor_info: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Carga el JSON guardado en una corrida anterior, si existe"""
+        filepath = self.professor_filepath(self.extract_professor_name(soup) or professor_info['name'])
+        if not os.path.exists(filepath):
+            return None
+        
         try:
-            # Combinar elementos únicos para crear un ID
-            date = self.safe_extract_text(row, 'td.rating .date')
-            subject = self.safe_extract_text(row, 'td.class .name .response')
-            comment = self.safe_extract_text(row, 'td.comments p.commentsParagraph')
-            
-            # Crear un hash simple
-            content = f"{date}|{subject}|{comment[:50]}"  # Primeros 50 chars del comentario
-            return str(hash(content))
-        except:
-            return str(random.randint(1000000, 9999999))  # Fallback aleatorio
+            with open(filepath, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ No se pudo leer {filepath}: {e}")
+            return None
     
-    def save_professor_data(self, professor_data: Dict[str, Any]) -> bool:
+    def save_professor_data(self, professor_data: Dict[str, Any], professor_url: str) -> bool:
         """Guarda los datos de un profesor en un archivo JSON"""
         try:
             if not professor_data or 'nombre' not in professor_data:
                 return False
             
             # Crear nombre de archivo seguro
-            safe_name = re.sub(r'[^\w\s-]', '', professor_data['nombre'])
-            safe_name = re.sub(r'[-\s]+', '_', safe_name)
-            filename = f"{safe_name}.json"
-            filepath = os.path.join(self.output_dir, filename)
+            filepath = self.professor_filepath(professor_data['nombre'])
             
             # Guardar datos
             with open(filepath, 'w', encoding='utf-8') as f:
                 json.dump(professor_data, f, ensure_ascii=False, indent=2)
             
             print(f"✅ Guardado: {professor_data['nombre']}")
+            self.register_fingerprints(professor_data, professor_url)
             return True
             
         except Exception as e:
             print(f"❌ Error guardando datos: {e}")
             return False
     
+    def register_fingerprints(self, professor_data: Dict[str, Any], professor_url: str):
+        """Agrega las huellas del profesor al índice global (por URL del perfil) y avisa si alguna ya era de otro"""
+        if not self.fingerprints:
+            return
+        foreign = self.fingerprints.register(
+            professor_url,
+            [self.stored_review_key(review) for review in professor_data.get('calificaciones', [])]
+        )
+        if foreign:
+            print(f"   ⚠️ {len(foreign)} reseñas ya registradas con otro profesor")
+    
+    def print_professor_summary(self, professor_data: Dict[str, Any]):
+        """Muestra un resumen de los datos extraídos de un profesor"""
+        print(f"📊 Datos extraídos:")
+        print(f"   - Calidad General: {professor_data.get('calidad_general', 0)}")
+        print(f"   - Recomendación: {professor_data.get('porcentaje_recomienda', 0)}%")
+        print(f"   - Nivel Dificultad: {professor_data.get('nivel_dificultad', 0)}")
+        print(f"   - Etiquetas: {len(professor_data.get('etiquetas', []))}")
+        print(f"   - Reseñas: {len(professor_data.get('calificaciones', []))}")
+        print(f"   - Ciudad: {professor_data.get('ciudad', 'N/A')}")
+        print(f"   - Departamento: {professor_data.get('departamento', 'N/A')}")
+    
+    def load_work_queue(self, page: Page) -> List[Dict[str, str]]:
+        """Obtiene los profesores a procesar: pendientes de la bitácora o desde el listado"""
+        if self.journal and self.journal.has_roster():
+            professors = self.journal.pending_professors()
+            if professors:
+                print(f"📒 Reanudando desde {self.journal.path}: {len(professors)} profesores pendientes")
+                self.load_resume_pages()
+                return professors
+            # Sin pendientes la corrida anterior ya terminó: se empieza una nueva
+            print(f"📒 La corrida anterior de {self.journal.path} ya terminó; se inicia una nueva")
+            self.journal.reset()
+        
+        print(f"🌐 Navegando a: {self.school_url}")
+        print("📖 Obteniendo enlaces de profesores...")
+        professors, complete = self.discover_roster(page)
+        return self.register_roster(professors, complete)
+    
+    def read_listing_page_http(self, page_num: int) -> Optional[Tuple[List[Dict[str, str]], List[Any]]]:
+        """Página del listado por HTTP, parseada con lxml; None si la respuesta no trae profesores
+        
+        Solo usa la sesión HTTP, así que se puede llamar desde varios hilos.
+        """
+        html = self.http_fetcher.fetch(listing_page_url(self.school_url, page_num))
+        try:
+            rows = parse_listing_html(html) if html else []
+            links = parse_listing_pagination(html) if rows and page_num == 1 else []
+        except Exception as e:
+            print(f"   ⚠️ No se pudo parsear la página {page_num} del listado: {e}")
+            return None
+        found = professors_from_rows(rows, self.base_url)
+        return (found, links) if found else None
+    
+    def read_listing_page(self, page: Page, page_num: int) -> Tuple[List[Dict[str, str]], List[Any]]:
+        """Página del listado con Chromium; sin filas si falla la navegación"""
+        url = listing_page_url(self.school_url, page_num)
+        if self.http_fetcher:
+            print(f"   ↩️ Página {page_num} del listado sin filas por HTTP, usando Chromium")
+        try:
+            self.navigate(page, url, ready_selector=LISTING_ROWS_SELECTOR)
+            rows = page.eval_on_selector_all(LISTING_ROWS_SELECTOR, LISTING_ROWS_JS)
+            links = page.eval_on_selector_all(LISTING_PAGINATION_SELECTOR, LISTING_PAGES_JS) if page_num == 1 else []
+        except Exception as e:
+            print(f"Error obteniendo enlaces de profesores ({url}): {e}")
+            return [], []
+        return professors_from_rows(rows, self.base_url), links
+    
+    def discover_roster(self, page: Page) -> Tuple[List[Dict[str, str]], bool]:
+        """Recorre todas las páginas del listado; indica además si se leyeron todas
+        
+        La primera página da el total a partir de la paginación. Con `fetch_mode="http"`
+        las páginas se descargan por HTTP y se parsean con lxml; las demás se piden en
+        paralelo con `fetchers` hilos y el mismo control de ritmo. Las que no traen filas
+        se leen después con Chromium desde este hilo.
+        """
+        pages: Dict[int, Optional[Tuple[List[Dict[str, str]], List[Any]]]] = {}
+        if self.http_fetcher:
+            pages[1] = self.read_listing_page_http(1)
+        if pages.get(1) is None:
+            pages[1] = self.read_listing_page(page, 1)
+        total_pages = listing_page_count(pages[1][1])
+        print(f"📄 Páginas del listado: {total_pages}")
+        
+        remaining = range(2, total_pages + 1)
+        if self.http_fetcher and len(remaining):
+            with ThreadPoolExecutor(max_workers=max(1, self.fetchers)) as pool:
+                pages.update(zip(remaining, pool.map(self.read_listing_page_http, remaining)))
+        for page_num in remaining:
+            if pages.get(page_num) is None:
+                pages[page_num] = self.read_listing_page(page, page_num)
+        
+        for page_num in range(1, total_pages + 1):
+            print(f"   Página {page_num}/{total_pages}: {len(pages[page_num][0])} profesores")
+        # Una página vacía o fallida no permite saber quién ya no está
+        complete = all(found for found, _ in pages.values())
+        professors = unique_by_url(p for page_num in range(1, total_pages + 1) for p in pages[page_num][0])
+        print(f"   Encontrados {len(professors)} profesores en el listado")
+        return professors, complete
+    
+    def register_roster(self, professors: List[Dict[str, str]], complete: bool = True) -> List[Dict[str, str]]:
+        """Compara el listado con lo conocido, lo guarda en la bitácora (si está activa) y devuelve los pendientes
+        
+        En modo incremental solo se procesan los profesores nuevos o con cambios en el listado;
+        con `recrawl_budget` la cola se ordena por probabilidad de cambio y se corta en ese
+        número de peticiones (ver recrawl_scheduler.py).
+        """
+        if professors:
+            delta = self.known_roster.diff(professors, complete)
+            print(f"🧭 Listado: {delta.summary()}")
+            # El listado completo, antes de filtrar: --replay lo necesita entero
+            if self.snapshots:
+                self.snapshots.save_roster(professors)
+            self.known_roster.save_delta(delta, os.path.join(self.output_dir, DELTA_FILE))
+            for info in delta.removed:
+                print(f"   ➖ Ya no aparece en el listado: {info['name']}")
+            if delta.removed:
+                self.known_roster.forget(delta.removed)
+            if self.incremental or self.recrawl_budget:
+                plan = RecrawlScheduler(self.known_roster, budget=self.recrawl_budget,
+                                        incremental=self.incremental).plan(delta)
+                professors = plan.professors
+                if professors or plan.skipped:
+                    print(f"🗓️ Prioridad: {len(professors)} profesores en ~{plan.requests} peticiones, "
+                          f"{plan.expected_changes:.1f} de {plan.total_changes:.1f} cambios esperados"
+                          + (f" ({plan.skipped} fuera del presupuesto)" if plan.skipped else ""))
+                elif not professors:
+                    print("✅ El listado no tiene cambios: nada que descargar")
+        if self.max_professors:
+            professors = professors[:self.max_professors]
+        
+        if not self.journal or not professors:
+            return professors
+        self.journal.record_roster(professors)
+        return self.journal.pending_professors()
+    
+    def finish_professor(self, professor_info: Dict[str, str], ok: bool, error: Optional[str] = None,
+                         professor_data: Optional[Dict[str, Any]] = None):
+        """Registra el resultado de un profesor en la lista conocida y en la bitácora, si está activa"""
+        if ok:
+            history = review_history(professor_data.get('calificaciones', []), datetime.now()) if professor_data else None
+            self.known_roster.mark_saved(professor_info, history)
+        if self.journal:
+            self.journal.finish_professor(professor_info['url'], ok, error)
+    
+    def run_replay(self):
+        """Re-ejecuta la extracción completa desde los snapshots, sin red ni navegador"""
+        print(f"📼 Modo replay desde {self.snapshots.root}")
+        professors = self.snapshots.load_roster()
+        if not professors:
+            print("❌ No hay lista de profesores en los snapshots")
+            return
+        # Las corridas incrementales o con presupuesto solo descargan parte del listado
+        missing = [p for p in professors if p['url'] not in self.snapshots.index]
+        if missing:
+            print(f"⏭️ {len(missing)} profesores del listado sin snapshot de su perfil; se omiten")
+            professors = [p for p in professors if p['url'] in self.snapshots.index]
+        if self.max_professors:
+            professors = professors[:self.max_professors]
+        
+        start = time.time()
+        saved = 0
+        try:
+            for professor_info in professors:
+                professor_data = self.extract_professor_data(None, professor_info)
+                if professor_data and self.save_professor_data(professor_data, professor_info['url']):
+                    saved += 1
+        finally:
+            self.close_resources()
+        
+        print(f"\n🎉 Replay completado: {saved}/{len(professors)} profesores en {time.time() - start:.1f} s")
+    
     def run(self):
         """Ejecuta el scraper completo"""
+        if self.replay:
+            return self.run_replay()
+        
         print("🚀 Iniciando scraper final de Mis Profesores - ITC")
         print(f"📁 Directorio de salida: {self.output_dir}")
         
         if self.max_professors:
             print(f"🎯 Modo prueba: máximo {self.max_professors} profesores")
+        if self.incremental:
+            print("🔁 Modo incremental: solo se descargan reseñas nuevas")
         
         browser = self.setup_browser()
-        page = browser.new_page()
+        page = self.setup_page(browser)
         
         try:
-            # Navegar a la página principal
-            url = f"{self.base_url}/escuelas/Instituto-Tecnologico-de-Culiacan_1642"
-            print(f"🌐 Navegando a: {url}")
-            
-            page.goto(url, wait_until='networkidle', timeout=30000)
-            
-            # Obtener enlaces de profesores
-            print("📖 Obteniendo enlaces de profesores...")
-            professors = self.get_professor_links_from_page(page)
+            professors = self.load_work_queue(page)
             
             if not professors:
                 print("❌ No se encontraron profesores")
@@ -489,38 +810,35 @@ class MisProfesoresScraperFinal:
             
             print(f"👥 Total de profesores encontrados: {len(professors)}")
             
+            if self.pipeline:
+                saved = ScrapePipeline(self, fetchers=self.fetchers, parse_workers=self.parse_workers).run(professors, page)
+                print(f"\n🎉 Scraping completado! {saved}/{len(professors)} profesores guardados")
+                return
+            
             # Procesar cada profesor
             for i, professor_info in enumerate(professors, 1):
                 try:
+                    page = self.fresh_page(page)
                     print(f"\n📊 Procesando {professor_info['name']} ({i}/{len(professors)}) - {(i/len(professors))*100:.1f}%")
                     print(f"👨‍🏫 URL: {professor_info['url']}")
+                    if self.journal:
+                        self.journal.start_professor(professor_info['url'])
                     
                     # Extraer datos del profesor
                     professor_data = self.extract_professor_data(page, professor_info)
                     
                     if professor_data:
                         # Guardar datos
-                        self.save_professor_data(professor_data)
-                        
-                        # Mostrar resumen de datos extraídos
-                        print(f"📊 Datos extraídos:")
-                        print(f"   - Calidad General: {professor_data.get('calidad_general', 0)}")
-                        print(f"   - Recomendación: {professor_data.get('porcentaje_recomienda', 0)}%")
-                        print(f"   - Nivel Dificultad: {professor_data.get('nivel_dificultad', 0)}")
-                        print(f"   - Etiquetas: {len(professor_data.get('etiquetas', []))}")
-                        print(f"   - Reseñas: {len(professor_data.get('calificaciones', []))}")
-                        print(f"   - Ciudad: {professor_data.get('ciudad', 'N/A')}")
-                        print(f"   - Departamento: {professor_data.get('departamento', 'N/A')}")
+                        saved = self.save_professor_data(professor_data, professor_info['url'])
+                        self.print_professor_summary(professor_data)
+                        self.finish_professor(professor_info, saved, None if saved else "error guardando JSON", professor_data)
                     else:
                         print("❌ Error extrayendo datos")
-                    
-                    # Delay aleatorio
-                    delay = self.get_random_delay()
-                    print(f"⏳ Esperando {delay:.1f} segundos...")
-                    time.sleep(delay)
+                        self.finish_professor(professor_info, False, "error extrayendo datos")
                     
                 except Exception as e:
                     print(f"❌ Error procesando {professor_info['name']}: {e}")
+                    self.finish_professor(professor_info, False, str(e))
                     continue
             
             print(f"\n🎉 Scraping completado! {len(professors)} profesores procesados")
@@ -530,23 +848,120 @@ class MisProfesoresScraperFinal:
         
         finally:
             browser.close()
+            self.close_resources()
+    
+    def close_resources(self):
+        """Cierra la sesión HTTP, la lista conocida, la bitácora y el índice de huellas"""
+        print(f"🚦 Ritmo de peticiones: {self.rate_controller.stats()}")
+        self.known_roster.close()
+        if self.http_fetcher:
+            self.http_fetcher.close()
+        if self.journal:
+            print(f"📒 Bitácora: {self.journal.summary()}")
+            self.journal.close()
+        if self.fingerprints:
+            self.fingerprints.close()
+        if self.playwright:
+            self.playwright.stop()
+            self.playwright = None
 
 
 def main():
     """Función principal"""
-    import sys
+    import argparse
     
-    # Verificar si se pasa un argumento para modo prueba
-    max_professors = None
-    if len(sys.argv) > 1:
-        try:
-            max_professors = int(sys.argv[1])
-            print(f"🧪 Modo prueba activado: máximo {max_professors} profesores")
-        except ValueError:
-            print("❌ Argumento inválido. Uso: python scraper_final.py [número_profesores]")
-            return
+    parser = argparse.ArgumentParser(description="Scraper final de Mis Profesores - ITC")
+    parser.add_argument('max_professors', nargs='?', type=int, default=None,
+                        help="Máximo de profesores a procesar (modo prueba)")
+    parser.add_argument('--fetch', choices=['http', 'browser'], default='http',
+                        help="Descarga de perfiles: HTTP directo con respaldo en Chromium, o solo Chromium")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Solo descarga las reseñas nuevas de los profesores ya guardados")
+    parser.add_argument('--journal', metavar='RUTA', default=None,
+                        help="Bitácora SQLite para reanudar una corrida interrumpida (ej. crawl_journal.sqlite)")
+    parser.add_argument('--snapshots', metavar='DIR', default=None,
+                        help="Guarda el HTML descargado en un almacén local comprimido (ej. snapshots)")
+    parser.add_argument('--replay', action='store_true',
+                        help="Re-extrae todo desde --snapshots sin acceder al sitio")
+    parser.add_argument('--fingerprints', metavar='RUTA', default=None,
+                        help="Índice SQLite global de huellas de reseñas (ej. huellas.sqlite)")
+    parser.add_argument('--schools', nargs='+', metavar='ESCUELA', default=None,
+                        help="Identificadores de escuelas (ej. Instituto-Tecnologico-de-Culiacan_1642) o @archivo "
+                             "con uno por línea; usa el motor asíncrono con una cola global")
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help="Usa el motor asíncrono con varias páginas en paralelo")
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help="Páginas simultáneas en modo asíncrono (default: 4)")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="Descarga, parseo y escritura en etapas paralelas con colas acotadas (requiere --fetch http)")
+    parser.add_argument('--fetchers', type=int, default=4,
+                        help="Hilos de descarga HTTP del pipeline (default: 4)")
+    parser.add_argument('--parse-workers', type=int, default=None,
+                        help="Procesos de parseo del pipeline (default: núcleos disponibles)")
+    parser.add_argument('--budget', type=int, default=None, metavar='PETICIONES',
+                        help="Presupuesto de peticiones por escuela: descarga primero los profesores con más "
+                             "probabilidad de tener reseñas nuevas")
+    parser.add_argument('--browser-server', nargs='?', const='', default=None, metavar='ENDPOINT',
+                        help="Usa el Chromium compartido de browser_server.py (o el endpoint CDP dado) en lugar "
+                             "de lanzar uno nuevo; también se activa definiendo MISPROFESORES_CDP")
+    parser.add_argument('--context-pages', type=int, default=200,
+                        help="Navegaciones por contexto de Chromium antes de reemplazarlo; 0 = nunca (default: 200)")
+    parser.add_argument('--rps', type=float, default=2.0,
+                        help="Peticiones por segundo iniciales; se ajustan según la respuesta del sitio (default: 2.0)")
+    parser.add_argument('--min-rps', type=float, default=0.25,
+                        help="Tasa mínima a la que puede bajar el control adaptativo (default: 0.25)")
+    parser.add_argument('--max-rps', type=float, default=8.0,
+                        help="Tasa máxima a la que puede subir el control adaptativo (default: 8.0)")
+    args = parser.parse_args()
+    
+    if args.replay and not args.snapshots:
+        parser.error("--replay requiere --snapshots DIR")
+    if args.pipeline and (args.fetch != 'http' or args.incremental or args.use_async or args.schools):
+        parser.error("--pipeline requiere --fetch http y no admite --incremental, --async ni --schools")
+    
+    max_professors = args.max_professors
+    browser_server = args.browser_server is not None or bool(os.environ.get(ENDPOINT_ENV))
+    browser_endpoint = args.browser_server or None
+    if max_professors:
+        print(f"🧪 Modo prueba activado: máximo {max_professors} profesores")
     
-    scraper = MisProfesoresScraperFinal(max_professors=max_professors)
+    if args.schools:
+        if args.replay:
+            parser.error("--replay no admite --schools")
+        from school_scheduler import MultiSchoolScheduler, read_schools
+        scraper = MultiSchoolScheduler(read_schools(args.schools), max_professors=max_professors,
+                                       fetch_mode=args.fetch, incremental=args.incremental,
+                                       use_journal=bool(args.journal), snapshot_root=args.snapshots,
+                                       fingerprint_index=args.fingerprints,
+                                       concurrency=args.concurrency, requests_per_second=args.rps,
+                                       min_rate=args.min_rps, max_rate=args.max_rps,
+                                       recrawl_budget=args.budget, browser_server=browser_server,
+                                       browser_endpoint=browser_endpoint, context_max_pages=args.context_pages)
+    elif args.use_async and not args.replay:
+        from scraper_async import AsyncMisProfesoresScraper
+        scraper = AsyncMisProfesoresScraper(max_professors=max_professors,
+                                            fetch_mode=args.fetch,
+                                            incremental=args.incremental,
+                                            journal_path=args.journal,
+                                            snapshot_dir=args.snapshots,
+                                            fingerprint_index=args.fingerprints,
+                                            concurrency=args.concurrency,
+                                            requests_per_second=args.rps,
+                                            min_rate=args.min_rps, max_rate=args.max_rps,
+                                            recrawl_budget=args.budget,
+                                            browser_server=browser_server, browser_endpoint=browser_endpoint,
+                                            context_max_pages=args.context_pages)
+    else:
+        scraper = MisProfesoresScraperFinal(max_professors=max_professors, fetch_mode=args.fetch,
+                                            incremental=args.incremental, journal_path=args.journal,
+                                            snapshot_dir=args.snapshots, replay=args.replay,
+                                            fingerprint_index=args.fingerprints,
+                                            requests_per_second=args.rps,
+                                            min_rate=args.min_rps, max_rate=args.max_rps,
+                                            pipeline=args.pipeline, fetchers=args.fetchers,
+                                            parse_workers=args.parse_workers, recrawl_budget=args.budget,
+                                            browser_server=browser_server, browser_endpoint=browser_endpoint,
+                                            context_max_pages=args.context_pages)
     scraper.run()
 
 
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Almacén local de snapshots HTML de Mis Profesores
+Guarda cada página descargada comprimida y direccionada por su contenido (sha256),
+con un índice URL -> hash, para poder re-ejecutar la extracción sin red (--replay).
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+class SnapshotStore:
+    """Almacén de HTML comprimido direccionado por contenido"""
+
+    def __init__(self, root: str = "snapshots"):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.index_path = os.path.join(root, "index.jsonl")
+        self.roster_path = os.path.join(root, "roster.json")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.index: Dict[str, str] = self._load_index()
+
+    def _load_index(self) -> Dict[str, str]:
+        """Lee el índice; la última entrada de cada URL es la vigente"""
+        index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Línea truncada por una corrida interrumpida
+                    index[entry['url']] = entry['sha256']
+        return index
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.html.gz")
+
+    def put(self, url: str, html: str) -> str:
+        """Guarda el HTML de `url` y devuelve su hash; el contenido repetido no se duplica"""
+        data = html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with gzip.open(tmp_path, 'wb', compresslevel=6) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        if self.index.get(url) != digest:
+            self.index[url] = digest
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({
+                    'url': url,
+                    'sha256': digest,
+                    'fetched_at': datetime.now().isoformat(timespec='seconds')
+                }, ensure_ascii=False) + "\n")
+        return digest
+
+    def get(self, url: str) -> Optional[str]:
+        """HTML guardado de `url`, o None si no hay snapshot"""
+        digest = self.index.get(url)
+        if not digest:
+            return None
+        with gzip.open(self._object_path(digest), 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def urls(self) -> List[str]:
+        return list(self.index)
+
+    def save_roster(self, professors: List[Dict[str, str]]):
+        """Guarda la lista de profesores descubierta en el listado"""
+        with open(self.roster_path, 'w', encoding='utf-8') as f:
+            json.dump(professors, f, ensure_ascii=False, indent=2)
+
+    def load_roster(self) -> List[Dict[str, str]]:
+        """Lista de profesores de la última corrida con snapshots"""
+        if not os.path.exists(self.roster_path):
+            return []
+        with open(self.roster_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tiempos y contadores por etapa del análisis avanzado
+Acumula cuánto tarda cada técnica (en total y por profesor), la carga y el guardado,
+y escribe un reporte JSON/CSV para decidir qué optimizar con datos.
+"""
+
+import csv
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+
+class StageTimer:
+    """Tiempos acumulados por etapa, desglose por profesor y contadores"""
+
+    def __init__(self):
+        self.totals: Dict[str, List[float]] = {}  # etapa -> [segundos, llamadas, máximo]
+        self.per_professor: Dict[str, Dict[str, float]] = {}
+        self.counters: Counter = Counter()
+
+    @contextmanager
+    def stage(self, name: str, prof_id: Optional[str] = None):
+        """Mide el bloque `with`; con prof_id también se suma al desglose de ese profesor"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start, prof_id)
+
+    def add(self, name: str, seconds: float, prof_id: Optional[str] = None):
+        total = self.totals.setdefault(name, [0.0, 0, 0.0])
+        total[0] += seconds
+        total[1] += 1
+        total[2] = max(total[2], seconds)
+        if prof_id is not None:
+            row = self.per_professor.setdefault(prof_id, {})
+            row[name] = row.get(name, 0.0) + seconds
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    def drain(self) -> Dict[str, Any]:
+        """Entrega lo acumulado y lo reinicia (cada proceso del pool lo devuelve por bloque)"""
+        snapshot = {'totals': self.totals, 'per_professor': self.per_professor, 'counters': dict(self.counters)}
+        self.__init__()
+        return snapshot
+
+    def merge(self, snapshot: Dict[str, Any]):
+        """Suma lo medido en otro proceso"""
+        for name, (seconds, calls, longest) in snapshot['totals'].items():
+            total = self.totals.setdefault(name, [0.0, 0, 0.0])
+            total[0] += seconds
+            total[1] += calls
+            total[2] = max(total[2], longest)
+        for prof_id, row in snapshot['per_professor'].items():
+            mine = self.per_professor.setdefault(prof_id, {})
+            for name, seconds in row.items():
+                mine[name] = mine.get(name, 0.0) + seconds
+        self.counters.update(snapshot['counters'])
+
+    def report(self) -> Dict[str, Any]:
+        """Etapas ordenadas por tiempo total, contadores y desglose por profesor"""
+        stages = {
+            name: {
+                'total_s': round(seconds, 4),
+                'calls': calls,
+                'mean_ms': round(1000 * seconds / calls, 3) if calls else 0.0,
+                'max_ms': round(1000 * longest, 3),
+            }
+            for name, (seconds, calls, longest) in sorted(self.totals.items(), key=lambda kv: -kv[1][0])
+        }
+        professors = {
+            prof_id: {name: round(seconds, 6) for name, seconds in row.items()}
+            for prof_id, row in self.per_professor.items()
+        }
+        return {'stages': stages, 'counters': dict(self.counters), 'professors': professors}
+
+    def save(self, json_path: str, csv_path: str):
+        """Reporte completo en JSON y una fila por profesor (segundos por etapa) en CSV"""
+        report = self.report()
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+        columns = sorted({name for row in self.per_professor.values() for name in row})
+        with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['professor_id'] + columns + ['total'])
+            for prof_id, row in self.per_professor.items():
+                writer.writerow([prof_id] + [f"{row.get(name, 0.0):.6f}" for name in columns]
+                                + [f"{sum(row.values()):.6f}"])
+
+    def summary(self, limit: int = 12) -> List[str]:
+        """Líneas legibles con las etapas más costosas"""
+        return [f"{name:<22} {info['total_s']:>9.3f} s  {info['calls']:>6} llamadas  {info['mean_ms']:>9.3f} ms/llamada"
+                for name, info in list(self.report()['stages'].items())[:limit]]
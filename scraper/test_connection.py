@@ -7,14 +7,17 @@ import time
 from playwright.sync_api import sync_playwright
 from bs4 import BeautifulSoup
 
+from browser_server import connect_or_launch
+
 
 def test_connection():
     """Prueba la conectividad básica al sitio web"""
     print("🔍 Probando conectividad a Mis Profesores...")
     
     with sync_playwright() as p:
-        # Lanzar navegador en modo visible para debug
-        browser = p.chromium.launch(
+        # Chromium compartido de browser_server.py si está activo; si no, uno visible para debug
+        browser, _ = connect_or_launch(
+            p,
             headless=False,  # Modo visible para debug
             args=[
                 '--no-sandbox',
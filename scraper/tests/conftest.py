@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Los módulos del scraper se importan como scripts sueltos desde scraper/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
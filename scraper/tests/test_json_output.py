@@ -0,0 +1,20 @@
+"""Conversión de tipos de NumPy en la salida JSON del análisis"""
+
+import json
+
+import numpy as np
+
+from json_output import dumps_compact, dumps_indented
+
+
+def test_numpy_types_match_make_serializable():
+    obj = {"n": np.int64(3), "x": np.float32(0.5), "v": np.arange(3), "flag": np.bool_(True)}
+    expected = {"n": 3.0, "x": 0.5, "v": [0, 1, 2], "flag": 1}
+
+    assert json.loads(dumps_indented(obj)) == expected
+    assert json.loads(dumps_compact(obj)) == expected
+
+
+def test_python_bools_are_not_converted():
+    # make_serializable escribía 0/1; el hook `default` no ve los bool nativos
+    assert json.loads(dumps_compact({"flag": True})) == {"flag": True}
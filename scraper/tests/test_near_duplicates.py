@@ -0,0 +1,95 @@
+"""Casi duplicados: grupos, ids estables y grupos entre profesores"""
+
+import json
+
+from advanced_analysis import STOP_ES, ProfessorAnalyzer
+from comment_corpus import CommentCorpus
+from near_duplicates import NearDuplicateIndex
+
+
+COPIED = ("explica muy bien los temas del curso sus examenes son justos con las practicas revisa las tareas "
+          "a tiempo resuelve dudas en asesoria y el laboratorio esta bien organizado recomiendo tomar la "
+          "materia con el")
+COPIED_EDITED = COPIED + " ingeniero"  # coseno ~0.95 con COPIED
+DISTINCT = [
+    "llega tarde a clase y no responde dudas por correo",
+    "deja demasiadas tareas cada semana pero califica rapido",
+    "la materia es dificil aunque el laboratorio ayuda bastante",
+]
+
+
+def build_index(comments, owners, keys):
+    corpus = CommentCorpus(comments, STOP_ES)
+    return NearDuplicateIndex(comments, corpus.matrix, owners, keys=keys)
+
+
+def groups(index, keys):
+    """{id de grupo: huellas de sus miembros}"""
+    return {cid: frozenset(keys[r] for r in rows.tolist())
+            for cid, rows in zip(index.cluster_ids, index.clusters)}
+
+
+def test_groups_near_duplicates_only():
+    comments = [COPIED, DISTINCT[0], COPIED_EDITED, DISTINCT[1], COPIED, DISTINCT[2]]
+    keys = [f"h{i}" for i in range(len(comments))]
+    index = build_index(comments, [0, 0, 1, 1, 2, 2], keys)
+
+    assert set(groups(index, keys).values()) == {frozenset({"h0", "h2", "h4"})}
+    assert [index.cluster[i] for i in (1, 3, 5)] == [-1, -1, -1]
+    # Copias del mismo profesor: ninguna; el grupo reúne tres profesores
+    assert [index.pairs_within(owner) for owner in (0, 1, 2)] == [0, 0, 0]
+    assert [cid for cid, _ in index.cross_clusters()] == index.cluster_ids
+
+
+def test_cluster_ids_do_not_depend_on_input_order():
+    comments = [COPIED, DISTINCT[0], COPIED_EDITED, DISTINCT[1], COPIED, DISTINCT[2], DISTINCT[0]]
+    owners = [0, 0, 1, 1, 2, 2, 3]
+    keys = [f"h{i}" for i in range(len(comments))]
+    expected = groups(build_index(comments, owners, keys), keys)
+
+    order = [6, 3, 4, 0, 5, 2, 1]
+    reordered = build_index([comments[i] for i in order], [owners[i] for i in order],
+                            [keys[i] for i in order])
+
+    assert groups(reordered, [keys[i] for i in order]) == expected
+    assert len(expected) == 2  # el texto copiado y el comentario repetido por dos profesores
+
+
+def write_professor(data_dir, filename, nombre, comments):
+    reviews = [{"fecha": f"0{i + 1}/Mar/2023", "materia": "Cálculo", "puntaje_calidad_general": 8.0,
+                "puntaje_facilidad": 7.0, "comentario": text, "etiquetas_comentario": []}
+               for i, text in enumerate(comments)]
+    professor = {"nombre": nombre, "departamento": "Ciencias Básicas", "calificaciones": reviews}
+    (data_dir / filename).write_text(json.dumps(professor, ensure_ascii=False), encoding="utf-8")
+
+
+def run_duplicate_clusters(data_dir, out_dir):
+    analyzer = ProfessorAnalyzer(data_dir=str(data_dir), out_dir=str(out_dir))
+    analyzer.load_all_data()
+    analyzer.analyze_all_professors()
+    return json.loads((out_dir / "indices" / "duplicate_clusters.json").read_text(encoding="utf-8"))
+
+
+def test_duplicate_clusters_json(tmp_path):
+    data_dir = tmp_path / "profesores_json"
+    data_dir.mkdir()
+    write_professor(data_dir, "Ana_Lopez.json", "Ana López", [COPIED, DISTINCT[0]])
+    write_professor(data_dir, "Bruno_Diaz.json", "Bruno Díaz", [DISTINCT[1], COPIED_EDITED])
+    write_professor(data_dir, "Carla_Ruiz.json", "Carla Ruiz", [DISTINCT[2]])
+
+    clusters = run_duplicate_clusters(data_dir, tmp_path / "out")
+
+    assert len(clusters) == 1
+    cluster = clusters[0]
+    assert cluster["reviews"] == 2
+    assert [p["nombre"] for p in cluster["professors"]] == ["Ana López", "Bruno Díaz"]
+    assert [p["reviews"] for p in cluster["professors"]] == [1, 1]
+
+    # Con los archivos en otro orden (otros ids de profesor) el grupo conserva su id
+    renamed = tmp_path / "renombrados"
+    renamed.mkdir()
+    for new_name, old in (("a_Carla.json", "Carla_Ruiz.json"), ("b_Bruno.json", "Bruno_Diaz.json"),
+                          ("c_Ana.json", "Ana_Lopez.json")):
+        (renamed / new_name).write_bytes((data_dir / old).read_bytes())
+
+    assert [c["cluster"] for c in run_duplicate_clusters(renamed, tmp_path / "out2")] == [cluster["cluster"]]
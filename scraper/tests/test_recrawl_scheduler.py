@@ -0,0 +1,112 @@
+"""Prioridad de re-scraping y fechas de las reseñas"""
+
+import math
+from datetime import datetime
+
+import pytest
+
+from recrawl_scheduler import PRIOR_DAYS, PRIOR_REVIEWS, RecrawlScheduler, arrival_rate, review_history
+from review_dates import parse_review_date
+from roster_discovery import KnownRoster
+
+
+NOW = datetime(2024, 1, 1)
+
+
+def professor(key, ratings):
+    return {'name': f'Profesor {key}', 'url': f'https://example.com/profesores/{key}',
+            'department': 'Sistemas', 'ratings': ratings, 'average': '8.0'}
+
+
+def history(crawled_at, recent_reviews, reviews, observed_days=730.0):
+    return {'crawled_at': crawled_at.isoformat(timespec='seconds'), 'reviews': reviews,
+            'recent_reviews': recent_reviews, 'observed_days': observed_days}
+
+
+@pytest.fixture
+def known(tmp_path):
+    return KnownRoster(str(tmp_path / "roster_conocido.jsonl"))
+
+
+def test_arrival_rate_without_history_is_the_prior():
+    assert arrival_rate({}) == PRIOR_REVIEWS / PRIOR_DAYS
+    assert arrival_rate({'recent_reviews': 9, 'observed_days': 365.0}) == (9 + PRIOR_REVIEWS) / (365.0 + PRIOR_DAYS)
+
+
+def test_professor_without_history_is_always_crawled(known):
+    legacy = professor('sin-historial', '12')
+    known.mark_saved(legacy)  # guardado antes de que la lista conocida tuviera historial
+    scheduler = RecrawlScheduler(known, budget=1, incremental=True, now=NOW)
+
+    assert scheduler.change_probability(known.entries[legacy['url']]) == 1.0
+    assert scheduler.change_probability(None) == 1.0
+
+    plan = scheduler.plan(known.diff([legacy]))
+    assert plan.professors == [legacy]
+    assert (plan.requests, plan.expected_changes, plan.skipped) == (1, 1.0, 0)
+
+
+def test_budget_keeps_best_probability_per_request(known):
+    busy = professor('activo', '10')        # muchas reseñas recientes, 2 páginas
+    quiet = professor('reciente', '3')      # descargado ayer, 1 página
+    costly = professor('costoso', '40')     # probabilidad media, 8 páginas
+    known.mark_saved(busy, history(datetime(2023, 1, 1), recent_reviews=10, reviews=10))
+    known.mark_saved(quiet, history(datetime(2023, 12, 31), recent_reviews=0, reviews=3))
+    known.mark_saved(costly, history(datetime(2023, 7, 1), recent_reviews=2, reviews=40))
+    new = professor('nuevo', '5')
+
+    scheduler = RecrawlScheduler(known, budget=4, now=NOW)
+    delta = known.diff([quiet, costly, busy, new])
+    probability = {info['name']: scheduler.change_probability(known.entries.get(info['url']))
+                   for info in (busy, quiet, costly)}
+    assert probability['Profesor activo'] == pytest.approx(1 - math.exp(-10.5 / 1095 * 365))
+    assert probability['Profesor activo'] > probability['Profesor costoso'] > probability['Profesor reciente']
+
+    plan = scheduler.plan(delta)
+
+    # nuevo (1 petición, p=1), activo (2), costoso no cabe (8) y reciente sí (1)
+    assert plan.professors == [new, busy, quiet]
+    assert plan.requests == 4
+    assert plan.skipped == 1
+    assert plan.expected_changes == pytest.approx(1 + probability['Profesor activo'] + probability['Profesor reciente'])
+    assert plan.total_changes == pytest.approx(plan.expected_changes + probability['Profesor costoso'])
+
+
+def test_without_budget_incremental_only_crawls_listing_changes(known):
+    same = professor('igual', '4')
+    known.mark_saved(same, history(datetime(2023, 1, 1), recent_reviews=4, reviews=4))
+    changed = dict(same, ratings='6')
+
+    plan = RecrawlScheduler(known, incremental=True, now=NOW).plan(known.diff([changed, professor('nuevo', '1')]))
+
+    assert [info['name'] for info in plan.professors] == ['Profesor igual', 'Profesor nuevo']
+    assert plan.skipped == 0
+
+
+def test_review_history_ignores_unparseable_and_future_dates():
+    reviews = [{'fecha': '15/Dic/2023'}, {'fecha': '2023-06-01'}, {'fecha': '01/Ene/2020'},
+               {'fecha': 'hace 3 días'}, {'fecha': ''}, {}, {'fecha': '31/Feb/2023'}, {'fecha': '02/Ene/2024'}]
+
+    summary = review_history(reviews, NOW)
+
+    assert summary['reviews'] == len(reviews)
+    assert summary['recent_reviews'] == 2
+    assert summary['observed_days'] == 730.0  # la reseña de 2020 queda fuera de la ventana
+    assert review_history([{'fecha': 'sin fecha'}], NOW)['recent_reviews'] == 0
+
+
+@pytest.mark.parametrize("fecha, expected", [
+    ('28/Dic/2016', datetime(2016, 12, 28)),
+    ('5/ene/2021', datetime(2021, 1, 5)),
+    (' 01/Ago/2019 ', datetime(2019, 8, 1)),
+    ('2020-03-07', datetime(2020, 3, 7)),
+    ('07/03/2020', datetime(2020, 3, 7)),
+    ('2020/03/07', datetime(2020, 3, 7)),
+])
+def test_parse_review_date(fecha, expected):
+    assert parse_review_date(fecha) == expected
+
+
+@pytest.mark.parametrize("fecha", [None, '', 'Fecha no disponible', '31/Feb/2023', '12/Foo/2020', '2020-13-01'])
+def test_parse_review_date_unparseable(fecha):
+    assert parse_review_date(fecha) is None
@@ -0,0 +1,49 @@
+"""FastReviewParser (lxml) contra el parser de referencia con BeautifulSoup"""
+
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+
+from scraper_final import MisProfesoresScraperFinal
+
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+PROFILE_FIXTURES = sorted(p.name for p in FIXTURES.glob("perfil_*.html"))
+
+
+@pytest.fixture(scope="module")
+def scraper(tmp_path_factory):
+    return MisProfesoresScraperFinal(fetch_mode="browser", output_dir=str(tmp_path_factory.mktemp("salida")))
+
+
+@pytest.mark.parametrize("name", PROFILE_FIXTURES)
+def test_same_reviews_as_bs4(scraper, name):
+    html = (FIXTURES / name).read_text(encoding="utf-8")
+    soup = BeautifulSoup(html, "html.parser")
+
+    rows, total_pages = scraper.parse_review_page(html)
+
+    assert len(rows) == len(scraper.select_review_rows(soup))
+    assert scraper.collect_new_reviews(rows, set()) == scraper.extract_reviews_from_page(soup, set())
+    assert total_pages == scraper.get_total_pages(soup)
+    assert scraper.review_parser.page_count(html) == total_pages
+
+
+def test_fixture_cases(scraper):
+    """Los fixtures cubren tbody, tabla sin tbody, filas vacías o repetidas y paginación"""
+    parse = {name: scraper.parse_review_page((FIXTURES / name).read_text(encoding="utf-8"))
+             for name in PROFILE_FIXTURES}
+
+    rows, total_pages = parse["perfil_con_tbody.html"]
+    reviews = scraper.collect_new_reviews(rows, set())
+    assert (len(rows), len(reviews), total_pages) == (5, 3, 1)
+    assert reviews[0]["comentario"] == 'Explica muy bien, "deja tareas" pero vale la pena & aprendes.'
+    assert reviews[2]["puntaje_calidad_general"] == 0.0
+
+    rows, total_pages = parse["perfil_sin_tbody.html"]
+    assert [review["materia"] for _, review in rows] == ["Programación Orientada a Objetos", "Bases de Datos"]
+    assert rows[0][1]["interes_clase"] == "Muy alto"
+
+    _, total_pages = parse["perfil_paginado.html"]
+    assert total_pages == 7